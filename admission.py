@@ -0,0 +1,170 @@
+"""
+Admission Control
+Per-user token buckets and a bounded wait queue in front of model generation
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """Refills at rate tokens per second up to burst"""
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, burst):
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+
+class AdmissionTicket:
+    """A held generation slot; release it (or use `with`) when generation is done"""
+    __slots__ = ('controller', 'wait_ms', 'released')
+
+    def __init__(self, controller, wait_ms):
+        self.controller = controller
+        self.wait_ms = wait_ms
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.controller._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class AdmissionController:
+    """Decides whether a request may use the model or must be answered by a cheap tier
+
+    A request is shed (acquire returns None) when its user is over their token
+    bucket, when the wait queue is already full, or when no generation slot
+    frees up within max_wait_ms. Shedding is immediate in the first two cases,
+    so an overloaded process answers quickly instead of queueing without bound.
+    """
+
+    def __init__(self, max_concurrent=2, max_queue=8, max_wait_ms=2000, user_rate=0.5, user_burst=5,
+                 max_users=10000):
+        """user_rate=None disables the per-user limit; max_users bounds the bucket table"""
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait_ms = max_wait_ms
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_users = max_users
+        self._buckets = OrderedDict()
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+        self.stats = {
+            'admitted': 0,
+            'shed_rate_limited': 0,
+            'shed_queue_full': 0,
+            'shed_timeout': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+            'max_queue_depth': 0,
+        }
+
+    @classmethod
+    def from_env(cls):
+        """Build from PIDGIN_* settings; None when PIDGIN_ADMISSION=0"""
+        if os.getenv('PIDGIN_ADMISSION', '1') == '0':
+            return None
+        rate = float(os.getenv('PIDGIN_USER_RATE', '0.5'))
+        return cls(
+            max_concurrent=int(os.getenv('PIDGIN_MAX_CONCURRENT', '2')),
+            max_queue=int(os.getenv('PIDGIN_MAX_QUEUE', '8')),
+            max_wait_ms=float(os.getenv('PIDGIN_MAX_QUEUE_MS', '2000')),
+            user_rate=rate if rate > 0 else None,
+            user_burst=float(os.getenv('PIDGIN_USER_BURST', '5'))
+        )
+
+    def _take_token(self, user_key):
+        """Spend one token from the user's bucket (call with the lock held)"""
+        now = time.monotonic()
+        bucket = self._buckets.get(user_key)
+        if bucket is None:
+            bucket = self._buckets[user_key] = TokenBucket(self.user_burst)
+            if len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(user_key)
+            bucket.tokens = min(self.user_burst, bucket.tokens + (now - bucket.updated) * self.user_rate)
+            bucket.updated = now
+
+        if bucket.tokens < 1:
+            return False
+        bucket.tokens -= 1
+        return True
+
+    def _refund_token(self, user_key):
+        """Give back a token when the request was shed for lack of capacity, not for its user's rate"""
+        bucket = self._buckets.get(user_key)
+        if bucket is not None:
+            bucket.tokens = min(self.user_burst, bucket.tokens + 1)
+
+    def acquire(self, user_key=None, timeout_ms=None):
+        """An AdmissionTicket for one generation, or None if the request should be shed
+
+        timeout_ms (e.g. the router's remaining budget) can only shorten max_wait_ms.
+        """
+        wait_limit = self.max_wait_ms if timeout_ms is None else max(0.0, min(self.max_wait_ms, timeout_ms))
+        start = time.perf_counter()
+        with self._cond:
+            limited = user_key is not None and self.user_rate is not None
+            if limited and not self._take_token(user_key):
+                self.stats['shed_rate_limited'] += 1
+                return None
+
+            if self.in_flight >= self.max_concurrent:
+                if self.waiting >= self.max_queue:
+                    self.stats['shed_queue_full'] += 1
+                    if limited:
+                        self._refund_token(user_key)
+                    return None
+
+                self.waiting += 1
+                self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self.waiting)
+                deadline = time.monotonic() + wait_limit / 1000
+                try:
+                    while self.in_flight >= self.max_concurrent:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.stats['shed_timeout'] += 1
+                            if limited:
+                                self._refund_token(user_key)
+                            return None
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+
+            self.in_flight += 1
+            wait_ms = (time.perf_counter() - start) * 1000
+            self.stats['admitted'] += 1
+            self.stats['total_wait_ms'] += wait_ms
+            self.stats['max_wait_ms'] = max(self.stats['max_wait_ms'], wait_ms)
+        return AdmissionTicket(self, wait_ms)
+
+    def _release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def get_stats(self):
+        """Admitted/shed counters, queue wait times and current queue depth"""
+        with self._cond:
+            stats = dict(self.stats)
+            stats['in_flight'] = self.in_flight
+            stats['queue_depth'] = self.waiting
+            stats['tracked_users'] = len(self._buckets)
+        shed = stats['shed_rate_limited'] + stats['shed_queue_full'] + stats['shed_timeout']
+        stats['shed'] = shed
+        stats['shed_rate'] = shed / (shed + stats['admitted']) if shed + stats['admitted'] else 0.0
+        stats['avg_wait_ms'] = stats['total_wait_ms'] / stats['admitted'] if stats['admitted'] else 0.0
+        return stats
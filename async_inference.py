@@ -0,0 +1,90 @@
+"""
+Async Inference Facade
+Runs blocking chatbot calls on a bounded worker pool so an asyncio event loop stays responsive
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class InferenceQueueFull(Exception):
+    """Raised by AsyncInference.run when max_queue calls are already waiting for a worker"""
+
+
+class AsyncInference:
+    """Bounded thread pool with queue-depth and wait-time metrics
+
+    Threads (not processes) are used so every worker shares the one loaded
+    model; torch releases the GIL inside its kernels. With max_queue, calls
+    beyond that many waiting for a worker are refused instead of joining the
+    executor's unbounded queue.
+    """
+
+    def __init__(self, max_workers=2, max_queue=None):
+        """Create the worker pool"""
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pidgin-inference")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.stats = {
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+            'total_run_ms': 0.0,
+            'max_queue_depth': 0,
+        }
+
+    async def run(self, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs) executed on a worker thread; raises InferenceQueueFull when the queue is full"""
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        with self._lock:
+            if self.max_queue is not None and self.queued >= self.max_queue:
+                self.stats['rejected'] += 1
+                raise InferenceQueueFull(f"{self.queued} calls already waiting")
+            self.queued += 1
+            self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self.queued)
+
+        def task():
+            started = time.perf_counter()
+            wait_ms = (started - submitted) * 1000
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.stats['total_wait_ms'] += wait_ms
+                self.stats['max_wait_ms'] = max(self.stats['max_wait_ms'], wait_ms)
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.stats['total_run_ms'] += (time.perf_counter() - started) * 1000
+                    self.stats['failed' if failed else 'completed'] += 1
+
+        return await loop.run_in_executor(self.executor, task)
+
+    def get_stats(self):
+        """Current queue depth, running workers and average wait/run times"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['queue_depth'] = self.queued
+            stats['running'] = self.running
+        finished = stats['completed'] + stats['failed']
+        stats['max_workers'] = self.max_workers
+        stats['max_queue'] = self.max_queue
+        stats['avg_wait_ms'] = stats['total_wait_ms'] / finished if finished else 0.0
+        stats['avg_run_ms'] = stats['total_run_ms'] / finished if finished else 0.0
+        return stats
+
+    def shutdown(self, wait=True):
+        """Stop accepting work and release the worker threads"""
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,167 @@
+"""
+Micro-batching Inference Engine
+Merges concurrent generation requests into a single model.generate call
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import torch
+from transformers import LogitsProcessorList
+
+
+class _Request:
+    """One pending generation request"""
+    __slots__ = ('input_ids', 'generate_kwargs', 'key', 'future', 'enqueued')
+
+    def __init__(self, input_ids, generate_kwargs):
+        self.input_ids = list(input_ids)
+        self.generate_kwargs = generate_kwargs
+        # Only requests with identical decoding settings can share a batch
+        self.key = tuple(sorted(generate_kwargs.items()))
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class MicroBatchEngine:
+    """Collects requests for a few milliseconds and runs them as one left-padded batch"""
+
+    def __init__(self, tokenizer, model, max_batch_size=8, max_wait_ms=10, processor_factory=None):
+        """Start the background batching worker
+        
+        processor_factory(generate_kwargs) may return a fresh per-batch logits
+        processor with a summary(output_ids, row) method, e.g. StopSequenceProcessor.
+        """
+        self.tokenizer = tokenizer
+        self.model = model
+        self.processor_factory = processor_factory
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.pad_token_id = tokenizer.eos_token_id
+
+        self._queue = queue.Queue()
+        self._pending = []
+        self._stopped = threading.Event()
+        self.stats = {'requests': 0, 'batches': 0, 'largest_batch': 0}
+
+        self._worker = threading.Thread(target=self._run, name="micro-batch-engine", daemon=True)
+        self._worker.start()
+
+    def submit(self, input_ids, **generate_kwargs):
+        """Queue a prompt (list of token ids); the Future resolves to (text, generation stats)"""
+        if self._stopped.is_set():
+            raise RuntimeError("MicroBatchEngine has been stopped")
+        request = _Request(input_ids, generate_kwargs)
+        self._queue.put(request)
+        return request.future
+
+    def generate(self, input_ids, **generate_kwargs):
+        """Blocking helper: submit a prompt and wait for (text, generation stats)"""
+        return self.submit(input_ids, **generate_kwargs).result()
+
+    def stop(self):
+        """Stop the worker after the current batch"""
+        self._stopped.set()
+        self._queue.put(None)
+        self._worker.join()
+
+    def get_stats(self):
+        """Return batching counters and the average batch size"""
+        stats = dict(self.stats)
+        stats['queue_depth'] = self._queue.qsize() + len(self._pending)
+        stats['avg_batch_size'] = stats['requests'] / stats['batches'] if stats['batches'] else 0.0
+        return stats
+
+    def _collect(self):
+        """Gather up to max_batch_size compatible requests within max_wait"""
+        if not self._pending:
+            first = self._queue.get()
+            if first is None:
+                return []
+            self._pending.append(first)
+
+        deadline = self._pending[0].enqueued + self.max_wait
+        while len(self._pending) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    request = self._queue.get(timeout=remaining)
+                else:
+                    request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                self._stopped.set()
+                break
+            self._pending.append(request)
+
+        key = self._pending[0].key
+        batch = [r for r in self._pending if r.key == key][:self.max_batch_size]
+        batch_ids = set(map(id, batch))
+        self._pending = [r for r in self._pending if id(r) not in batch_ids]
+        return batch
+
+    def _run(self):
+        """Worker loop"""
+        while not (self._stopped.is_set() and not self._pending and self._queue.empty()):
+            batch = self._collect()
+            if not batch:
+                continue
+            try:
+                results = self._generate_batch(batch)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+
+    def _generate_batch(self, batch):
+        """Left-pad the prompts, run one generate call and decode each row's new tokens"""
+        started = time.perf_counter()
+        longest = max(len(r.input_ids) for r in batch)
+        input_ids = []
+        attention_mask = []
+        for request in batch:
+            pad = longest - len(request.input_ids)
+            input_ids.append([self.pad_token_id] * pad + request.input_ids)
+            attention_mask.append([0] * pad + [1] * len(request.input_ids))
+
+        input_ids = torch.tensor(input_ids, dtype=torch.long)
+        attention_mask = torch.tensor(attention_mask, dtype=torch.long)
+
+        extra = {}
+        processor = None
+        if self.processor_factory is not None:
+            processor = self.processor_factory(batch[0].generate_kwargs)
+            extra['logits_processor'] = LogitsProcessorList([processor])
+
+        with torch.no_grad():
+            output = self.model.generate(
+                input_ids,
+                attention_mask=attention_mask,
+                pad_token_id=self.pad_token_id,
+                **batch[0].generate_kwargs,
+                **extra
+            )
+        generated = time.perf_counter()
+
+        self.stats['requests'] += len(batch)
+        self.stats['batches'] += 1
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+
+        results = []
+        for row, request in enumerate(batch):
+            text = self.tokenizer.decode(output[row, longest:], skip_special_tokens=False)
+            stats = processor.summary(output, row) if processor is not None else {}
+            stats['queue_s'] = started - request.enqueued
+            stats['generate_s'] = generated - started
+            results.append((text, stats))
+
+        # Decoding is cheap next to generate; the whole batch's decode time is shared by every row
+        decode_s = time.perf_counter() - generated
+        for _, stats in results:
+            stats['decode_s'] = decode_s
+        return results
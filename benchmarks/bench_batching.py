@@ -0,0 +1,82 @@
+"""
+Micro-batching Benchmark
+Compares one-at-a-time generation with the MicroBatchEngine under concurrent load
+
+Usage: python benchmarks/bench_batching.py [--model models/fine_tuned_pidgin]
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import torch
+
+from batching import MicroBatchEngine
+from benchmarks.fixtures import build_tiny_model, load_dataset_questions
+from chatbot import PidginChatbot, load_shared_model
+
+
+def run_sequential(bot, prompts, generate_kwargs):
+    """Generate every prompt one after another on the calling thread"""
+    start = time.perf_counter()
+    for prompt in prompts:
+        input_ids = torch.tensor([prompt])
+        with torch.no_grad():
+            bot.model.generate(input_ids, pad_token_id=bot.tokenizer.eos_token_id, **generate_kwargs)
+    return time.perf_counter() - start
+
+
+def run_batched(engine, prompts, generate_kwargs, concurrency):
+    """Submit the prompts from concurrent callers through the engine"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda p: engine.generate(p, **generate_kwargs), prompts))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=None, help="Model directory (default: tiny random GPT-2 fixture)")
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--max-batch-size', type=int, default=8)
+    parser.add_argument('--max-wait-ms', type=float, default=10)
+    parser.add_argument('--max-new-tokens', type=int, default=32)
+    args = parser.parse_args()
+
+    model_path = args.model or build_tiny_model()
+    bot = PidginChatbot(model_path)
+    if not bot.model_loaded:
+        print(f"❌ Could not load model from {model_path}")
+        return
+
+    questions = load_dataset_questions()
+    prompts = [bot._build_prompt_ids(questions[i % len(questions)], 'general') for i in range(args.requests)]
+    generate_kwargs = bot._generation_kwargs(args.max_new_tokens, 0.7)
+
+    torch.manual_seed(0)
+    sequential = run_sequential(bot, prompts, generate_kwargs)
+
+    tokenizer, model = load_shared_model(model_path)
+    engine = MicroBatchEngine(tokenizer, model, args.max_batch_size, args.max_wait_ms)
+    torch.manual_seed(0)
+    batched = run_batched(engine, prompts, generate_kwargs, args.concurrency)
+    stats = engine.get_stats()
+    engine.stop()
+
+    print("=" * 70)
+    print(f"📊 {args.requests} requests, {args.concurrency} concurrent callers, "
+          f"max batch {args.max_batch_size}, max wait {args.max_wait_ms}ms")
+    print(f"  One-at-a-time: {args.requests / sequential:8.2f} req/s ({sequential:.2f}s)")
+    print(f"  Micro-batched: {args.requests / batched:8.2f} req/s ({batched:.2f}s)")
+    print(f"  Average batch size: {stats['avg_batch_size']:.2f}")
+    print(f"  Throughput gain: {sequential / batched:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Benchmark History
+Lists, compares and charts the runs that run_benchmarks.py appends to its history file
+
+    list      every recorded run
+    compare   per-case change vs a baseline revision; exits 1 on a significant regression
+    trend     one metric per case across the latest runs on this machine
+
+compare uses every run recorded for each revision on the same machine
+fingerprint. A case regresses when the pooled latency samples are significantly
+slower (one-sided Mann-Whitney U test, p < --alpha) and every candidate run's
+median is more than --threshold above every baseline run's median. Samples are
+first scaled by each case's calibration_ms ratio so a machine that is simply
+busier during one run does not read as a regression (--raw disables this).
+Record 3+ runs per revision: single runs on a shared machine vary a lot.
+
+Usage:
+    python benchmarks/bench_history.py list
+    python benchmarks/bench_history.py compare --baseline <revision> [--candidate <revision>]
+    python benchmarks/bench_history.py trend [--runs 8] [--metric p50_ms]
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+
+DEFAULT_HISTORY = "benchmarks/results/history.jsonl"
+
+
+def append_history(report, history_file=DEFAULT_HISTORY):
+    """Append one run as a JSON line"""
+    os.makedirs(os.path.dirname(history_file) or ".", exist_ok=True)
+    with open(history_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(report) + "\n")
+
+
+def load_history(history_file=DEFAULT_HISTORY):
+    """Every recorded run, oldest first"""
+    with open(history_file, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def select_runs(runs, revision=None, machine=None, exclude=None):
+    """All runs of one revision on one machine, oldest first
+
+    revision is a prefix; None means the latest recorded revision other than exclude.
+    """
+    pool = [run for run in runs if machine is None or run['meta']['machine'] == machine]
+    if revision is None:
+        revision = next((run['meta']['revision'] for run in reversed(pool)
+                         if run['meta']['revision'] != exclude), None)
+        if revision is None:
+            return []
+        return [run for run in pool if run['meta']['revision'] == revision]
+    return [run for run in pool if run['meta']['revision'].startswith(revision)]
+
+
+def mann_whitney_greater(candidate, baseline):
+    """One-sided p-value that candidate samples tend to be larger than baseline samples
+
+    Normal approximation with tie correction and continuity correction; fine for
+    the tens to hundreds of samples a case records.
+    """
+    n1, n2 = len(candidate), len(baseline)
+    combined = sorted([(value, 0) for value in candidate] + [(value, 1) for value in baseline])
+
+    ranks = [0.0] * len(combined)
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tied = j - i + 1
+        tie_term += tied ** 3 - tied
+        i = j + 1
+
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 1 - statistics.NormalDist().cdf(z)
+
+
+def scaled_samples(run, case, reference_ms, normalize=True):
+    """A case's samples expressed at the machine speed where calibration_ms == reference_ms"""
+    result = run['results'][case]
+    if normalize and reference_ms and result.get('calibration_ms'):
+        scale = reference_ms / result['calibration_ms']
+        return [sample * scale for sample in result['samples_ms']]
+    return result['samples_ms']
+
+
+def compare_runs(baselines, candidates, alpha=0.01, threshold=0.10, rss_threshold=0.10, normalize=True):
+    """Per-case verdicts ('regression', 'improvement' or 'same') between two groups of runs
+
+    A verdict needs both a significant difference of the pooled samples and a
+    slowdown (or speedup) larger than threshold from every candidate run against
+    every baseline run, so one run on a noisy machine cannot fail the gate alone.
+    """
+    rows = []
+    for name in candidates[0]['results']:
+        old_runs = [run for run in baselines if run['results'].get(name, {}).get('samples_ms')]
+        new_runs = [run for run in candidates if run['results'].get(name, {}).get('samples_ms')]
+        if not old_runs or not new_runs:
+            continue
+
+        reference = old_runs[0]['results'][name].get('calibration_ms')
+        old = [scaled_samples(run, name, reference, normalize) for run in old_runs]
+        new = [scaled_samples(run, name, reference, normalize) for run in new_runs]
+        old_medians = [statistics.median(samples) for samples in old]
+        new_medians = [statistics.median(samples) for samples in new]
+        old_pooled = [sample for samples in old for sample in samples]
+        new_pooled = [sample for samples in new for sample in samples]
+
+        old_median = statistics.median(old_medians)
+        new_median = statistics.median(new_medians)
+        change = (new_median - old_median) / old_median if old_median else 0.0
+
+        verdict = 'same'
+        if (min(new_medians) > max(old_medians) * (1 + threshold)
+                and mann_whitney_greater(new_pooled, old_pooled) < alpha):
+            verdict = 'regression'
+        elif (max(new_medians) < min(old_medians) * (1 - threshold)
+                and mann_whitney_greater(old_pooled, new_pooled) < alpha):
+            verdict = 'improvement'
+
+        row = {'case': name, 'baseline_ms': old_median, 'candidate_ms': new_median, 'change': change,
+               'noise': (max(old_medians) - min(old_medians)) / old_median if old_median else 0.0,
+               'verdict': verdict}
+        old_rss = [run['results'][name]['peak_rss_mb'] for run in old_runs if 'peak_rss_mb' in run['results'][name]]
+        new_rss = [run['results'][name]['peak_rss_mb'] for run in new_runs if 'peak_rss_mb' in run['results'][name]]
+        if old_rss and new_rss:
+            row['rss_change'] = (min(new_rss) - max(old_rss)) / max(old_rss)
+            if row['rss_change'] > rss_threshold:
+                row['verdict'] = 'regression'
+        rows.append(row)
+    return rows
+
+
+def source_file(case):
+    """Which module a case exercises, for grouping the trend table"""
+    return "train_model.py" if case.startswith('train_') else "chatbot.py"
+
+
+def command_list(runs, args):
+    print(f"{'#':>3} {'Revision':<14} {'Machine':<13} {'When':<20} Cases")
+    for index, run in enumerate(runs):
+        meta = run['meta']
+        print(f"{index:>3} {meta['revision'][:12]:<14} {meta['machine']:<13} {meta['timestamp']:<20} "
+              f"{len(run['results'])}")
+    return 0
+
+
+def command_compare(runs, args):
+    candidates = select_runs(runs, args.candidate or runs[-1]['meta']['revision'])
+    if not candidates:
+        print(f"❌ No run matches candidate {args.candidate}")
+        return 2
+
+    machine = candidates[-1]['meta']['machine']
+    candidates = [run for run in candidates if run['meta']['machine'] == machine]
+    revision = candidates[-1]['meta']['revision']
+    baselines = select_runs(runs, args.baseline, machine, exclude=revision)
+    if not baselines:
+        baselines = select_runs(runs, args.baseline, exclude=revision)
+        if not baselines:
+            print(f"❌ No baseline run matches {args.baseline or 'an earlier revision'}")
+            return 2
+        print(f"⚠️  Baseline was recorded on machine {baselines[-1]['meta']['machine']}, not {machine}; "
+              f"timings may not be comparable")
+
+    if baselines[-1]['meta']['revision'] == revision:
+        print(f"❌ Baseline and candidate are both {revision[:12]}; pick a different --baseline")
+        return 2
+
+    print("=" * 70)
+    print(f"📊 {baselines[-1]['meta']['revision'][:12]} ({len(baselines)} run(s)) -> "
+          f"{revision[:12]} ({len(candidates)} run(s)), machine {machine}")
+    if len(baselines) < 3 or len(candidates) < 3:
+        print("⚠️  Record 3+ runs per revision; single runs on a busy machine vary by tens of percent")
+    print(f"{'Case':<26} {'Base ms':>10} {'New ms':>10} {'Change':>8} {'Noise':>7} {'RSS':>7}  Verdict")
+
+    rows = compare_runs(baselines, candidates, args.alpha, args.threshold, args.rss_threshold, not args.raw)
+    icons = {'regression': '🔴 regression', 'improvement': '🟢 improvement', 'same': '   same'}
+    for row in rows:
+        rss = f"{row['rss_change']:+.0%}" if 'rss_change' in row else "-"
+        print(f"{row['case']:<26} {row['baseline_ms']:>10.3f} {row['candidate_ms']:>10.3f} "
+              f"{row['change']:>+8.1%} {row['noise']:>7.0%} {rss:>7}  {icons[row['verdict']]}")
+
+    regressions = [row['case'] for row in rows if row['verdict'] == 'regression']
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\n✅ No significant regressions")
+    return 0
+
+
+def command_trend(runs, args):
+    latest = runs[-1]
+    machine = latest['meta']['machine']
+    recent = [run for run in runs if run['meta']['machine'] == machine][-args.runs:]
+
+    cases = list(dict.fromkeys(name for run in recent for name in run['results']))
+
+    print("=" * 70)
+    print(f"📈 {args.metric} over the last {len(recent)} run(s) on machine {machine}")
+    header = " ".join(f"{run['meta']['revision'][:8]:>10}" for run in recent)
+    for module in ("chatbot.py", "train_model.py"):
+        module_cases = [case for case in cases if source_file(case) == module]
+        if not module_cases:
+            continue
+        print(f"\n{module:<26} {header}")
+        for case in module_cases:
+            values = []
+            for run in recent:
+                value = run['results'].get(case, {}).get(args.metric)
+                values.append(f"{value:>10.3f}" if value is not None else f"{'-':>10}")
+            print(f"{case:<26} {' '.join(values)}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--history', default=DEFAULT_HISTORY)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('list', help="Show recorded runs")
+
+    compare = commands.add_parser('compare', help="Flag significant regressions against a baseline")
+    compare.add_argument('--baseline', default=None,
+                         help="Revision prefix (default: the latest other revision recorded on this machine)")
+    compare.add_argument('--candidate', default=None, help="Revision prefix (default: the latest run's revision)")
+    compare.add_argument('--alpha', type=float, default=0.01, help="Significance level")
+    compare.add_argument('--threshold', type=float, default=0.10, help="Minimum relative slowdown of every run")
+    compare.add_argument('--rss-threshold', type=float, default=0.10, help="Maximum relative peak RSS growth")
+    compare.add_argument('--raw', action='store_true', help="Compare timings without calibration scaling")
+
+    trend = commands.add_parser('trend', help="Table of one metric across recent runs")
+    trend.add_argument('--runs', type=int, default=8)
+    trend.add_argument('--metric', default='p50_ms', help="p50_ms, p95_ms, p99_ms, mean_ms, tokens_per_s, peak_rss_mb")
+
+    args = parser.parse_args()
+
+    try:
+        runs = load_history(args.history)
+    except FileNotFoundError:
+        runs = []
+    if not runs:
+        print(f"❌ No runs recorded in {args.history}; run benchmarks/run_benchmarks.py first")
+        sys.exit(2)
+
+    handlers = {'list': command_list, 'compare': command_compare, 'trend': command_trend}
+    sys.exit(handlers[args.command](runs, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Intent Classifier Benchmark
+Held-out accuracy and per-message latency of the trained classifier vs keyword scoring
+
+Accuracy is k-fold cross-validated on the dataset's category labels so the
+classifier is never scored on questions it was trained on.
+
+Usage: python benchmarks/bench_intent.py [--folds 5]
+"""
+
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from chatbot import scan_keywords
+from intent_classifier import IntentClassifier
+
+
+def keyword_intent(text):
+    """detect_intent's keyword scoring without the per-message cache"""
+    math_score, coding_score, _ = scan_keywords.__wrapped__(text.lower())
+    if math_score > coding_score:
+        return 'math'
+    if coding_score > math_score:
+        return 'coding'
+    return 'general'
+
+
+def per_message_us(fn, items, repeat):
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    return (time.perf_counter() - start) / (repeat * len(items)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default="data/pidgin_dataset.csv")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.csv, 'r', encoding='utf-8') as f:
+        rows = [(row['user_input'], row['category']) for row in csv.DictReader(f)]
+    random.Random(args.seed).shuffle(rows)
+
+    keyword_correct = sum(keyword_intent(q) == label for q, label in rows)
+    classifier_correct = 0
+    for fold in range(args.folds):
+        test = rows[fold::args.folds]
+        train = [row for i, row in enumerate(rows) if i % args.folds != fold]
+        classifier = IntentClassifier(csv_file=args.csv)
+        classifier.fit([q for q, _ in train], [label for _, label in train])
+        classifier_correct += sum(p == label for p, (_, label) in zip(classifier.predict([q for q, _ in test]), test))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        classifier = IntentClassifier(csv_file=args.csv, model_file=f"{tmp}/intent_classifier.pkl")
+        classifier.load()
+        questions = [q for q, _ in rows]
+        classifier.predict_one(questions[0])
+
+        timings = {
+            'keywords': per_message_us(keyword_intent, questions, args.repeat),
+            'classifier (one)': per_message_us(classifier.predict_one, questions, args.repeat),
+        }
+        for size in (8, 64):
+            batches = [questions[i:i + size] for i in range(0, len(questions), size)]
+            per_batch = per_message_us(classifier.predict, batches, args.repeat)
+            timings[f'classifier (batch {size})'] = per_batch * len(batches) / len(questions)
+
+    print("=" * 70)
+    print(f"📊 {len(rows)} labelled questions, {args.folds}-fold held-out accuracy")
+    print(f"  Keyword scoring: {keyword_correct / len(rows):.1%}")
+    print(f"  Classifier:      {classifier_correct / len(rows):.1%}")
+    print(f"\n{'Scorer':<22} {'µs / message':>13}")
+    for name, us in timings.items():
+        print(f"{name:<22} {us:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
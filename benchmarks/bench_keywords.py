@@ -0,0 +1,76 @@
+"""
+Keyword Matching Benchmark
+Per-message cost of the old per-keyword substring scan vs the Aho–Corasick matcher as the keyword set grows
+
+Usage: python benchmarks/bench_keywords.py [--scale 100]
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.fixtures import load_dataset_questions
+from chatbot import PidginChatbot, RuleBasedFallback
+from keyword_matcher import KeywordMatcher
+
+
+def substring_scan(keywords, text):
+    """What detect_intent and RuleBasedFallback used to do: one `in` test per keyword"""
+    return [keyword for keyword in keywords if keyword in text]
+
+
+def synthetic_keywords(count, rng):
+    """Random lowercase words standing in for a larger curriculum vocabulary"""
+    return [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))) for _ in range(count)]
+
+
+def per_message_us(fn, messages, repeat):
+    """Mean microseconds per message"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            fn(message)
+    return (time.perf_counter() - start) / (repeat * len(messages)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, default=100, help="Size multiplier for the large keyword set")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    messages = [question.lower() for question in load_dataset_questions()]
+    base = list(dict.fromkeys(
+        PidginChatbot.math_keywords + PidginChatbot.coding_keywords + list(RuleBasedFallback.RESPONSES)
+    ))
+    large = base + synthetic_keywords(len(base) * (args.scale - 1), rng)
+
+    print("=" * 70)
+    print(f"📊 {len(messages)} dataset questions, mean µs per message")
+    print(f"{'Keywords':>9} {'Substring scan':>15} {'Automaton':>10} {'Build ms':>9}")
+    for keywords in (base, large):
+        start = time.perf_counter()
+        matcher = KeywordMatcher(keywords)
+        build_ms = (time.perf_counter() - start) * 1000
+        scan = per_message_us(lambda text: substring_scan(keywords, text), messages, args.repeat)
+        automaton = per_message_us(matcher.matches, messages, args.repeat)
+        print(f"{len(keywords):>9} {scan:>15.1f} {automaton:>10.1f} {build_ms:>9.1f}")
+
+    print("\nSubstring misfires fixed by word boundaries:")
+    matcher = KeywordMatcher(base)
+    for text in ("wetin be while loop?", "different ways", "wetin be f-string?", "i wan listen",
+                 "wetin be his name?"):
+        old = sorted(set(substring_scan(base, text)) - matcher.matches(text))
+        print(f"  {text!r:<26} no longer matches {old}")
+
+
+if __name__ == "__main__":
+    main()
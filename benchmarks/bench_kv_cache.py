@@ -0,0 +1,62 @@
+"""
+KV Cache Benchmark
+Measures time-to-first-token per turn with and without cross-turn cache reuse
+
+Usage: python benchmarks/bench_kv_cache.py [--model models/fine_tuned_pidgin]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.fixtures import build_tiny_model, load_dataset_questions
+from chatbot import PidginChatbot
+
+
+def time_to_first_token(bot, questions):
+    """Generate a single token per turn so the timing is dominated by prefill"""
+    timings = []
+    for question in questions:
+        start = time.perf_counter()
+        bot.generate_response(question, max_length=1)
+        timings.append((time.perf_counter() - start) * 1000)
+        # Store a realistic answer so history grows like a real chat
+        bot.conversation_history[-1]['bot'] = "Make I explain am small small. " * 4
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=None, help="Model directory (default: tiny random GPT-2 fixture)")
+    parser.add_argument('--turns', type=int, default=10)
+    args = parser.parse_args()
+
+    model_path = args.model or build_tiny_model()
+    questions = load_dataset_questions()[:args.turns]
+
+    baseline = PidginChatbot(model_path)
+    if not baseline.model_loaded:
+        print(f"❌ Could not load model from {model_path}")
+        return
+    cached = PidginChatbot(model_path, use_kv_cache=True)
+
+    # Warm up kernels and allocator so turn 1 is comparable
+    for bot in (baseline, cached):
+        bot.generate_response(questions[0], max_length=1)
+        bot.clear_history()
+
+    plain = time_to_first_token(baseline, questions)
+    reused = time_to_first_token(cached, questions)
+
+    print("=" * 70)
+    print(f"{'Turn':>4}  {'Re-encode (ms)':>15}  {'KV reuse (ms)':>14}")
+    for turn, (a, b) in enumerate(zip(plain, reused), start=1):
+        print(f"{turn:>4}  {a:>15.2f}  {b:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
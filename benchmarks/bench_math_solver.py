@@ -0,0 +1,70 @@
+"""
+Math Solver Benchmark
+Coverage, agreement with the dataset answers and latency of the exact math tier
+
+Usage: python benchmarks/bench_math_solver.py
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.fixtures import load_dataset_pairs
+from math_solver import MathSolver
+
+# Word problems and concept questions that the solver must leave to other tiers
+EXTRA_QUESTIONS = [
+    "Solve 2x + 5 = 15", "3(x - 2) = 2x + 4", "Calculate 12 + 3 × (4 - 1)", "Wetin be 7/21?",
+    "Divide 100 by 7", "Calculate 15% of 80", "x/2 = 7", "How I go multiply 1/2 × 3/4?",
+    "x = 5", "-x + 5 = 10", "1/2 = 1/2", "x + 1 = x + 2", "((((1))))", "-(-3)", "10/3",
+]
+
+
+def first_result(text):
+    """The number right after the first '=' in an answer"""
+    match = re.search(r'=\s*(-?\d+(?:\.\d+)?(?:/\d+)?)', text)
+    return match.group(1) if match else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200, help="Timing repetitions per question")
+    args = parser.parse_args()
+
+    solver = MathSolver()
+    pairs = load_dataset_pairs()
+
+    answered = agreed = 0
+    for question, expected in pairs:
+        answer = solver.answer(question)
+        if answer is None:
+            continue
+        answered += 1
+        agreed += first_result(answer) == first_result(expected)
+
+    questions = [q for q, _ in pairs] + EXTRA_QUESTIONS
+    timings = {'solved': [], 'declined': []}
+    for question in questions:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            answer = solver.answer(question)
+        elapsed = (time.perf_counter() - start) / args.repeat * 1e6
+        timings['solved' if answer is not None else 'declined'].append(elapsed)
+
+    print("=" * 70)
+    print(f"📊 {len(pairs)} dataset questions + {len(EXTRA_QUESTIONS)} extra (equations, brackets, remainders, trivial equations)")
+    print(f"  Dataset questions solved: {answered} ({answered / len(pairs):.0%})")
+    print(f"  Same result as the dataset answer: {agreed}/{answered}")
+    for outcome, values in timings.items():
+        if values:
+            print(f"  {outcome.capitalize():<9} mean {sum(values) / len(values):7.1f}µs  max {max(values):7.1f}µs "
+                  f"({len(values)} questions)")
+
+
+if __name__ == "__main__":
+    main()
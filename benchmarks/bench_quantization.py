@@ -0,0 +1,124 @@
+"""
+Quantization Benchmark
+Compares fp32 and dynamic int8 inference: tokens/sec, resident memory and response drift
+
+Each mode runs in its own subprocess so resident memory is measured in isolation.
+
+Usage: python benchmarks/bench_quantization.py [--model models/fine_tuned_pidgin]
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(model_path, quantize, prompts, max_new_tokens):
+    """Load one variant, decode every prompt greedily and report timings and outputs"""
+    import torch
+    from chatbot import load_shared_model, shared_model_memory
+
+    torch.set_num_threads(1)
+    tokenizer, model = load_shared_model(model_path, quantize)
+    rss_loaded = current_rss_mb()
+
+    outputs = []
+    new_tokens = 0
+    start = time.perf_counter()
+    for prompt in prompts:
+        input_ids = torch.tensor([tokenizer.encode(f"<|user|> {prompt} <|bot|>")])
+        with torch.no_grad():
+            output = model.generate(
+                input_ids,
+                max_new_tokens=max_new_tokens,
+                do_sample=False,
+                pad_token_id=tokenizer.eos_token_id
+            )
+        generated = output[0, input_ids.shape[1]:].tolist()
+        new_tokens += len(generated)
+        outputs.append(generated)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'tokens_per_sec': new_tokens / elapsed,
+        'weight_mb': shared_model_memory() / 1024 / 1024,
+        'rss_loaded_mb': rss_loaded,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'outputs': outputs,
+    }
+
+
+def drift(reference, candidate):
+    """Exact-match rate and mean shared-prefix fraction between greedy outputs"""
+    exact = 0
+    prefix_fractions = []
+    for a, b in zip(reference, candidate):
+        exact += a == b
+        shared = 0
+        for x, y in zip(a, b):
+            if x != y:
+                break
+            shared += 1
+        prefix_fractions.append(shared / max(len(a), 1))
+    return exact / len(reference), sum(prefix_fractions) / len(prefix_fractions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=None, help="Model directory (default: tiny random GPT-2 fixture)")
+    parser.add_argument('--prompts', type=int, default=40)
+    parser.add_argument('--max-new-tokens', type=int, default=40)
+    parser.add_argument('--worker', choices=['fp32', 'int8'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    from benchmarks.fixtures import build_tiny_model, load_dataset_questions
+
+    model_path = args.model or build_tiny_model()
+    prompts = load_dataset_questions()[:args.prompts]
+
+    if args.worker:
+        result = run_worker(model_path, args.worker == 'int8', prompts, args.max_new_tokens)
+        print(json.dumps(result))
+        return
+
+    results = {}
+    for mode in ('fp32', 'int8'):
+        completed = subprocess.run(
+            [sys.executable, __file__, '--worker', mode, '--model', model_path,
+             '--prompts', str(args.prompts), '--max-new-tokens', str(args.max_new_tokens)],
+            capture_output=True, text=True, check=True
+        )
+        results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    exact, prefix = drift(results['fp32']['outputs'], results['int8']['outputs'])
+
+    print("=" * 70)
+    print(f"📊 {len(prompts)} dataset prompts, {args.max_new_tokens} greedy tokens each, 1 thread")
+    print(f"{'Mode':<6} {'Tokens/s':>10} {'Weights MB':>11} {'RSS MB':>8} {'Peak RSS MB':>12}")
+    for mode, result in results.items():
+        print(f"{mode:<6} {result['tokens_per_sec']:>10.1f} {result['weight_mb']:>11.1f} "
+              f"{result['rss_loaded_mb']:>8.1f} {result['peak_rss_mb']:>12.1f}")
+    print(f"Speedup: {results['int8']['tokens_per_sec'] / results['fp32']['tokens_per_sec']:.2f}x")
+    print(f"Drift: {exact:.0%} identical answers, {prefix:.0%} mean shared prefix")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Retrieval Benchmark
+Compares the TF-IDF retrieval tier with RuleBasedFallback on perturbed dataset questions
+
+Recall and precision come from perturbed dataset questions; a negative set of
+questions the dataset does not answer (often spelled almost like one that it
+does) counts how many get a wrong stored answer instead of reaching the model.
+
+Usage: python benchmarks/bench_retrieval.py [--threshold 0.6]
+"""
+
+import argparse
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.fixtures import load_dataset_pairs
+from chatbot import RuleBasedFallback
+from retrieval import RetrievalIndex
+
+# Not answered by any dataset question, but close to one in spelling
+NEGATIVES = [
+    "How I go write function for JavaScript?", "Wetin be string?", "How I go divide fraction?",
+    "Wetin be list for JavaScript?", "How I go write loop for Java?", "Wetin be variable for algebra?",
+    "How I go subtract fraction?", "Wetin be dictionary for English?", "How I go remove from dictionary?",
+    "Wetin be geometry?", "Why I go learn algebra?", "How I go start learn JavaScript?",
+    "Wetin be data science?", "Show me JavaScript example", "How I go use print for Java?",
+    "Wetin be decimal point?", "Wetin be return on investment?", "How I go add to dictionary?",
+    "Wetin be programming language?", "Wetin be comment for essay?",
+]
+
+
+def perturb(question, rng):
+    """Variants a learner might type instead of the exact dataset question"""
+    words = question.split()
+    position = rng.randrange(max(1, len(question) - 1))
+    return {
+        'exact': question,
+        'casual': re.sub(r'[^\w\s+\-×÷*/]', '', question.lower()),
+        'truncated': ' '.join(words[:-1]) if len(words) > 3 else question,
+        'typo': question[:position] + question[position + 1:position + 2]
+                + question[position:position + 1] + question[position + 2:],
+    }
+
+
+def timed(fn, text):
+    """Call fn(text) and return (result, milliseconds)"""
+    start = time.perf_counter()
+    result = fn(text)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threshold', type=float, default=0.6)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pairs = load_dataset_pairs()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        retrieval = RetrievalIndex(index_file=f"{tmp}/retrieval_index.pkl", threshold=args.threshold)
+        start = time.perf_counter()
+        retrieval.build()
+        build_ms = (time.perf_counter() - start) * 1000
+        retrieval.load()
+
+        print("=" * 70)
+        print(f"📊 {len(pairs)} dataset questions, threshold {args.threshold}, index build {build_ms:.1f}ms")
+        print(f"{'Variant':<10} {'Tier':<10} {'Answered':>9} {'Correct':>8} {'Precision':>9} {'Mean ms':>8} "
+              f"{'Max ms':>8}")
+
+        for variant in ('exact', 'casual', 'truncated', 'typo'):
+            questions = [(perturb(q, rng)[variant], a) for q, a in pairs]
+            for name, fn in (('rules', RuleBasedFallback.get_response), ('retrieval', retrieval.answer)):
+                answered = correct = 0
+                timings = []
+                for question, expected in questions:
+                    result, ms = timed(fn, question)
+                    timings.append(ms)
+                    answered += result is not None
+                    correct += result == expected
+                precision = correct / answered if answered else 1.0
+                print(f"{variant:<10} {name:<10} {answered / len(questions):>9.0%} "
+                      f"{correct / len(questions):>8.0%} {precision:>9.0%} "
+                      f"{sum(timings) / len(timings):>8.3f} {max(timings):>8.3f}")
+
+        wrong = [(question, retrieval.query(question)) for question in NEGATIVES if retrieval.answer(question)]
+        print(f"\nNegative set: {len(wrong)}/{len(NEGATIVES)} out-of-dataset questions got a stored answer")
+        for question, (_, score, matched) in wrong:
+            print(f"  {question!r} -> {matched!r} ({score:.2f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Session Memory Benchmark
+Simulates many Telegram users and checks that session memory stays flat once the cap is reached
+
+Usage: python benchmarks/bench_sessions.py [--users 100000] [--max-sessions 10000]
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.fixtures import load_dataset_questions
+from chatbot import PidginChatbot
+from sessions import SessionManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--messages-per-user', type=int, default=3)
+    parser.add_argument('--max-sessions', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    questions = load_dataset_questions()
+    # Rule-based answers keep the run about session state, not model speed
+    chatbot = PidginChatbot("models/__rule_based_only__")
+    sessions = SessionManager(max_sessions=args.max_sessions)
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    checkpoints = sorted({args.users // 10, args.users // 4, args.users // 2, args.users})
+
+    print("=" * 70)
+    print(f"📊 {args.users} users x {args.messages_per_user} messages, cap {args.max_sessions} sessions")
+    print(f"{'Users':>8} {'Active':>8} {'Traced MB':>10} {'Peak MB':>9} {'Msg/s':>9}")
+
+    start = time.perf_counter()
+    for user_id in range(1, args.users + 1):
+        session = sessions.get(user_id, f"user{user_id}")
+        for _ in range(args.messages_per_user):
+            chatbot.generate_response(rng.choice(questions), conversation=session)
+            session.message_count += 1
+
+        if user_id in checkpoints:
+            current, peak = tracemalloc.get_traced_memory()
+            rate = user_id * args.messages_per_user / (time.perf_counter() - start)
+            print(f"{user_id:>8} {len(sessions):>8} {(current - baseline) / 1024 / 1024:>10.1f} "
+                  f"{(peak - baseline) / 1024 / 1024:>9.1f} {rate:>9.0f}")
+
+    print(f"Stats: {sessions.get_stats()}")
+    print(f"Shared chatbot history length: {len(chatbot.conversation_history)}")
+
+
+if __name__ == "__main__":
+    main()
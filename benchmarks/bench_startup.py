@@ -0,0 +1,112 @@
+"""
+Startup Benchmark
+Measures cold-start import time, first-response latency and resident memory
+for the rule-only deployment (no model directory) and the model deployment
+
+Each run is a fresh subprocess so nothing is already imported or cached.
+
+Usage: python benchmarks/bench_startup.py [--model models/fine_tuned_pidgin] [--runs 3]
+"""
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.bench_quantization import current_rss_mb
+
+
+def peak_rss_mb():
+    """Peak resident set size since exec in MB
+
+    ru_maxrss would also count the parent's memory copied at fork time.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(model_path):
+    """Import the engine, build a chatbot and answer once, timing each step"""
+    start = time.perf_counter()
+    import chatbot
+    imported = time.perf_counter()
+
+    bot = chatbot.PidginChatbot(model_path)
+    ready = time.perf_counter()
+
+    # Not a confident rule match, so the model answers when it is loaded
+    bot.generate_response("Wetin be Python?", max_length=8)
+    answered = time.perf_counter()
+
+    return {
+        'import_ms': (imported - start) * 1000,
+        'init_ms': (ready - imported) * 1000,
+        'first_response_ms': (answered - ready) * 1000,
+        'model_loaded': bot.model_loaded,
+        'torch_imported': 'torch' in sys.modules,
+        'rss_mb': current_rss_mb(),
+        'tier': bot.last_tier,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=None, help="Model directory (default: tiny random GPT-2 fixture)")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--worker', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker)))
+        return
+
+    from benchmarks.fixtures import build_tiny_model
+
+    modes = {
+        'rules': "models/__no_model__",
+        'model': args.model or build_tiny_model(),
+    }
+
+    results = {}
+    for mode, model_path in modes.items():
+        runs = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            completed = subprocess.run(
+                [sys.executable, __file__, '--worker', model_path],
+                capture_output=True, text=True, check=True
+            )
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            result['process_ms'] = (time.perf_counter() - start) * 1000
+            runs.append(result)
+        results[mode] = runs
+
+    print("=" * 70)
+    print(f"📊 Cold start, median of {args.runs} fresh processes")
+    print(f"{'Mode':<6} {'Import ms':>10} {'Init ms':>9} {'1st reply ms':>13} {'Process ms':>11} "
+          f"{'RSS MB':>8} {'Peak MB':>8}  torch")
+    for mode, runs in results.items():
+        median = {key: statistics.median(run[key] for run in runs)
+                  for key in ('import_ms', 'init_ms', 'first_response_ms', 'process_ms', 'rss_mb', 'peak_rss_mb')}
+        print(f"{mode:<6} {median['import_ms']:>10.1f} {median['init_ms']:>9.1f} "
+              f"{median['first_response_ms']:>13.1f} {median['process_ms']:>11.1f} "
+              f"{median['rss_mb']:>8.1f} {median['peak_rss_mb']:>8.1f}  "
+              f"{'yes' if runs[0]['torch_imported'] else 'no'} ({runs[0]['tier']} tier)")
+
+
+if __name__ == "__main__":
+    main()
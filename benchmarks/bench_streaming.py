@@ -0,0 +1,104 @@
+"""
+Streaming Cleaner Benchmark
+Checks that streamed answers end up identical to clean_response on fuzzed model output, and times both
+
+Each fuzzed output mixes dataset answer text with stray punctuation, runs of
+whitespace, turn markers and answers past the 300-character budget, and is
+split into random chunks the way TextIteratorStreamer hands out decoded text.
+Exits with status 1 if any streamed answer differs.
+
+Usage: python benchmarks/bench_streaming.py [--cases 2000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.fixtures import load_dataset_pairs
+from chatbot import PidginChatbot, StreamCleaner
+
+NOISE = [' ', '  ', '\n', '\n\n', '\t', '.', '!', '?', '...', ' .', ', ', '<', '<|', '<|bot|>', '<|user|>',
+         '<|endoftext|>', '<|us', 'er|>']
+
+
+def fuzzed_output(rng, words, with_markers):
+    """Random model-like output, sometimes longer than clean_response keeps"""
+    pieces = []
+    for _ in range(rng.randint(1, 120)):
+        if rng.random() < 0.3:
+            noise = rng.choice(NOISE)
+            if with_markers or '<' not in noise:
+                pieces.append(noise)
+        else:
+            pieces.append(rng.choice(words) + rng.choice([' ', '', '. ', '! ']))
+    return ''.join(pieces)
+
+
+def chunked(rng, text):
+    """text cut at random points into the pieces a streamer would yield"""
+    cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(0, 40)))) if len(text) > 1 else []
+    return [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+
+def stream(chunks):
+    """What stream_response shows, joined"""
+    cleaner = StreamCleaner()
+    shown = ""
+    for chunk in chunks:
+        shown += cleaner.feed(chunk)
+        if cleaner.done:
+            break
+    return shown + cleaner.finish()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', type=int, default=2000, help="Fuzzed outputs per marker setting")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = [word for _, answer in load_dataset_pairs() for word in answer.split()]
+
+    print("=" * 70)
+    print(f"📊 {args.cases} fuzzed outputs each without and with turn markers")
+    failures = []
+    for with_markers in (False, True):
+        cases = [fuzzed_output(rng, words, with_markers) for _ in range(args.cases)]
+        splits = [chunked(rng, text) for text in cases]
+        mismatches = 0
+        for text, chunks in zip(cases, splits):
+            expected = PidginChatbot.clean_response(text)
+            if stream(chunks) != expected:
+                mismatches += 1
+                failures.append((text, chunks))
+
+        start = time.perf_counter()
+        for text in cases:
+            PidginChatbot.clean_response(text)
+        whole_us = (time.perf_counter() - start) / len(cases) * 1e6
+        start = time.perf_counter()
+        for chunks in splits:
+            stream(chunks)
+        streamed_us = (time.perf_counter() - start) / len(cases) * 1e6
+
+        label = "with markers" if with_markers else "no markers"
+        print(f"  {label:<13} streamed != clean_response: {mismatches}/{len(cases)}   "
+              f"clean_response {whole_us:.1f} µs, StreamCleaner {streamed_us:.1f} µs per answer")
+
+    if failures:
+        text, chunks = failures[0]
+        print(f"\n❌ First mismatch, chunks {chunks!r}")
+        print(f"  clean_response: {PidginChatbot.clean_response(text)!r}")
+        print(f"  streamed:       {stream(chunks)!r}")
+        sys.exit(1)
+    print("✅ Streamed answers match clean_response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Telegram Load Benchmark
+Replays questions and button clicks from many simulated users through the Telegram handlers
+
+Updates are real python-telegram-bot Update objects bound to a stand-in Bot
+whose API methods (sendMessage, editMessageText, answerCallbackQuery,
+sendChatAction) only sleep for a simulated round trip, so handle_message and
+button_callback run exactly as they would under Application.run_polling with
+concurrent updates, without a token or network.
+
+Updates arrive open-loop (Poisson, --rate per second) from --users users, at
+most --concurrency in flight, like Application(concurrent_updates=N). Dataset
+questions are all answered by the retrieval, math and rules tiers, so
+--open-ratio of the messages are new questions made of dataset words, which
+mostly only the model can answer; they are what exercise admission, the
+inference workers and generation. Reported:
+    latency     arrival to handler return, per update kind (includes waiting for a slot)
+    loop lag    how late a 10 ms asyncio.sleep wakes up while the load runs
+    errors      handler exceptions plus "Sorry, I get small problem" replies
+    tiers       which tier answered the messages, from the shared router
+
+Admission, batching and cache settings come from the same PIDGIN_* variables as
+the bot. The model is the tiny random GPT-2 fixture unless --model or --rule-based.
+
+Usage: python benchmarks/bench_telegram_load.py [--users 2000] [--updates 5000] [--rate 200] [--open-ratio 0.5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.fixtures import build_tiny_model, load_dataset_questions
+from benchmarks.run_benchmarks import percentile
+import telegram_bot
+
+OPEN_TEMPLATES = ["Tell me story about {0} and {1}", "Wetin you think about {0} {1}?", "Why {0} dey {1} {2}?",
+                  "Abeg explain how {0} take {1} {2}"]
+CALLBACK_DATA = ['topic_math', 'topic_coding', 'help', 'feedback_1', 'feedback_3', 'feedback_5',
+                 'quick_good', 'quick_bad']
+ERROR_REPLY = "Sorry, I get small problem"
+
+if telegram_bot.TELEGRAM_AVAILABLE:
+    from telegram import Bot, Update
+
+    class LoadTestBot(Bot):
+        """Bot whose API calls sleep for a simulated round trip instead of calling Telegram"""
+
+        def __init__(self, api_ms=50, seed=0):
+            super().__init__("0:load-test")
+            # Telegram objects are frozen after __init__; this is how PTB subclasses add attributes
+            with self._unfrozen():
+                self.api_ms = api_ms
+                self.rng = random.Random(seed)
+                self.calls = {}
+                self.error_replies = 0
+
+        async def _round_trip(self, method):
+            self.calls[method] = self.calls.get(method, 0) + 1
+            if self.api_ms:
+                # Uniform jitter of +/-50% around the configured round trip
+                await asyncio.sleep(self.api_ms * self.rng.uniform(0.5, 1.5) / 1000)
+
+        async def send_message(self, chat_id, text, *args, **kwargs):
+            if text.startswith(ERROR_REPLY):
+                with self._unfrozen():
+                    self.error_replies += 1
+            await self._round_trip('sendMessage')
+
+        async def edit_message_text(self, text, *args, **kwargs):
+            await self._round_trip('editMessageText')
+
+        async def answer_callback_query(self, callback_query_id, *args, **kwargs):
+            await self._round_trip('answerCallbackQuery')
+
+        async def send_chat_action(self, chat_id, action, *args, **kwargs):
+            await self._round_trip('sendChatAction')
+
+
+class LoadTestContext:
+    """The part of CallbackContext the handlers use"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+
+def message_update(bot, update_id, user_id, text):
+    """A private-chat text message Update from user_id"""
+    user = {'id': user_id, 'is_bot': False, 'first_name': f"user{user_id}"}
+    return Update.de_json({
+        'update_id': update_id,
+        'message': {'message_id': update_id, 'date': int(time.time()), 'text': text, 'from': user,
+                    'chat': {'id': user_id, 'type': 'private'}}
+    }, bot)
+
+
+def callback_update(bot, update_id, user_id, data):
+    """A button click Update on an earlier bot message in user_id's chat"""
+    user = {'id': user_id, 'is_bot': False, 'first_name': f"user{user_id}"}
+    return Update.de_json({
+        'update_id': update_id,
+        'callback_query': {'id': str(update_id), 'chat_instance': str(user_id), 'data': data, 'from': user,
+                           'message': {'message_id': update_id, 'date': int(time.time()), 'text': "menu",
+                                       'chat': {'id': user_id, 'type': 'private'}}}
+    }, bot)
+
+
+def open_questions(questions, count, rng):
+    """New questions from dataset words, which retrieval, math and rules mostly leave to the model"""
+    words = sorted({word.strip('?.,!').lower() for question in questions for word in question.split()} - {''})
+    return [rng.choice(OPEN_TEMPLATES).format(*rng.sample(words, 3)) for _ in range(count)]
+
+
+def summarize_ms(samples):
+    """count, p50/p95/p99/max in ms for durations in seconds"""
+    if not samples:
+        return {'n': 0}
+    ordered = sorted(samples)
+    return {
+        'n': len(samples),
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p95_ms': percentile(ordered, 95) * 1000,
+        'p99_ms': percentile(ordered, 99) * 1000,
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+async def probe_loop_lag(samples, stop, interval=0.01):
+    """Record how much later than requested each sleep(interval) wakes up"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - start - interval))
+
+
+async def run_load(args, questions, open_prompts):
+    """Fire the configured mix of updates and collect per-update outcomes"""
+    rng = random.Random(args.seed)
+    bot = LoadTestBot(args.api_ms, args.seed)
+    context = LoadTestContext(bot)
+    slots = asyncio.Semaphore(args.concurrency)
+    latencies = {'message': [], 'callback': []}
+    exceptions = {'message': 0, 'callback': 0}
+    lag = []
+    stop = asyncio.Event()
+
+    async def process(kind, update, arrived):
+        handler = telegram_bot.handle_message if kind == 'message' else telegram_bot.button_callback
+        async with slots:
+            try:
+                await handler(update, context)
+            except Exception:
+                exceptions[kind] += 1
+        latencies[kind].append(time.perf_counter() - arrived)
+
+    probe = asyncio.create_task(probe_loop_lag(lag, stop))
+    tasks = []
+    start = time.perf_counter()
+    next_arrival = start
+    for update_id in range(1, args.updates + 1):
+        if args.rate:
+            next_arrival += rng.expovariate(args.rate)
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        user_id = rng.randint(1, args.users)
+        if rng.random() < args.callback_ratio:
+            kind, update = 'callback', callback_update(bot, update_id, user_id, rng.choice(CALLBACK_DATA))
+        else:
+            pool = open_prompts if rng.random() < args.open_ratio else questions
+            kind, update = 'message', message_update(bot, update_id, user_id, rng.choice(pool))
+        tasks.append(asyncio.create_task(process(kind, update, time.perf_counter())))
+
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+
+    all_latencies = latencies['message'] + latencies['callback']
+    errors = sum(exceptions.values()) + bot.error_replies
+    return {
+        'updates': args.updates,
+        'elapsed_s': elapsed,
+        'throughput_per_s': args.updates / elapsed,
+        'latency': {'all': summarize_ms(all_latencies),
+                    'message': summarize_ms(latencies['message']),
+                    'callback': summarize_ms(latencies['callback'])},
+        'loop_lag': summarize_ms(lag),
+        'exceptions': exceptions,
+        'error_replies': bot.error_replies,
+        'error_rate': errors / args.updates,
+        'api_calls': bot.calls,
+    }
+
+
+def print_report(report):
+    print("=" * 70)
+    print(f"📊 {report['updates']} updates from {report['users']} users in {report['elapsed_s']:.1f}s "
+          f"({report['throughput_per_s']:.0f}/s, target {report['rate'] or 'unpaced'}), "
+          f"mode {report['mode']}")
+    print(f"{'Latency':<12} {'N':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    rows = [(kind, stats) for kind, stats in report['latency'].items()] + [('loop lag', report['loop_lag'])]
+    for name, stats in rows:
+        if stats['n']:
+            print(f"{name:<12} {stats['n']:>7} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} "
+                  f"{stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}")
+    print(f"Errors: {report['error_rate']:.2%} (exceptions {report['exceptions']}, "
+          f"error replies {report['error_replies']})")
+    print(f"API calls: {report['api_calls']}")
+    tiers = report['tiers']
+    served = sum(tiers.values())
+    if served:
+        print("Tiers: " + ", ".join(f"{name} {count} ({count / served:.0%})" for name, count in tiers.items()))
+    print(f"Inference: {report['inference']}")
+    if report['admission']:
+        admission = report['admission']
+        print(f"Admission: admitted {admission['admitted']}, shed {admission['shed']} "
+              f"({admission['shed_rate']:.1%}), max wait {admission['max_wait_ms']:.0f} ms")
+    print(f"Sessions: {report['sessions']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--updates', type=int, default=5000)
+    parser.add_argument('--rate', type=float, default=200, help="Mean arrivals per second (0: all at once)")
+    parser.add_argument('--concurrency', type=int, default=256, help="Updates handled at once")
+    parser.add_argument('--callback-ratio', type=float, default=0.2, help="Share of updates that are button clicks")
+    parser.add_argument('--open-ratio', type=float, default=0.5,
+                        help="Share of messages that are new questions rather than dataset ones (reach the model)")
+    parser.add_argument('--api-ms', type=float, default=50, help="Simulated Bot API round trip")
+    parser.add_argument('--model', default=None, help="Model directory (default: tiny random GPT-2 fixture)")
+    parser.add_argument('--rule-based', action='store_true', help="Answer without a model, as when none loads")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="Print only the JSON report")
+    args = parser.parse_args()
+
+    if not telegram_bot.TELEGRAM_AVAILABLE:
+        print("❌ python-telegram-bot is required: pip install python-telegram-bot")
+        sys.exit(1)
+
+    if args.rule_based:
+        telegram_bot.MODEL_LOADED = False
+        mode = "rule-based"
+    else:
+        # Every message gets its own chatbot over the bot's shared components, pointed at the benchmark model
+        telegram_bot.model_client = None
+        telegram_bot.chatbot_settings.update(model_path=args.model or build_tiny_model(), background_load=False)
+        telegram_bot.chatbot = telegram_bot.new_chatbot()
+        telegram_bot.MODEL_LOADED = True
+        mode = telegram_bot.chatbot.model_status
+
+    with tempfile.TemporaryDirectory(prefix="pidgin_load_") as workdir:
+        # Feedback clicks append to a throwaway file, not data/telegram_feedback.json
+        telegram_bot.FEEDBACK_FILE = os.path.join(workdir, "telegram_feedback.json")
+        questions = load_dataset_questions()
+        open_prompts = open_questions(questions, 500, random.Random(args.seed))
+        report = asyncio.run(run_load(args, questions, open_prompts))
+
+    report.update({
+        'users': args.users,
+        'rate': args.rate,
+        'concurrency': args.concurrency,
+        'callback_ratio': args.callback_ratio,
+        'open_ratio': args.open_ratio,
+        'api_ms': args.api_ms,
+        'mode': mode,
+        'tiers': {name: tier['served'] for name, tier in telegram_bot.router.get_stats()['tiers'].items()
+                  if tier['served']},
+        'inference': telegram_bot.inference.get_stats(),
+        'admission': telegram_bot.admission.get_stats() if telegram_bot.admission is not None else None,
+        'sessions': telegram_bot.sessions.get_stats(),
+    })
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
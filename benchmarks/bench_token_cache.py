@@ -0,0 +1,88 @@
+"""
+Token Cache Benchmark
+Checks that the chunked token cache matches tokenizing the whole file at once, and times both
+
+The corpus is the training format with multi-line answers (blank lines,
+indented lines, trailing spaces) and the tokenizer is the fixture's byte-level
+GPT-2 retrained with merges, so whitespace runs such as a blank line become
+single tokens the way they do in GPT-2. The cache is built at several chunk
+sizes; exits with status 1 if any differs from the whole-file encoding.
+
+Usage: python benchmarks/bench_token_cache.py [--conversations 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.fixtures import build_tiny_model, load_dataset_pairs
+from token_cache import CHUNK_CHARS, build_token_cache
+
+LINE_BREAKS = ["\n", "\n\n", "\n\n\n", "\n    ", "  \n", " \n\n"]
+
+
+def multiline_corpus(pairs, count, rng):
+    """Training-format conversations whose answers are split over several lines"""
+    conversations = []
+    for _ in range(count):
+        question, answer = rng.choice(pairs)
+        words = answer.split()
+        for _ in range(rng.randint(0, 3)):
+            cut = rng.randint(1, len(words))
+            words[cut - 1] += rng.choice(LINE_BREAKS)
+        conversations.append(f"<|user|> {question} <|bot|> {' '.join(words)} <|endoftext|>\n")
+    return "".join(conversations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--conversations', type=int, default=2000)
+    parser.add_argument('--vocab-size', type=int, default=1000, help="Vocabulary of the retrained tokenizer")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    from transformers import AutoTokenizer
+
+    rng = random.Random(args.seed)
+    text = multiline_corpus(load_dataset_pairs(), args.conversations, rng)
+    tokenizer = AutoTokenizer.from_pretrained(build_tiny_model())
+    tokenizer = tokenizer.train_new_from_iterator([text], vocab_size=args.vocab_size)
+
+    start = time.perf_counter()
+    whole = tokenizer.encode(text, add_special_tokens=False)
+    whole_ms = (time.perf_counter() - start) * 1000
+
+    print("=" * 70)
+    print(f"📊 {args.conversations} multi-line conversations, {len(text)} characters, {len(whole)} tokens")
+    print(f"  whole file       {whole_ms:>8.1f} ms")
+    mismatches = 0
+    with tempfile.TemporaryDirectory(prefix="pidgin_tokens_") as workdir:
+        path = os.path.join(workdir, "training_data.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        for chunk_chars in (256, 4096, CHUNK_CHARS):
+            cache_dir = os.path.join(workdir, str(chunk_chars))
+            start = time.perf_counter()
+            meta = build_token_cache(path, tokenizer, cache_dir, chunk_chars)
+            build_ms = (time.perf_counter() - start) * 1000
+            cached = np.fromfile(meta['path'], dtype=meta['dtype'])
+            same = len(cached) == len(whole) and bool((cached == np.asarray(whole)).all())
+            mismatches += not same
+            print(f"  {chunk_chars:>6}-char chunks {build_ms:>8.1f} ms  {len(cached)} tokens  "
+                  f"{'✅ same as whole file' if same else '❌ differs from whole file'}")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark Fixtures
+Builds a tiny randomly initialized GPT-2 so benchmarks run offline without a trained checkpoint
+"""
+
+import json
+import os
+
+import torch
+from transformers import GPT2Config, GPT2LMHeadModel, GPT2Tokenizer
+from transformers.models.gpt2.tokenization_gpt2 import bytes_to_unicode
+
+DEFAULT_FIXTURE_DIR = "models/tiny_random_gpt2"
+
+
+def build_tiny_model(output_dir=DEFAULT_FIXTURE_DIR, n_layer=2, n_head=2, n_embd=64, seed=0):
+    """Save a byte-level GPT-2 tokenizer and a tiny random model to output_dir"""
+    if os.path.exists(os.path.join(output_dir, "config.json")):
+        return output_dir
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    # One token per byte (no merges) plus the end-of-text marker
+    vocab = {char: index for index, char in enumerate(bytes_to_unicode().values())}
+    vocab['<|endoftext|>'] = len(vocab)
+
+    vocab_file = os.path.join(output_dir, "vocab.json")
+    merges_file = os.path.join(output_dir, "merges.txt")
+    with open(vocab_file, 'w', encoding='utf-8') as f:
+        json.dump(vocab, f)
+    with open(merges_file, 'w', encoding='utf-8') as f:
+        f.write("#version: 0.2\n")
+
+    tokenizer = GPT2Tokenizer(vocab_file, merges_file)
+    tokenizer.save_pretrained(output_dir)
+
+    torch.manual_seed(seed)
+    config = GPT2Config(
+        vocab_size=len(vocab),
+        n_positions=1024,
+        n_embd=n_embd,
+        n_layer=n_layer,
+        n_head=n_head,
+        bos_token_id=vocab['<|endoftext|>'],
+        eos_token_id=vocab['<|endoftext|>']
+    )
+    GPT2LMHeadModel(config).save_pretrained(output_dir)
+    return output_dir
+
+
+def load_dataset_questions(json_file="data/pidgin_dataset.json"):
+    """Return the user_input column of the curated dataset"""
+    with open(json_file, 'r', encoding='utf-8') as f:
+        return [row['user_input'] for row in json.load(f)]
+
+
+def load_dataset_pairs(json_file="data/pidgin_dataset.json"):
+    """Return (user_input, bot_response) pairs from the curated dataset"""
+    with open(json_file, 'r', encoding='utf-8') as f:
+        return [(row['user_input'], row['bot_response']) for row in json.load(f)]
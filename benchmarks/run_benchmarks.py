@@ -0,0 +1,455 @@
+"""
+Benchmark Suite
+Latency percentiles, tokens/sec and peak memory for the chatbot hot paths, as JSON
+
+Runs offline: the model cases use the tiny random GPT-2 fixture (or --model)
+and reseed torch before every generation so runs are comparable. torch uses
+one thread unless PIDGIN_BENCH_THREADS says otherwise, and the script re-executes
+itself with a fixed PYTHONHASHSEED, since hash randomization alone moves the
+dict-heavy paths by up to 2x between processes.
+
+Each case also records calibration_ms, a fixed pure-Python workload timed just
+before it, so comparisons can cancel out machine-speed drift between runs.
+
+Cases:
+    detect_intent              keyword scoring (per-message cache cleared)
+    detect_intent_classifier   trained intent classifier
+    rule_fallback              RuleBasedFallback.get_response (cache cleared)
+    build_prompt               prompt token ids with 3 exchanges of history
+    clean_response             post-processing of raw model output
+    generate_response          full tiered answer for every dataset question
+    generate_response_model    full answer for questions only the model can answer
+    train_prepare_data         PidginModelTrainer.prepare_training_data (CSV to training text)
+    train_create_dataset       PidginModelTrainer.create_dataset from scratch (tokenize into blocks)
+    train_load_dataset         PidginModelTrainer.create_dataset when its on-disk cache exists
+    train_stream_dataset       create_dataset from scratch on a corpus 100x the dataset (watch peak RSS)
+    train_step                 one forward/backward/optimizer step on a collated batch
+
+Every run is appended to benchmarks/results/history.jsonl, keyed by git
+revision and machine fingerprint; compare runs with bench_history.py.
+
+Usage: python benchmarks/run_benchmarks.py [--output results.json] [--cases detect_intent,build_prompt]
+"""
+
+import argparse
+import contextlib
+import glob
+import hashlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.bench_history import DEFAULT_HISTORY, append_history
+from benchmarks.bench_startup import peak_rss_mb
+from benchmarks.fixtures import build_tiny_model, load_dataset_pairs
+from chatbot import PidginChatbot, RuleBasedFallback, scan_keywords
+from intent_classifier import IntentClassifier
+from sessions import Session
+
+
+def percentile(sorted_samples, q):
+    """Linearly interpolated percentile (q in 0..100) of an already sorted list"""
+    if len(sorted_samples) == 1:
+        return sorted_samples[0]
+    position = (len(sorted_samples) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (position - lower)
+
+
+def summarize(samples, tokens=None):
+    """Latency summary in ms for per-call durations in seconds; tokens/sec when tokens are given"""
+    ordered = sorted(samples)
+    result = {
+        'n': len(samples),
+        'mean_ms': sum(samples) / len(samples) * 1000,
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p95_ms': percentile(ordered, 95) * 1000,
+        'p99_ms': percentile(ordered, 99) * 1000,
+        'samples_ms': [round(s * 1000, 4) for s in samples],
+    }
+    if tokens is not None:
+        result['tokens'] = sum(tokens)
+        result['tokens_per_s'] = sum(tokens) / sum(samples) if sum(samples) else 0.0
+    return result
+
+
+def time_calls(fn, inputs, repeat=1, before=None):
+    """Seconds per call of fn(item); before() runs untimed ahead of every call"""
+    samples = []
+    for _ in range(repeat):
+        for item in inputs:
+            if before is not None:
+                before()
+            start = time.perf_counter()
+            fn(item)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def calibration_ms(rounds=5):
+    """Median time of a fixed sort-and-sum workload, a yardstick for this machine's current speed"""
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        data = sorted((i * 7919) % 10007 for i in range(20000))
+        sum(x * x for x in data)
+        samples.append(time.perf_counter() - start)
+    return sorted(samples)[rounds // 2] * 1000
+
+
+def reset_peak_rss():
+    """Restart the VmHWM high-water mark so each case reports its own peak (Linux only)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class SuiteContext:
+    """Inputs and chatbots shared by the cases, built once"""
+
+    def __init__(self, model_path, seed, repeat, max_new_tokens):
+        self.model_path = model_path
+        self.seed = seed
+        self.repeat = repeat
+        self.max_new_tokens = max_new_tokens
+        self.pairs = load_dataset_pairs()
+        self.questions = [question for question, _ in self.pairs]
+        self._bot = None
+        self._trainer = None
+        self.workdir = tempfile.mkdtemp(prefix="pidgin-bench-")
+
+    @property
+    def bot(self):
+        """Model-backed chatbot without cache, retrieval or classifier, so each case isolates one path"""
+        if self._bot is None:
+            self._bot = PidginChatbot(self.model_path)
+            if not self._bot.model_loaded:
+                raise RuntimeError(f"Could not load model from {self.model_path}")
+        return self._bot
+
+    @property
+    def trainer(self):
+        """PidginModelTrainer on the same model (train_model prints a banner on import, so it is silenced)"""
+        if self._trainer is None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                from train_model import PidginModelTrainer
+
+                self._trainer = PidginModelTrainer(self.model_path, output_dir=os.path.join(self.workdir, "model"))
+        return self._trainer
+
+    def training_file(self):
+        """Training text in the workdir, written once"""
+        path = os.path.join(self.workdir, "training_data.txt")
+        if not os.path.exists(path):
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.trainer.prepare_training_data(output_file=path)
+        return path
+
+    def generate(self, question, index):
+        """One seeded generate_response on a fresh conversation"""
+        import torch
+
+        torch.manual_seed(self.seed + index)
+        return self.bot.generate_response(question, max_length=self.max_new_tokens, conversation=Session())
+
+
+def bench_detect_intent(ctx):
+    bot = PidginChatbot("models/__no_model__", intent_classifier=None)
+    return summarize(time_calls(bot.detect_intent, ctx.questions, ctx.repeat, scan_keywords.cache_clear))
+
+
+def bench_detect_intent_classifier(ctx):
+    bot = PidginChatbot("models/__no_model__", intent_classifier=IntentClassifier())
+    bot.detect_intent(ctx.questions[0])
+    return summarize(time_calls(bot.detect_intent, ctx.questions, ctx.repeat))
+
+
+def bench_rule_fallback(ctx):
+    return summarize(time_calls(RuleBasedFallback.get_response, ctx.questions, ctx.repeat, scan_keywords.cache_clear))
+
+
+def bench_build_prompt(ctx):
+    conversation = Session()
+    for question, answer in ctx.pairs[:3]:
+        conversation.add_exchange(question, answer, 'general')
+    bot = ctx.bot
+    # History ids are cached after the first turn, as in a live conversation
+    bot._build_prompt_ids(ctx.questions[0], 'general', conversation)
+    return summarize(time_calls(lambda q: bot._build_prompt_ids(q, 'general', conversation), ctx.questions, ctx.repeat))
+
+
+def bench_clean_response(ctx):
+    raw = [f" {a} <|endoftext|>\n<|user|> {q}" for q, a in ctx.pairs]
+    return summarize(time_calls(ctx.bot.clean_response, raw, ctx.repeat))
+
+
+def bench_generate_response(ctx):
+    ctx.generate(ctx.questions[0], 0)
+    samples = []
+    tiers = {}
+    for index, question in enumerate(ctx.questions):
+        start = time.perf_counter()
+        ctx.generate(question, index)
+        samples.append(time.perf_counter() - start)
+        tiers[ctx.bot.last_tier] = tiers.get(ctx.bot.last_tier, 0) + 1
+    result = summarize(samples)
+    result['tiers'] = tiers
+    return result
+
+
+def bench_generate_response_model(ctx):
+    bot = ctx.bot
+    questions = []
+    for index, question in enumerate(ctx.questions):
+        ctx.generate(question, index)
+        if bot.last_tier == 'model':
+            questions.append(question)
+
+    samples, tokens = [], []
+    for index, question in enumerate(questions * ctx.repeat):
+        start = time.perf_counter()
+        ctx.generate(question, index)
+        samples.append(time.perf_counter() - start)
+        tokens.append(bot.last_generation_stats.get('new_tokens', 0))
+    return summarize(samples, tokens)
+
+
+def bench_train_prepare_data(ctx):
+    trainer = ctx.trainer
+    path = os.path.join(ctx.workdir, "prepared.txt")
+    with contextlib.redirect_stdout(io.StringIO()):
+        samples = time_calls(lambda _: trainer.prepare_training_data(output_file=path), range(ctx.repeat * 5))
+    return summarize(samples)
+
+
+def clear_dataset_cache(ctx):
+    """Remove dataset caches written next to the training file"""
+    for path in glob.glob(os.path.join(ctx.workdir, "cached*")):
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
+
+def bench_train_create_dataset(ctx):
+    trainer = ctx.trainer
+    path = ctx.training_file()
+    return summarize(time_calls(lambda _: trainer.create_dataset(path), range(ctx.repeat * 5), 1,
+                                lambda: clear_dataset_cache(ctx)))
+
+
+def bench_train_load_dataset(ctx):
+    trainer = ctx.trainer
+    path = ctx.training_file()
+    trainer.create_dataset(path)
+    return summarize(time_calls(lambda _: trainer.create_dataset(path), range(ctx.repeat * 5)))
+
+
+def bench_train_stream_dataset(ctx, copies=100):
+    trainer = ctx.trainer
+    path = os.path.join(ctx.workdir, "training_data_x100.txt")
+    with open(ctx.training_file(), 'r', encoding='utf-8') as f:
+        text = f.read()
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(copies):
+            f.write(text)
+    del text
+    return summarize(time_calls(lambda _: trainer.create_dataset(path), range(ctx.repeat), 1,
+                                lambda: clear_dataset_cache(ctx)))
+
+
+def bench_train_step(ctx, batch_size=4, steps=10):
+    import torch
+    from transformers import DataCollatorForLanguageModeling
+
+    trainer = ctx.trainer
+    dataset = trainer.create_dataset(ctx.training_file())
+    collator = DataCollatorForLanguageModeling(tokenizer=trainer.tokenizer, mlm=False)
+    model = trainer.model
+    model.train()
+    optimizer = torch.optim.AdamW(model.parameters(), lr=5e-5)
+
+    torch.manual_seed(ctx.seed)
+    batches = [collator([dataset[(i * batch_size + j) % len(dataset)] for j in range(batch_size)])
+               for i in range(steps * ctx.repeat + 1)]
+
+    def step(batch):
+        loss = model(**batch).loss
+        loss.backward()
+        optimizer.step()
+        optimizer.zero_grad()
+
+    step(batches[0])
+    samples = time_calls(step, batches[1:])
+    model.eval()
+    return summarize(samples, [batch['input_ids'].numel() for batch in batches[1:]])
+
+
+CASES = {
+    'detect_intent': bench_detect_intent,
+    'detect_intent_classifier': bench_detect_intent_classifier,
+    'rule_fallback': bench_rule_fallback,
+    'build_prompt': bench_build_prompt,
+    'clean_response': bench_clean_response,
+    'generate_response': bench_generate_response,
+    'generate_response_model': bench_generate_response_model,
+    'train_prepare_data': bench_train_prepare_data,
+    'train_create_dataset': bench_train_create_dataset,
+    'train_load_dataset': bench_train_load_dataset,
+    'train_stream_dataset': bench_train_stream_dataset,
+    'train_step': bench_train_step,
+}
+
+
+def git_revision():
+    """Current commit hash, with '-dirty' if tracked files are modified"""
+    try:
+        revision = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True).stdout.strip()
+        return revision + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def machine_info():
+    """Hardware and software that affect timings"""
+    import torch
+
+    cpu = platform.processor()
+    try:
+        with open('/proc/cpuinfo') as f:
+            cpu = next((line.split(':', 1)[1].strip() for line in f if line.startswith('model name')), cpu)
+    except OSError:
+        pass
+    return {
+        'cpu': cpu,
+        'cpu_count': os.cpu_count(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'python': platform.python_version(),
+        'torch': torch.__version__,
+        'torch_threads': torch.get_num_threads(),
+    }
+
+
+def machine_fingerprint(info):
+    """Short stable id; runs are only comparable when this matches"""
+    return hashlib.sha256(json.dumps(info, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+
+def run_suite(cases, model_path, seed=0, repeat=3, max_new_tokens=32):
+    """Run the named cases and return the JSON-ready report"""
+    import torch
+    import transformers
+
+    torch.set_num_threads(int(os.getenv('PIDGIN_BENCH_THREADS', '1')))
+    ctx = SuiteContext(model_path, seed, repeat, max_new_tokens)
+
+    info = machine_info()
+    results = {}
+    try:
+        for name in cases:
+            per_case_peak = reset_peak_rss()
+            calibration = calibration_ms()
+            start = time.perf_counter()
+            result = CASES[name](ctx)
+            result['wall_s'] = time.perf_counter() - start
+            result['calibration_ms'] = calibration
+            if per_case_peak:
+                result['peak_rss_mb'] = peak_rss_mb()
+            results[name] = result
+    finally:
+        shutil.rmtree(ctx.workdir, ignore_errors=True)
+
+    return {
+        'meta': {
+            'revision': git_revision(),
+            'machine': machine_fingerprint(info),
+            'machine_info': info,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'torch': torch.__version__,
+            'transformers': transformers.__version__,
+            'platform': platform.platform(),
+            'torch_threads': torch.get_num_threads(),
+            'model': model_path,
+            'seed': seed,
+            'hash_seed': os.getenv('PYTHONHASHSEED'),
+            'repeat': repeat,
+            'max_new_tokens': max_new_tokens,
+        },
+        'results': results,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def print_report(report):
+    """Human-readable table of a run_suite report"""
+    print("=" * 70)
+    meta = report['meta']
+    print(f"📊 {meta['revision'][:12]} | machine {meta['machine']} | {meta['model']} | seed {meta['seed']}")
+    print(f"{'Case':<26} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'tok/s':>8} {'RSS MB':>7}")
+    for name, result in report['results'].items():
+        tokens = f"{result['tokens_per_s']:.0f}" if 'tokens_per_s' in result else "-"
+        rss = f"{result['peak_rss_mb']:.0f}" if 'peak_rss_mb' in result else "-"
+        print(f"{name:<26} {result['n']:>5} {result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f} "
+              f"{result['p99_ms']:>9.3f} {tokens:>8} {rss:>7}")
+    print(f"Peak RSS: {report['peak_rss_mb']:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=None, help="Model directory (default: tiny random GPT-2 fixture)")
+    parser.add_argument('--cases', default=",".join(CASES), help="Comma-separated case names")
+    parser.add_argument('--repeat', type=int, default=3, help="Passes over the inputs per case")
+    parser.add_argument('--max-new-tokens', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="Write the JSON report to this file")
+    parser.add_argument('--json', action='store_true', help="Print only the JSON report")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="History file each run is appended to")
+    parser.add_argument('--no-history', action='store_true', help="Do not record this run")
+    args = parser.parse_args()
+
+    if os.getenv('PYTHONHASHSEED') != str(args.seed):
+        os.environ['PYTHONHASHSEED'] = str(args.seed)
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+    cases = [name.strip() for name in args.cases.split(',') if name.strip()]
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)} (choose from {', '.join(CASES)})")
+
+    report = run_suite(cases, args.model or build_tiny_model(), args.seed, args.repeat, args.max_new_tokens)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if not args.no_history:
+        append_history(report, args.history)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+        if args.output:
+            print(f"💾 Saved to {args.output}")
+        if not args.no_history:
+            print(f"🗂️  Appended to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,66 +3,296 @@ Pidgin AI Chatbot Engine
 Handles conversation, context, and response generation
 """
 
+import importlib.util
 import os
 import re
+import threading
+import time
 from datetime import datetime
+from functools import lru_cache
 import json
 
-# Try to import transformers
-try:
-    from transformers import GPT2Tokenizer, GPT2LMHeadModel
+from keyword_matcher import KeywordMatcher
+from math_solver import MathSolver
+from prompt_encoder import PromptEncoder
+from router import ResponseRouter
+
+# torch/transformers are only imported once a model is actually loaded, so
+# rule-based deployments start in milliseconds instead of seconds
+TRANSFORMERS_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None for name in ('torch', 'transformers')
+)
+
+# Model-path timings kept in last_generation_stats and exported as pidgin_stage_seconds
+STAGES = ('prompt_s', 'queue_s', 'generate_s', 'decode_s', 'clean_s')
+
+# The part of an over-long answer that clean_response keeps
+LEADING_SENTENCES = re.compile(r'(?:[^.!?]*[.!?]){2}')
+
+
+# Weights are loaded once per process and shared read-only by every chatbot
+_shared_models = {}
+_shared_models_lock = threading.Lock()
+_loading_models = {}
+_batch_engines = {}
+_warmups = {}
+_missing_models = set()
+_keyword_index = None
+
+
+def load_shared_model(model_path, quantize=False):
+    """Load tokenizer and model once per process and reuse them across sessions
+    
+    quantize=True loads the dynamic int8 variant (pre-quantized artifact if
+    train_model.py emitted one, otherwise quantized at load time). The load runs
+    outside _shared_models_lock, so chatbots built meanwhile are not held up;
+    other callers for the same model wait for it (and retry it if it failed).
+    """
+    key = (model_path, quantize)
+    while True:
+        with _shared_models_lock:
+            if key in _shared_models:
+                return _shared_models[key]
+            loading = _loading_models.get(key)
+            owner = loading is None
+            if owner:
+                loading = _loading_models[key] = threading.Event()
+        if owner:
+            break
+        loading.wait()
+    
+    try:
+        print(f"🤖 Loading chatbot from {model_path}{' (int8)' if quantize else ''}...")
+        from transformers import GPT2TokenizerFast, GPT2LMHeadModel
+        
+        # Rust-backed tokenizer; converted from vocab/merges if tokenizer.json is missing
+        tokenizer = GPT2TokenizerFast.from_pretrained(model_path)
+        if quantize:
+            from quantization import load_quantized
+            model = load_quantized(model_path)
+        else:
+            model = GPT2LMHeadModel.from_pretrained(model_path)
+        model.eval()
+        model.requires_grad_(False)
+        tokenizer.pad_token = tokenizer.eos_token
+        with _shared_models_lock:
+            _shared_models[key] = (tokenizer, model)
+        print("✅ AI model loaded successfully!")
+        return tokenizer, model
+    finally:
+        with _shared_models_lock:
+            del _loading_models[key]
+        loading.set()
+
+
+def get_batch_engine(model_path, max_batch_size=8, max_wait_ms=10, quantize=False):
+    """Return the process-wide micro-batching engine for a shared model"""
+    tokenizer, model = load_shared_model(model_path, quantize)
+    key = (model_path, quantize)
+    with _shared_models_lock:
+        if key not in _batch_engines:
+            from batching import MicroBatchEngine
+            from generation import StopSequenceProcessor
+            _batch_engines[key] = MicroBatchEngine(
+                tokenizer, model,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms,
+                processor_factory=lambda kwargs: StopSequenceProcessor(
+                    tokenizer, kwargs['eos_token_id'], kwargs['max_new_tokens']
+                )
+            )
+        return _batch_engines[key]
+
+
+def get_model_warmup(model_path, quantize=False):
+    """Return the process-wide background loader for a shared model, starting it once"""
+    key = (model_path, quantize)
+    with _shared_models_lock:
+        if key not in _warmups:
+            from warmup import ModelWarmup
+            _warmups[key] = ModelWarmup(model_path, quantize).start()
+        return _warmups[key]
+
+
+def _get_keyword_index():
+    """One automaton over the intent keywords and the fallback keys, built on first use"""
+    global _keyword_index
+    if _keyword_index is None:
+        tags = {}
+        for word in PidginChatbot.math_keywords:
+            tags.setdefault(word, []).append('math')
+        for word in PidginChatbot.coding_keywords:
+            tags.setdefault(word, []).append('coding')
+        for rank, key in enumerate(RuleBasedFallback.RESPONSES):
+            tags.setdefault(key, []).append(rank)
+        _keyword_index = (KeywordMatcher(tags), tags)
+    return _keyword_index
+
+
+@lru_cache(maxsize=1024)
+def scan_keywords(text):
+    """(math score, coding score, first matching RESPONSES key or None) for lowercase text
+    
+    Cached so detect_intent and the rule tiers share a single pass per message.
+    """
+    matcher, tags = _get_keyword_index()
+    scores = {'math': 0, 'coding': 0}
+    best = None
+    for keyword in matcher.matches(text):
+        for tag in tags[keyword]:
+            if tag in scores:
+                scores[tag] += 1
+            elif best is None or tag < best[0]:
+                best = (tag, keyword)
+    return scores['math'], scores['coding'], best[1] if best else None
+
+
+def _tensor_bytes(value, seen):
+    """Bytes of the tensors in a state_dict value (int8 layers hold packed tuples)"""
     import torch
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
+    
+    if isinstance(value, (tuple, list)):
+        return sum(_tensor_bytes(item, seen) for item in value)
+    if not isinstance(value, torch.Tensor) or value.data_ptr() in seen:
+        return 0
+    seen.add(value.data_ptr())
+    return value.numel() * value.element_size()
+
+
+def shared_model_memory():
+    """Bytes held by shared model weights (independent of the number of sessions)"""
+    total = 0
+    with _shared_models_lock:
+        for _, model in _shared_models.values():
+            seen = set()
+            total += sum(_tensor_bytes(value, seen) for value in model.state_dict().values())
+    return total
 
 
 class PidginChatbot:
-    def __init__(self, model_path="models/fine_tuned_pidgin"):
-        """Initialize the chatbot"""
+    # Keywords for intent detection (shared by every session)
+    math_keywords = [
+        'add', 'subtract', 'multiply', 'divide', 'calculate', 'solve',
+        'algebra', 'fraction', 'equation', 'math', 'number', 'count',
+        'plus', 'minus', 'times', 'divided', '+', '-', '×', '÷', '*', '/'
+    ]
+    
+    coding_keywords = [
+        'code', 'programming', 'python', 'variable', 'function', 'loop',
+        'if', 'else', 'for', 'while', 'print', 'input', 'class',
+        'coding', 'program', 'script', 'debug', 'list', 'string'
+    ]
+    
+    def __init__(self, model_path="models/fine_tuned_pidgin", use_batching=False,
+                 max_batch_size=8, max_wait_ms=10, use_kv_cache=False,
+                 response_cache=None, deterministic=False, retrieval_index=None,
+                 router=None, quantize=False, background_load=False, math_solver=None,
+                 intent_classifier=None, admission=None, metrics=None, profiler=None):
+        """Initialize the chatbot (per-session state is only the conversation history)
+        
+        background_load=True returns immediately and loads and warms the model on a
+        background thread; until model_status is 'ready' answers come from the
+        cheaper tiers and the rule-based fallback.
+        """
         self.model_path = model_path
+        self.quantize = quantize
+        self.use_batching = use_batching
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.warmup = None
         self.conversation_history = []
         self.max_history = 5
+        self.prompt_history = 3
+        self.engine = None
+        self.last_generation_stats = {}
+        
+        # Opt-in per-session attention cache reused across turns (costs memory per session)
+        self.use_kv_cache = use_kv_cache
+        self._kv_state = None
+        
+        # Shared ResponseCache; model answers are only cached with deterministic decoding
+        self.response_cache = response_cache
+        self.deterministic = deterministic
+        
+        # Optional shared RetrievalIndex answering close matches from the dataset
+        self.retrieval_index = retrieval_index
+        
+        # Optional shared IntentClassifier; keyword scoring is used without one
+        self.intent_classifier = intent_classifier
+        
+        # Exact arithmetic and linear equations never need the model
+        self.math_solver = math_solver if math_solver is not None else MathSolver()
+        
+        # Pass a shared ResponseRouter to aggregate tier counters across sessions
+        self.router = router if router is not None else ResponseRouter()
+        self.last_tier = None
+        
+        # Optional shared AdmissionController; requests it sheds skip the model
+        self.admission = admission
+        
+        # Optional shared metrics.Metrics; None keeps instrumentation to an `is None` check
+        self.metrics = metrics
+        
+        # Optional shared profiling.RequestProfiler; sampled or flagged requests run under cProfile
+        self.profiler = profiler
         
         # Check if model exists
+        self.model_loaded = False
         if os.path.exists(model_path) and TRANSFORMERS_AVAILABLE:
-            print(f"🤖 Loading chatbot from {model_path}...")
-            try:
-                self.tokenizer = GPT2Tokenizer.from_pretrained(model_path)
-                self.model = GPT2LMHeadModel.from_pretrained(model_path)
-                self.model.eval()
-                self.tokenizer.pad_token = self.tokenizer.eos_token
-                self.model_loaded = True
-                print("✅ AI model loaded successfully!")
-            except Exception as e:
-                print(f"⚠️  Could not load model: {e}")
-                self.model_loaded = False
-        else:
-            self.model_loaded = False
+            if background_load:
+                self.warmup = get_model_warmup(model_path, quantize)
+                self._check_warmup()
+            else:
+                try:
+                    self._attach_model()
+                except Exception as e:
+                    print(f"⚠️  Could not load model: {e}")
+        elif model_path not in _missing_models:
+            # Servers build a chatbot per request; say this once, not on every message
+            _missing_models.add(model_path)
             if not TRANSFORMERS_AVAILABLE:
                 print("⚠️  Transformers not installed. Using rule-based responses.")
             else:
                 print(f"⚠️  Model not found at {model_path}. Using rule-based responses.")
-        
-        # Keywords for intent detection
-        self.math_keywords = [
-            'add', 'subtract', 'multiply', 'divide', 'calculate', 'solve',
-            'algebra', 'fraction', 'equation', 'math', 'number', 'count',
-            'plus', 'minus', 'times', 'divided', '+', '-', '×', '÷', '*', '/'
-        ]
-        
-        self.coding_keywords = [
-            'code', 'programming', 'python', 'variable', 'function', 'loop',
-            'if', 'else', 'for', 'while', 'print', 'input', 'class',
-            'coding', 'program', 'script', 'debug', 'list', 'string'
-        ]
+    
+    def _attach_model(self):
+        """Point this chatbot at the shared weights (loading them if needed)"""
+        self.tokenizer, self.model = load_shared_model(self.model_path, self.quantize)
+        self.prompt_encoder = PromptEncoder(self.tokenizer)
+        if self.use_batching:
+            self.engine = get_batch_engine(self.model_path, self.max_batch_size, self.max_wait_ms, self.quantize)
+        self.model_loaded = True
+    
+    def _check_warmup(self):
+        """Switch over to the model once the background warm-up has finished"""
+        warmup = self.warmup
+        if warmup is None or not warmup.ready.is_set():
+            return
+        self.warmup = None
+        if warmup.state == 'ready':
+            self._attach_model()
+    
+    @property
+    def model_status(self):
+        """'ready', 'loading', 'warming', 'failed' or 'unavailable' (rule-based only)"""
+        self._check_warmup()
+        if self.model_loaded:
+            return 'ready'
+        if self.warmup is not None:
+            return 'loading' if self.warmup.state == 'pending' else self.warmup.state
+        if os.path.exists(self.model_path) and TRANSFORMERS_AVAILABLE:
+            return 'failed'
+        return 'unavailable'
     
     def detect_intent(self, user_input):
         """Detect if user wants math or coding help"""
+        if self.intent_classifier is not None and self.intent_classifier.available():
+            return self.intent_classifier.predict_one(user_input)
+        
         user_lower = user_input.lower()
         
-        math_score = sum(1 for word in self.math_keywords if word in user_lower)
-        coding_score = sum(1 for word in self.coding_keywords if word in user_lower)
+        # Whole-word matches only: "if" no longer fires on "different"
+        math_score, coding_score, _ = scan_keywords(user_lower)
         
         if math_score > coding_score:
             return 'math'
@@ -71,71 +301,496 @@ class PidginChatbot:
         else:
             return 'general'
     
-    def clean_response(self, response):
-        """Clean up generated response"""
-        if '<|bot|>' in response:
-            response = response.split('<|bot|>')[-1]
+    @staticmethod
+    def clean_response(response):
+        """Clean up generated text: the answer ends at the first turn marker
         
-        response = response.replace('<|endoftext|>', '')
-        response = response.replace('<|user|>', '')
+        StreamCleaner applies the same rules piece by piece, so a streamed answer
+        ends up identical to this one.
+        """
+        for marker in StreamCleaner.STOP_MARKERS:
+            response = response.split(marker, 1)[0]
+        for marker in StreamCleaner.DROP_MARKERS:
+            response = response.replace(marker, '')
         response = response.strip()
         
-        if len(response) > 300:
-            sentences = re.split(r'[.!?]', response)
-            response = '. '.join(sentences[:2]) + '.'
+        # Long answers keep their first two sentences, punctuation included
+        if len(response) > StreamCleaner.MAX_CHARS:
+            match = LEADING_SENTENCES.match(response)
+            if match:
+                response = match.group(0)
         
-        return response.strip()
+        return response
     
-    def generate_response(self, user_input, max_length=150, temperature=0.7):
-        """Generate a response to user input"""
+    def generate_response(self, user_input, max_length=150, temperature=0.7, latency_budget_ms=None,
+                          conversation=None, user_key=None, profile=False, request_id=None):
+        """Generate a response to user input
+        
+        Tiers run cheapest first: cache, exact math solver, confident rule match,
+        dataset retrieval, the model, then the catch-all rule-based fallback. The tier that answered
+        is stored in last_tier.
+        
+        conversation is an optional per-user state object (see sessions.Session)
+        with a history sequence and add_exchange(); by default this chatbot's
+        own conversation_history is used. user_key identifies the user for the
+        admission controller's per-user rate limit. With a profiler, profile=True
+        (or its sample rate) runs the call under cProfile, saved under request_id.
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            reason = profiler.should_profile(profile)
+            if reason is not None:
+                return profiler.run(reason, request_id, self._respond, user_input, max_length, temperature,
+                                    latency_budget_ms, conversation, user_key)
+        return self._respond(user_input, max_length, temperature, latency_budget_ms, conversation, user_key)
+    
+    def _respond(self, user_input, max_length, temperature, latency_budget_ms, conversation, user_key):
+        """generate_response without the profiling check"""
+        self._check_warmup()
+        metrics = self.metrics
+        if metrics is not None:
+            request_start = time.perf_counter()
         intent = self.detect_intent(user_input)
+        if metrics is not None:
+            metrics.observe('pidgin_stage_seconds', time.perf_counter() - request_start, stage='intent')
+        cache_key = self._cache_key(user_input, intent, max_length, conversation)
         
-        # Use AI model if available
-        if self.model_loaded:
-            prompt = self._build_prompt(user_input, intent)
-            
-            input_ids = self.tokenizer.encode(prompt, return_tensors='pt')
-            
-            with torch.no_grad():
-                output = self.model.generate(
-                    input_ids,
-                    max_length=len(input_ids[0]) + max_length,
-                    num_return_sequences=1,
-                    no_repeat_ngram_size=3,
-                    temperature=temperature,
-                    top_k=50,
-                    top_p=0.95,
-                    do_sample=True,
-                    pad_token_id=self.tokenizer.eos_token_id,
-                    eos_token_id=self.tokenizer.encode('<|endoftext|>')[0]
-                )
-            
-            full_response = self.tokenizer.decode(output[0], skip_special_tokens=False)
-            clean_response = self.clean_response(full_response)
-        else:
-            # Fallback to rule-based responses
-            clean_response = RuleBasedFallback.get_response(user_input)
-            if not clean_response:
-                clean_response = "I dey learn to answer that question. For now, try ask me about basic Math or Python coding!"
+        clean_response, self.last_tier = self.router.route(
+            self._cheap_tiers(user_input, cache_key) + [
+                ('model', lambda remaining: self._model_response(
+                    user_input, intent, max_length, temperature, cache_key, remaining, conversation, user_key)),
+                ('fallback', lambda remaining: self._fallback_response(user_input, cache_key)),
+            ],
+            latency_budget_ms
+        )
+        if self.last_tier != 'model' and conversation is None:
+            self._kv_state = None
+        if self.profiler is not None:
+            self.profiler.annotate(intent=intent, tier=self.last_tier)
         
         # Update history
-        self._update_history(user_input, clean_response, intent)
+        self._update_history(user_input, clean_response, intent, conversation)
         
+        if metrics is not None:
+            self._observe_request(request_start)
         return clean_response
     
-    def _build_prompt(self, user_input, intent):
-        """Build prompt with conversation history"""
-        prompt = ""
+    def quick_response(self, user_input, max_length=150, conversation=None):
+        """Answer from every tier except the model: cache, math, rules, retrieval, then the fallback
         
-        for exchange in self.conversation_history[-3:]:
-            prompt += f"<|user|> {exchange['user']} <|bot|> {exchange['bot']} <|endoftext|>\n"
+        For callers shedding load before a worker is free; nothing here blocks, so
+        it can run on an event loop.
+        """
+        self._check_warmup()
+        metrics = self.metrics
+        if metrics is not None:
+            request_start = time.perf_counter()
+        intent = self.detect_intent(user_input)
+        cache_key = self._cache_key(user_input, intent, max_length, conversation)
         
-        prompt += f"<|user|> {user_input} <|bot|>"
+        response, self.last_tier = self.router.route(
+            self._cheap_tiers(user_input, cache_key) + [
+                ('fallback', lambda remaining: self._fallback_response(user_input, cache_key)),
+            ]
+        )
+        self._update_history(user_input, response, intent, conversation)
+        if metrics is not None:
+            self._observe_request(request_start)
+        return response
+    
+    def _observe_request(self, request_start):
+        """Export the end-to-end time of a request answered by last_tier"""
+        self.metrics.observe('pidgin_request_seconds', time.perf_counter() - request_start, tier=self.last_tier)
+    
+    def _cheap_tiers(self, user_input, cache_key):
+        """Tiers that answer in well under a millisecond"""
+        tiers = []
+        if cache_key is not None:
+            tiers.append(('cache', lambda remaining: self.response_cache.get(cache_key)))
+        tiers.append(('math', lambda remaining: self.math_solver.answer(user_input)))
+        tiers.append(('rules', lambda remaining: RuleBasedFallback.get_confident_response(user_input)))
+        if self.retrieval_index is not None:
+            tiers.append(('retrieval', lambda remaining: self.retrieval_index.answer(user_input)))
+        return tiers
+    
+    def _cache_key(self, user_input, intent, max_length, conversation=None):
+        """Response cache key, or None when answers for this request are not cacheable
         
-        return prompt
+        Model answers are only cacheable with deterministic decoding; they depend on
+        the history in the prompt. Rule-based answers never depend on history.
+        """
+        if self.response_cache is None:
+            return None
+        if not self.model_loaded:
+            return self.response_cache.make_key(user_input, intent, settings=('rules',))
+        if self.deterministic:
+            if self.use_kv_cache and conversation is None:
+                # The KV-cache prompt holds however many exchanges its prefix has grown to
+                history = self._kv_window(user_input, max_length)[0]
+            else:
+                history = self._recent_history(conversation)
+            return self.response_cache.make_key(user_input, intent, history, ('model', max_length))
+        return None
     
-    def _update_history(self, user_input, bot_response, intent):
+    def _model_response(self, user_input, intent, max_length, temperature, cache_key=None, remaining_ms=None,
+                        conversation=None, user_key=None):
+        """Generated answer sized to the remaining latency budget, or None if it cannot fit or is shed"""
+        if not self.model_loaded:
+            return None
+        
+        budget_length = self.router.token_budget(max_length, remaining_ms)
+        if budget_length == 0:
+            return None
+        if budget_length < max_length:
+            # The key is for the full max_length; an answer cut short by the budget must not be served later
+            cache_key = None
+        max_length = budget_length
+        
+        if self.admission is None:
+            return self._generate_answer(user_input, intent, max_length, temperature, cache_key, conversation)
+        ticket = self.admission.acquire(user_key, remaining_ms)
+        if ticket is None:
+            return None
+        with ticket:
+            return self._generate_answer(user_input, intent, max_length, temperature, cache_key, conversation)
+    
+    def _generate_answer(self, user_input, intent, max_length, temperature, cache_key, conversation):
+        """Run the model and cache the cleaned answer
+        
+        Stage timings (prompt_s, queue_s, generate_s, decode_s, clean_s) are added
+        to last_generation_stats.
+        """
+        start = time.perf_counter()
+        if self.use_kv_cache and conversation is None:
+            raw_response = self._generate_with_kv_cache(user_input, max_length, temperature)
+            prompt_tokens = len(self._kv_state['ids'])
+        else:
+            input_ids = self._build_prompt_ids(user_input, intent, conversation)
+            prompt_s = time.perf_counter() - start
+            raw_response = self._generate_text(input_ids, max_length, temperature)
+            self.last_generation_stats['prompt_s'] = prompt_s
+            prompt_tokens = len(input_ids)
+        generated = time.perf_counter()
+        response = self.clean_response(raw_response)
+        self.last_generation_stats['clean_s'] = time.perf_counter() - generated
+        self._finish_generation(response, (generated - start) * 1000, prompt_tokens, cache_key)
+        return response
+    
+    def _finish_generation(self, response, elapsed_ms, prompt_tokens, cache_key):
+        """Token cost, stage metrics, profile fields and cache entry for a finished model answer"""
+        stats = self.last_generation_stats
+        self.router.observe_generation(elapsed_ms, stats.get('new_tokens', 0))
+        
+        if self.metrics is not None:
+            self.metrics.observe_stages({stage[:-2]: stats[stage] for stage in STAGES if stage in stats})
+            if 'new_tokens' in stats:
+                self.metrics.observe('pidgin_generated_tokens', stats['new_tokens'])
+        if self.profiler is not None:
+            self.profiler.annotate(prompt_tokens=prompt_tokens, new_tokens=stats.get('new_tokens'))
+        
+        if cache_key is not None:
+            self.response_cache.put(cache_key, response)
+    
+    def _fallback_response(self, user_input, cache_key=None):
+        """Catch-all rule-based answer"""
+        response = RuleBasedFallback.get_response(user_input)
+        if not response:
+            response = "I dey learn to answer that question. For now, try ask me about basic Math or Python coding!"
+        
+        if cache_key is not None and not self.model_loaded:
+            self.response_cache.put(cache_key, response)
+        return response
+    
+    def stream_response(self, user_input, max_length=150, temperature=0.7, conversation=None, user_key=None,
+                        latency_budget_ms=None):
+        """Yield the response piece by piece while the model is still generating
+        
+        With the batching engine the answer comes in one piece from
+        generate_response, so batching still runs. The streamed model tier gets
+        the same latency budget, admission, KV cache, response cache and generation
+        stats as generate_response.
+        """
+        self._check_warmup()
+        if not self.model_loaded or self.engine is not None:
+            yield self.generate_response(user_input, max_length, temperature, latency_budget_ms,
+                                         conversation=conversation, user_key=user_key)
+            return
+        
+        request_start = time.perf_counter()
+        intent = self.detect_intent(user_input)
+        if self.metrics is not None:
+            self.metrics.observe('pidgin_stage_seconds', time.perf_counter() - request_start, stage='intent')
+        
+        # Cheap tiers answer in one piece; only the model is streamed
+        route_start = time.perf_counter()
+        cache_key = self._cache_key(user_input, intent, max_length, conversation)
+        cheap_tiers = self._cheap_tiers(user_input, cache_key)
+        for name, handler in cheap_tiers:
+            start = time.perf_counter()
+            answer = handler(None)
+            self.router.record(name, (time.perf_counter() - start) * 1000, served=answer is not None)
+            if answer is not None:
+                self.last_tier = name
+                if conversation is None:
+                    self._kv_state = None
+                self._update_history(user_input, answer, intent, conversation)
+                if self.metrics is not None:
+                    self._observe_request(request_start)
+                yield answer
+                return
+        
+        # Same budget rules as _model_response
+        budget = latency_budget_ms if latency_budget_ms is not None else self.router.latency_budget_ms
+        remaining_ms = None if budget is None else budget - (time.perf_counter() - route_start) * 1000
+        budget_length = self.router.token_budget(max_length, remaining_ms)
+        if budget_length < max_length:
+            cache_key = None
+        max_length = budget_length
+        
+        # Out of budget or shed: the rule-based answer instead of waiting for a generation slot
+        ticket = None
+        if budget_length and self.admission is not None:
+            ticket = self.admission.acquire(user_key, remaining_ms)
+        if budget_length == 0 or (self.admission is not None and ticket is None):
+            self.router.record('model', 0.0, served=False)
+            answer = self._fallback_response(user_input, cache_key)
+            self.router.record('fallback', 0.0)
+            self.last_tier = 'fallback'
+            if conversation is None:
+                self._kv_state = None
+            self._update_history(user_input, answer, intent, conversation)
+            if self.metrics is not None:
+                self._observe_request(request_start)
+            yield answer
+            return
+        
+        import torch
+        from transformers import LogitsProcessorList, StoppingCriteriaList
+        from generation import CancelCriteria, TimedTextStreamer
+        
+        use_kv_cache = self.use_kv_cache and conversation is None
+        stream_start = time.perf_counter()
+        stats = {}
+        if not use_kv_cache:
+            input_ids = self._build_prompt_ids(user_input, intent, conversation)
+            stats['prompt_s'] = time.perf_counter() - stream_start
+        
+        streamer = TimedTextStreamer(self.tokenizer, skip_prompt=True, timeout=60)
+        cancel = threading.Event()
+        stopping_criteria = StoppingCriteriaList([CancelCriteria(cancel)])
+        errors = []
+        
+        def run():
+            try:
+                start = time.perf_counter()
+                if use_kv_cache:
+                    self._generate_with_kv_cache(user_input, max_length, temperature, streamer=streamer,
+                                                 stopping_criteria=stopping_criteria)
+                else:
+                    processor = self._stop_processor(max_length)
+                    with torch.no_grad():
+                        output = self.model.generate(
+                            torch.tensor([input_ids]),
+                            streamer=streamer,
+                            stopping_criteria=stopping_criteria,
+                            logits_processor=LogitsProcessorList([processor]),
+                            pad_token_id=self.prompt_encoder.pad_token_id,
+                            **self._generation_kwargs(max_length, temperature)
+                        )
+                    self.last_generation_stats = processor.summary(output)
+                stats['generate_s'] = time.perf_counter() - start
+            except Exception as e:
+                errors.append(e)
+                streamer.end()
+        
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        
+        cleaner = StreamCleaner()
+        first_piece = self.metrics is not None
+        finished = False
+        try:
+            for chunk in streamer:
+                piece = cleaner.feed(chunk)
+                if piece:
+                    if first_piece:
+                        first_piece = False
+                        self.metrics.observe('pidgin_stage_seconds', time.perf_counter() - stream_start,
+                                             stage='first_piece')
+                    yield piece
+                if cleaner.done:
+                    break
+            piece = cleaner.finish()
+            if piece:
+                yield piece
+            finished = True
+        finally:
+            # Also reached when the caller stops iterating early
+            cancel.set()
+            thread.join()
+            if ticket is not None:
+                ticket.release()
+            if not finished and use_kv_cache:
+                # The answer never reaches the history, so the next turn cannot extend this prefix
+                self._kv_state = None
+        
+        if errors:
+            raise errors[0]
+        
+        # Only a fully shown answer gets here, so it is safe to cache
+        elapsed_ms = (time.perf_counter() - stream_start) * 1000
+        # The streamer decodes on the generation thread, so its time is inside generate_s
+        stats['generate_s'] -= streamer.decode_s
+        stats['decode_s'] = streamer.decode_s
+        self.last_generation_stats.update(stats)
+        prompt_tokens = len(self._kv_state['ids']) if use_kv_cache else len(input_ids)
+        response = cleaner.text.strip()
+        self._finish_generation(response, elapsed_ms, prompt_tokens, cache_key)
+        self.last_tier = 'model'
+        self.router.record('model', elapsed_ms)
+        self._update_history(user_input, response, intent, conversation)
+        if self.metrics is not None:
+            self._observe_request(request_start)
+    
+    def _generation_kwargs(self, max_length, temperature):
+        """Decoding settings shared by the direct and batched paths"""
+        kwargs = {
+            'max_new_tokens': max_length,
+            'num_return_sequences': 1,
+            'no_repeat_ngram_size': 3,
+            'do_sample': True,
+            'temperature': temperature,
+            'top_k': 50,
+            'top_p': 0.95,
+            'eos_token_id': self.prompt_encoder.eos_token_id
+        }
+        
+        # Greedy decoding makes answers repeatable, so they can be cached
+        if self.deterministic:
+            kwargs['do_sample'] = False
+            for key in ('temperature', 'top_k', 'top_p'):
+                del kwargs[key]
+        return kwargs
+    
+    def _stop_processor(self, max_length):
+        """Fresh stop-sequence processor for one generate call"""
+        from generation import StopSequenceProcessor
+        return StopSequenceProcessor(self.tokenizer, self.prompt_encoder.eos_token_id, max_length)
+    
+    def _generate_text(self, input_ids, max_length, temperature):
+        """Run the model on prompt token ids and return the generated text"""
+        generate_kwargs = self._generation_kwargs(max_length, temperature)
+        
+        # Concurrent sessions share one generate call through the batching engine
+        if self.engine is not None:
+            text, self.last_generation_stats = self.engine.generate(input_ids, **generate_kwargs)
+            return text
+        
+        import torch
+        from transformers import LogitsProcessorList
+        
+        processor = self._stop_processor(max_length)
+        
+        start = time.perf_counter()
+        with torch.no_grad():
+            output = self.model.generate(
+                torch.tensor([input_ids]),
+                pad_token_id=self.prompt_encoder.pad_token_id,
+                logits_processor=LogitsProcessorList([processor]),
+                **generate_kwargs
+            )
+        generated = time.perf_counter()
+        
+        self.last_generation_stats = processor.summary(output)
+        text = self.tokenizer.decode(output[0, len(input_ids):], skip_special_tokens=False)
+        self.last_generation_stats['generate_s'] = generated - start
+        self.last_generation_stats['decode_s'] = time.perf_counter() - generated
+        return text
+    
+    def _kv_window(self, user_input, max_length):
+        """(exchanges in the next KV-cache prompt, whether they extend the cached prefix)
+        
+        The prefix grows by one exchange per model turn up to max_history. Past
+        that, or once it would not fit in n_positions, it is rebuilt from the last
+        prompt_history exchanges: GPT-2 positions cannot be shifted in place.
+        """
+        state = self._kv_state
+        history = self.conversation_history
+        if state is not None and history and state['exchanges'] < self.max_history:
+            _, bot_ids = self.prompt_encoder.exchange_ids(history[-1])
+            length = len(state['ids']) + len(bot_ids) + len(self.prompt_encoder.user_ids(user_input))
+            if length + max_length <= self.model.config.n_positions:
+                return history[-(state['exchanges'] + 1):], True
+        return history[-self.prompt_history:], False
+    
+    def _generate_with_kv_cache(self, user_input, max_length, temperature, **generate_kwargs):
+        """Generate while reusing the attention cache from the previous turn
+        
+        Each turn only the previous answer and the new question are run through
+        the model while the prefix can grow (see _kv_window). Extra keyword
+        arguments such as a streamer go to model.generate.
+        """
+        import torch
+        from transformers import LogitsProcessorList
+        
+        user_ids = self.prompt_encoder.user_ids(user_input)
+        window, extend = self._kv_window(user_input, max_length)
+        if extend:
+            state = self._kv_state
+            _, bot_ids = self.prompt_encoder.exchange_ids(window[-1])
+            ids = state['ids'] + (bot_ids + user_ids).tolist()
+            past = state['past']
+            new_tokens = ids[len(state['ids']) - 1:-1]
+        else:
+            ids = (self.prompt_encoder.history_ids(window) + user_ids).tolist()
+            past = None
+            new_tokens = ids[:-1]
+        
+        with torch.no_grad():
+            # Prefill only the tokens the cache does not cover yet (all but the last)
+            if new_tokens:
+                past = self.model(
+                    torch.tensor([new_tokens]),
+                    past_key_values=past,
+                    use_cache=True
+                ).past_key_values
+            
+            input_ids = torch.tensor([ids])
+            processor = self._stop_processor(max_length)
+            output = self.model.generate(
+                input_ids,
+                attention_mask=torch.ones_like(input_ids),
+                past_key_values=past,
+                pad_token_id=self.prompt_encoder.pad_token_id,
+                logits_processor=LogitsProcessorList([processor]),
+                **self._generation_kwargs(max_length, temperature),
+                **generate_kwargs
+            )
+        
+        self.last_generation_stats = processor.summary(output)
+        self._kv_state = {'ids': ids, 'past': past, 'exchanges': len(window)}
+        return self.tokenizer.decode(output[0, len(ids):], skip_special_tokens=False)
+    
+    def _recent_history(self, conversation=None):
+        """The exchanges that go into the prompt"""
+        history = self.conversation_history if conversation is None else conversation.history
+        return list(history)[-self.prompt_history:]
+    
+    def _build_prompt_ids(self, user_input, intent, conversation=None):
+        """Build prompt token ids with conversation history
+        
+        Same tokens as encoding "<|user|> {user} <|bot|> {bot} <|endoftext|>\n" per
+        exchange plus "<|user|> {user_input} <|bot|>", but each exchange is only
+        tokenized once (see prompt_encoder.PromptEncoder).
+        """
+        return self.prompt_encoder.prompt_ids(self._recent_history(conversation), user_input)
+    
+    def _update_history(self, user_input, bot_response, intent, conversation=None):
         """Update conversation history"""
+        if conversation is not None:
+            conversation.add_exchange(user_input, bot_response, intent)
+            return
+        
         self.conversation_history.append({
             'user': user_input,
             'bot': bot_response,
@@ -153,16 +808,108 @@ class PidginChatbot:
     def clear_history(self):
         """Clear conversation history"""
         self.conversation_history = []
+        self._kv_state = None
     
     def save_conversation(self, filename="conversation_log.json"):
         """Save conversation to file"""
         os.makedirs("data", exist_ok=True)
         filepath = f"data/{filename}"
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(self.conversation_history, f, indent=2, ensure_ascii=False)
+            history = [{k: v for k, v in exchange.items() if k != 'ids'} for exchange in self.conversation_history]
+            json.dump(history, f, indent=2, ensure_ascii=False)
         print(f"💾 Conversation saved to {filepath}")
 
 
+class StreamCleaner:
+    """Incremental version of PidginChatbot.clean_response for streamed text
+    
+    The pieces returned by feed() and finish() join up to exactly what
+    clean_response returns for the whole generated text.
+    """
+    
+    STOP_MARKERS = ('<|user|>', '<|endoftext|>')
+    DROP_MARKERS = ('<|bot|>',)
+    MAX_CHARS = 300
+    MAX_SENTENCES = 2
+    
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self._pending = ""
+        self._space = ""
+        self._held = ""
+        self._sentences = 0
+    
+    def feed(self, chunk):
+        """Add newly decoded text and return the part that is safe to show"""
+        if self.done:
+            return ""
+        
+        self._pending += chunk
+        for marker in self.STOP_MARKERS:
+            if marker in self._pending:
+                self._pending = self._pending[:self._pending.index(marker)]
+                self.done = True
+        
+        # Hold back a trailing '<...' that could still become a marker
+        safe = self._pending
+        if not self.done:
+            start = safe.rfind('<')
+            markers = self.STOP_MARKERS + self.DROP_MARKERS
+            if start != -1 and any(m.startswith(safe[start:]) for m in markers):
+                safe = safe[:start]
+        self._pending = self._pending[len(safe):]
+        
+        out = self._accept(safe)
+        if self.done:
+            out += self._release()
+        return out
+    
+    def finish(self):
+        """Flush whatever is left once generation has ended"""
+        out = ""
+        if not self.done:
+            out = self._accept(self._pending)
+        self._pending = ""
+        out += self._release()
+        self.done = True
+        return out
+    
+    def _accept(self, text):
+        """Apply whitespace trimming and the sentence budget to text up to a stop marker"""
+        for marker in self.DROP_MARKERS:
+            text = text.replace(marker, '')
+        out = ""
+        for char in text:
+            if self._sentences < self.MAX_SENTENCES:
+                # Leading whitespace is dropped; other whitespace waits until more text follows it
+                if char.isspace():
+                    if self.text or out:
+                        self._space += char
+                    continue
+                out += self._space + char
+                self._space = ""
+                if char in '.!?':
+                    self._sentences += 1
+            else:
+                # Past the sentence budget: only kept if the answer stays short
+                self._held += char
+                if len(self.text) + len(out) + len(self._held.rstrip()) > self.MAX_CHARS:
+                    self._held = ""
+                    self.done = True
+                    break
+        self.text += out
+        return out
+    
+    def _release(self):
+        """Emit held text once the answer is known to stay within MAX_CHARS"""
+        out = self._held.rstrip()
+        self._held = ""
+        self._space = ""
+        self.text += out
+        return out
+
+
 class RuleBasedFallback:
     """Fallback responses when model is not available"""
     
@@ -204,16 +951,31 @@ class RuleBasedFallback:
         'goodbye': "Goodbye! Hope you don learn something new. See you next time!",
     }
     
+    @staticmethod
+    def match(user_input):
+        """Return the first (key, response) in RESPONSES order whose key is a word in the input, or None"""
+        _, _, key = scan_keywords(user_input.lower())
+        if key is None:
+            return None
+        return key, RuleBasedFallback.RESPONSES[key]
+    
     @staticmethod
     def get_response(user_input):
         """Try to match user input to a fallback response"""
-        user_lower = user_input.lower()
-        
-        for key, response in RuleBasedFallback.RESPONSES.items():
-            if key in user_lower:
-                return response
+        match = RuleBasedFallback.match(user_input)
+        return match[1] if match else None
+    
+    @staticmethod
+    def get_confident_response(user_input, min_coverage=0.5):
+        """Only answer when the matched key makes up most of the message ("thanks", not "add 15 + 28")"""
+        match = RuleBasedFallback.match(user_input)
+        if not match:
+            return None
         
-        return None
+        text = re.sub(r'[^\w\s]', '', user_input.lower()).strip()
+        if not text or len(match[0]) / len(text) < min_coverage:
+            return None
+        return match[1]
 
 
 # Test the chatbot
@@ -234,5 +996,5 @@ if __name__ == "__main__":
     for user_input in test_inputs:
         print(f"\n👤 User: {user_input}")
         response = bot.generate_response(user_input)
-        print(f"🤖 Bot: {response}")
+        print(f"🤖 Bot ({bot.last_tier}): {response}")
         print("-" * 70)
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+Generation Helpers
+Hooks into the transformers generation loop used by the chatbot engine
+"""
+
+import time
+
+from transformers import LogitsProcessor, StoppingCriteria, TextIteratorStreamer
+
+
+class CancelCriteria(StoppingCriteria):
+    """Stops generation as soon as the given threading.Event is set"""
+
+    def __init__(self, cancel_event):
+        self.cancel_event = cancel_event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return self.cancel_event.is_set()
+
+
+class TimedTextStreamer(TextIteratorStreamer):
+    """TextIteratorStreamer that adds up the time spent decoding tokens into decode_s"""
+
+    def __init__(self, tokenizer, **kwargs):
+        super().__init__(tokenizer, **kwargs)
+        self.decode_s = 0.0
+
+    def put(self, value):
+        start = time.perf_counter()
+        super().put(value)
+        self.decode_s += time.perf_counter() - start
+
+
+class StopSequenceProcessor(LogitsProcessor):
+    """Ends each sequence once clean_response would discard everything after it
+
+    A sequence stops when it emits a turn marker or has passed the two-sentence,
+    300-character budget that clean_response keeps. This is a logits processor
+    that forces EOS for that row rather than a StoppingCriteria, because stopping
+    criteria can only end the whole batch and batched rows must stop on their own.
+    """
+
+    STOP_MARKERS = ('<|user|>', '<|endoftext|>')
+
+    def __init__(self, tokenizer, eos_token_id, max_new_tokens, max_chars=300, max_sentences=2):
+        self.tokenizer = tokenizer
+        self.eos_token_id = eos_token_id
+        self.max_new_tokens = max_new_tokens
+        self.max_chars = max_chars
+        self.max_sentences = max_sentences
+        self.prompt_length = None
+        self.texts = []
+        self.reasons = []
+
+    def __call__(self, input_ids, scores):
+        if self.prompt_length is None:
+            # First step: nothing has been generated yet
+            self.prompt_length = input_ids.shape[1]
+            self.texts = [""] * input_ids.shape[0]
+            self.reasons = [None] * input_ids.shape[0]
+            return scores
+
+        for row in range(input_ids.shape[0]):
+            if self.reasons[row] is not None:
+                continue
+            token = input_ids[row, -1].item()
+            if token == self.eos_token_id:
+                self.reasons[row] = 'eos'
+                continue
+
+            self.texts[row] += self.tokenizer.decode([token])
+            reason = self._stop_reason(self.texts[row])
+            if reason:
+                self.reasons[row] = reason
+                scores[row, :] = float('-inf')
+                scores[row, self.eos_token_id] = 0.0
+        return scores
+
+    def _stop_reason(self, text):
+        """Return why this text needs no further tokens, or None"""
+        for marker in self.STOP_MARKERS:
+            if marker in text:
+                return 'marker'
+        answer = text.replace('<|bot|>', '').strip()
+        if len(answer) > self.max_chars and sum(answer.count(c) for c in '.!?') >= self.max_sentences:
+            return 'sentences'
+        return None
+
+    def summary(self, output_ids, row=0):
+        """Tokens generated and saved for one row of the generate output"""
+        start = self.prompt_length if self.prompt_length is not None else output_ids.shape[1]
+        generated = output_ids[row, start:].tolist()
+        if self.eos_token_id in generated:
+            new_tokens = generated.index(self.eos_token_id) + 1
+        else:
+            new_tokens = len(generated)
+
+        reason = self.reasons[row] if row < len(self.reasons) else None
+        if reason is None:
+            reason = 'eos' if self.eos_token_id in generated else 'length'
+        saved = self.max_new_tokens - new_tokens if reason in ('marker', 'sentences') else 0
+        return {'new_tokens': new_tokens, 'tokens_saved': saved, 'stop_reason': reason}
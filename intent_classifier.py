@@ -0,0 +1,130 @@
+"""
+Intent Classifier
+Linear model over hashed character n-grams, trained on the dataset's category labels
+"""
+
+import csv
+import hashlib
+import math
+import os
+import pickle
+import threading
+from collections import Counter
+
+
+class IntentClassifier:
+    """math / coding / general classifier that replaces keyword counting in detect_intent"""
+
+    def __init__(self, csv_file="data/pidgin_dataset.csv", model_file="models/intent_classifier.pkl"):
+        """Configure the classifier; nothing is read from disk until the first prediction"""
+        self.csv_file = csv_file
+        self.model_file = model_file
+        self._model = None
+        self._analyzer = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _vectorizer():
+        """Stateless featurizer: nothing to fit, so only the linear weights are stored"""
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        return HashingVectorizer(analyzer='char_wb', ngram_range=(2, 4), n_features=2 ** 16,
+                                 alternate_sign=False, lowercase=True)
+
+    def _source_hash(self):
+        """Hash of the dataset so a stale model is retrained automatically"""
+        with open(self.csv_file, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def fit(self, questions, labels):
+        """Train on (question, label) lists and keep the model in memory"""
+        import numpy as np
+        from sklearn.linear_model import LogisticRegression
+
+        vectorizer = self._vectorizer()
+        classifier = LogisticRegression(C=10.0, max_iter=1000)
+        classifier.fit(vectorizer.transform(questions), labels)
+
+        coef = classifier.coef_
+        intercept = classifier.intercept_
+        if len(classifier.classes_) == 2:
+            # Binary models store one row; expand so argmax works the same way
+            coef = [-coef[0], coef[0]]
+            intercept = [-intercept[0], intercept[0]]
+
+        self._model = {
+            'vectorizer': vectorizer,
+            'weights': np.asarray(coef, dtype=np.float32).T.copy(),
+            'intercept': np.asarray(intercept, dtype=np.float32),
+            'classes': list(classifier.classes_),
+        }
+        return self._model
+
+    def build(self):
+        """Train on the dataset's user_input/category columns and persist the model"""
+        with open(self.csv_file, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+
+        model = self.fit([row['user_input'] for row in rows], [row['category'] for row in rows])
+        model['source_hash'] = self._source_hash()
+
+        os.makedirs(os.path.dirname(self.model_file) or ".", exist_ok=True)
+        with open(self.model_file, 'wb') as f:
+            pickle.dump(model, f)
+        return model
+
+    def load(self):
+        """Load the persisted model, retraining it if missing or out of date"""
+        with self._lock:
+            if self._model is None:
+                model = None
+                if os.path.exists(self.model_file):
+                    with open(self.model_file, 'rb') as f:
+                        model = pickle.load(f)
+                    # Keep a shipped model even when the source CSV is not deployed
+                    if os.path.exists(self.csv_file) and model.get('source_hash') != self._source_hash():
+                        model = None
+                self._model = model or self.build()
+            return self._model
+
+    def available(self):
+        """True if there is a trained model or data to train one"""
+        return self._model is not None or os.path.exists(self.model_file) or os.path.exists(self.csv_file)
+
+    def predict(self, texts):
+        """Labels for a list of messages, scored together in one sparse matrix product"""
+        model = self.load()
+        features = model['vectorizer'].transform(texts)
+        scores = features @ model['weights'] + model['intercept']
+        return [model['classes'][index] for index in scores.argmax(axis=1)]
+
+    def predict_one(self, text):
+        """Label for a single message
+        
+        Hashes the n-grams directly (same features as HashingVectorizer) instead of
+        building a sparse matrix, which costs more than the maths for one row.
+        """
+        model = self.load()
+        if self._analyzer is None:
+            from sklearn.utils import murmurhash3_32
+
+            analyzer = model['vectorizer'].build_analyzer()
+            n_features = model['vectorizer'].n_features
+            self._analyzer = lambda t: Counter(abs(murmurhash3_32(ngram)) % n_features for ngram in analyzer(t))
+
+        counts = self._analyzer(text)
+        if not counts:
+            return self.predict([text])[0]
+        norm = math.sqrt(sum(count * count for count in counts.values()))
+        indices = list(counts)
+        values = [count / norm for count in counts.values()]
+        scores = values @ model['weights'][indices] + model['intercept']
+        return model['classes'][int(scores.argmax())]
+
+
+# Pretrain the classifier
+if __name__ == "__main__":
+    classifier = IntentClassifier()
+    model = classifier.build()
+    print(f"✅ Trained intent classifier on {classifier.csv_file} ({', '.join(model['classes'])})")
+    print(f"💾 Saved to {classifier.model_file}")
@@ -0,0 +1,84 @@
+"""
+Keyword Matcher
+Aho–Corasick automaton that finds every keyword in one pass with word-boundary rules
+"""
+
+from collections import deque
+
+
+class KeywordMatcher:
+    """Multi-pattern matcher; cost per message depends on its length, not on the number of keywords
+
+    Word keywords ("add", "good morning") only match whole words, optionally
+    with a plural "s" ("variables") when they are longer than two letters, so
+    "his" is not "hi". Symbol keywords ("+", "-") only match
+    when no letter touches them, so "15 - 3" counts but "f-string" does not.
+    """
+
+    def __init__(self, keywords):
+        """Compile the automaton for an iterable of lowercase keywords"""
+        self.keywords = list(dict.fromkeys(keywords))
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].append(index)
+
+        # Breadth-first so every fail link points to an already finished state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                if self._fail[child] == child:
+                    self._fail[child] = 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text):
+        """Yield (start, keyword) for every keyword occurrence that respects word boundaries"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                keyword = self.keywords[index]
+                start = end - len(keyword) + 1
+                if self._bounded(text, start, end, keyword):
+                    yield start, keyword
+
+    @staticmethod
+    def _bounded(text, start, end, keyword):
+        """Whole-word check for word keywords, no-adjacent-letter check for symbols"""
+        before = text[start - 1] if start > 0 else ' '
+        after = text[end + 1] if end + 1 < len(text) else ' '
+        if not keyword[0].isalnum():
+            if before.isalpha():
+                return False
+        elif before.isalnum() or before == '_':
+            return False
+
+        if not keyword[-1].isalnum():
+            return not after.isalpha()
+        if after == 's' and keyword[-1] != 's' and len(keyword) > 2:
+            # Plural: "variables", "fractions" (not "his" for "hi" or "is" for "i")
+            after = text[end + 2] if end + 2 < len(text) else ' '
+        return not (after.isalnum() or after == '_')
+
+    def matches(self, text):
+        """Set of keywords found in text"""
+        return {keyword for _, keyword in self.find(text)}
@@ -0,0 +1,556 @@
+"""
+Math Solver Tier
+Exact arithmetic, fractions, percentages and one-variable linear equations with Pidgin working steps
+"""
+
+import math
+import re
+from decimal import Decimal, localcontext
+from fractions import Fraction
+
+NUM = r'(\d+(?:\.\d+)?)'
+
+# Word forms rewritten to symbols before parsing ("subtract 3 from 10" -> "10 - 3")
+REWRITES = [
+    (re.compile(rf'\bsubtract {NUM} from {NUM}'), r'\2 - \1'),
+    (re.compile(rf'\b(?:the )?sum of {NUM} and {NUM}'), r'\1 + \2'),
+    (re.compile(rf'\badd {NUM} (?:and|to|with) {NUM}'), r'\1 + \2'),
+    (re.compile(rf'\b(?:the )?difference between {NUM} and {NUM}'), r'\1 - \2'),
+    (re.compile(rf'\b(?:the )?product of {NUM} and {NUM}'), r'\1 × \2'),
+    (re.compile(rf'\bmultiply {NUM} (?:by|and|with) {NUM}'), r'\1 × \2'),
+    (re.compile(rf'\bdivide {NUM} by {NUM}'), r'\1 ÷ \2'),
+    (re.compile(r'\bmultiplied by\b'), '×'),
+    (re.compile(r'\bdivided by\b'), '÷'),
+    (re.compile(r'\btimes\b'), '×'),
+    (re.compile(r'\bplus\b'), '+'),
+    (re.compile(r'\bminus\b'), '-'),
+    (re.compile(r'\bper ?cent\b'), '%'),
+]
+
+PERCENT_OF = re.compile(rf'{NUM}\s*% of {NUM}')
+TOKEN = re.compile(r"(\d+/\d+)(?![\d.])|(\d+(?:\.\d+)?)|([a-z']+)|([+\-×÷*/()=])|(\S)")
+
+# Words that may surround the maths without changing what is asked
+FILLER = {
+    'how', 'i', 'go', 'do', 'we', 'you', 'me', 'make', 'fit', 'can', 'help', 'show', 'tell', 'abeg', 'please', 'pls',
+    'wetin', 'what', "what's", 'whats', 'is', 'be', 'na', 'the', 'answer', 'result', 'value', 'of', 'to', 'for',
+    'calculate', 'compute', 'work', 'out', 'find', 'solve', 'evaluate', 'simplify', 'equal', 'equals',
+    'add', 'sum', 'subtract', 'difference', 'multiply', 'product', 'divide', 'quick', 'question',
+}
+
+# An operation word must agree with the symbols actually in the question
+OPERATION_WORDS = {
+    'add': '+', 'sum': '+', 'subtract': '-', 'difference': '-',
+    'multiply': '×', 'product': '×', 'divide': '÷',
+}
+
+SYMBOLS = {'*': '×', '/': '÷'}
+PRECEDENCE = {'+': 1, '-': 1, '×': 2, '÷': 2}
+PLACES = ['ones', 'tens', 'hundreds', 'thousands']
+
+MAX_TOKENS = 25
+MAX_DIGITS = 12
+
+
+class MathSolver:
+    """Answers plain arithmetic and linear equations exactly, declining anything else"""
+
+    def answer(self, user_input):
+        """Return a step-by-step Pidgin answer, or None if the question is not plain maths"""
+        if len(user_input) > 200:
+            return None
+
+        text = user_input.lower().replace('−', '-').replace('–', '-')
+        for pattern, replacement in REWRITES:
+            text = pattern.sub(replacement, text)
+        if '=' not in text:
+            # "12 x 8" is multiplication unless the question is an equation
+            text = re.sub(r'(\d)\s*x\s*(?=\d)', r'\1 × ', text)
+
+        match = PERCENT_OF.search(text)
+        if match:
+            rest = TOKEN.findall(text[:match.start()] + ' ' + text[match.end():])
+            if not all(word in FILLER or punct for _, _, word, _, punct in rest):
+                return None
+            return self._percent_answer(Fraction(match.group(1)), Fraction(match.group(2)),
+                                        match.group(1), match.group(2))
+
+        tokens = self._tokenize(text)
+        if tokens is None:
+            return None
+        try:
+            if any(kind == 'op' and value == '=' for kind, value, _ in tokens):
+                return self._equation_answer(tokens)
+            return self._expression_answer(tokens)
+        except ZeroDivisionError:
+            return "You no fit divide by zero! Nothing fit share into zero groups. Check the numbers again."
+        except (ValueError, IndexError):
+            return None
+
+    def _tokenize(self, text):
+        """The single run of maths in the text, or None if other words surround it"""
+        raw = []
+        for fraction, number, word, op, punct in TOKEN.findall(text):
+            if fraction:
+                raw.append(('frac', fraction))
+            elif number:
+                raw.append(('num', number))
+            elif word:
+                raw.append(('word', word))
+            elif op:
+                raw.append(('op', SYMBOLS.get(op, op)))
+            else:
+                raw.append(('punct', punct))
+
+        def is_math(i):
+            kind, value = raw[i]
+            if kind in ('num', 'frac', 'op'):
+                return True
+            # A single letter touching the maths is the unknown ("2x + 5 = 15")
+            return kind == 'word' and len(value) == 1 and any(
+                0 <= j < len(raw) and raw[j][0] in ('num', 'frac', 'op') for j in (i - 1, i + 1)
+            )
+
+        runs = []
+        for i in range(len(raw)):
+            if is_math(i):
+                if runs and runs[-1][-1] == i - 1:
+                    runs[-1].append(i)
+                else:
+                    runs.append([i])
+        runs = [run for run in runs if any(raw[i][0] in ('num', 'frac') for i in run)]
+        if len(runs) != 1 or len(runs[0]) > MAX_TOKENS:
+            return None
+
+        expression = [raw[i] for i in runs[0]]
+        ops = {value for kind, value in expression if kind == 'op'}
+        if not ops and not any(kind == 'frac' for kind, _ in expression):
+            return None
+        if any(kind in ('num', 'frac') and len(value) > MAX_DIGITS for kind, value in expression):
+            return None
+
+        variables = {value for kind, value in expression if kind == 'word'}
+        for i, (kind, value) in enumerate(raw):
+            if i in runs[0] or kind == 'punct':
+                continue
+            if kind != 'word' or (value not in FILLER and value not in variables):
+                return None
+            if value in OPERATION_WORDS and OPERATION_WORDS[value] not in ops | {'='}:
+                return None
+
+        return [(kind if kind != 'word' else 'var', value, i) for i, (kind, value) in enumerate(expression)]
+
+    def _parse(self, tokens):
+        """Recursive-descent parse into ('num', value, is_fraction) / ('var', name) / ('bin', op, left, right)"""
+        # "2x" and "3(x + 1)" mean multiplication
+        expanded = []
+        for kind, value, _ in tokens:
+            if expanded and (kind == 'var' or value == '(') and (
+                    expanded[-1][0] in ('num', 'frac', 'var') or expanded[-1][1] == ')'):
+                expanded.append(('op', '×'))
+            expanded.append((kind, value))
+
+        position = [0]
+
+        def peek():
+            return expanded[position[0]] if position[0] < len(expanded) else (None, None)
+
+        def take():
+            token = peek()
+            position[0] += 1
+            return token
+
+        def expression():
+            node = term()
+            while peek()[1] in ('+', '-'):
+                node = ('bin', take()[1], node, term())
+            return node
+
+        def term():
+            node = factor()
+            while peek()[1] in ('×', '÷'):
+                node = ('bin', take()[1], node, factor())
+            return node
+
+        def factor():
+            kind, value = take()
+            if value == '-':
+                inner = factor()
+                if inner[0] == 'num':
+                    return ('num', -inner[1], inner[2])
+                return ('bin', '×', ('num', Fraction(-1), False), inner)
+            if value == '(':
+                node = expression()
+                if take()[1] != ')':
+                    raise ValueError("unbalanced brackets")
+                return node
+            if kind == 'num':
+                return ('num', Fraction(value), False)
+            if kind == 'frac':
+                top, bottom = value.split('/')
+                return ('num', Fraction(int(top), int(bottom)), True)
+            if kind == 'var':
+                return ('var', value)
+            raise ValueError(f"unexpected token {value}")
+
+        tree = expression()
+        if position[0] != len(expanded):
+            raise ValueError("trailing tokens")
+        return tree
+
+    # Formatting
+
+    @staticmethod
+    def _has_fraction(node):
+        if node[0] == 'num':
+            return node[2]
+        if node[0] == 'bin':
+            return MathSolver._has_fraction(node[2]) or MathSolver._has_fraction(node[3])
+        return False
+
+    @staticmethod
+    def _format(value, as_fraction=False):
+        """Whole numbers plainly, exact decimals when they end, otherwise a fraction"""
+        if value.denominator == 1:
+            return str(value.numerator)
+        if as_fraction:
+            return f"{value.numerator}/{value.denominator}"
+        denominator = value.denominator
+        for factor in (2, 5):
+            while denominator % factor == 0:
+                denominator //= factor
+        if denominator == 1:
+            with localcontext() as context:
+                context.prec = 50
+                return format(Decimal(value.numerator) / Decimal(value.denominator), 'f')
+        return f"{value.numerator}/{value.denominator} (about {float(value):.3f})"
+
+    def _render(self, node, as_fraction, parent=0, right=False):
+        """Expression text with only the brackets precedence needs"""
+        if node[0] == 'var':
+            return node[1]
+        if node[0] == 'num':
+            text = self._format(node[1], as_fraction or node[2]).split(' (about')[0]
+            return f"({text})" if node[1] < 0 and parent else text
+        _, op, left, right_node = node
+        negative_operand = False
+        if op == '×' and left[0] == 'num' and right_node[0] == 'var':
+            # "x" and "-2x" rather than "1x" and "(-2)x"
+            coefficient = {1: '', -1: '-'}.get(left[1])
+            if coefficient is None:
+                coefficient = self._format(abs(left[1]), as_fraction or left[2]).split(' (about')[0]
+                coefficient = f"-{coefficient}" if left[1] < 0 else coefficient
+            text = f"{coefficient}{right_node[1]}"
+            negative_operand = left[1] < 0 and right
+        else:
+            text = (f"{self._render(left, as_fraction, PRECEDENCE[op])} {op} "
+                    f"{self._render(right_node, as_fraction, PRECEDENCE[op], True)}")
+        precedence = PRECEDENCE[op]
+        if precedence < parent or (right and precedence == parent) or negative_operand:
+            text = f"({text})"
+        return text
+
+    # Arithmetic
+
+    @staticmethod
+    def _apply(op, a, b):
+        if op == '+':
+            return a + b
+        if op == '-':
+            return a - b
+        if op == '×':
+            return a * b
+        return a / b
+
+    def _reduce(self, node):
+        """Evaluate the leftmost operation whose operands are both numbers"""
+        _, op, left, right = node
+        if left[0] == 'num' and right[0] == 'num':
+            return ('num', self._apply(op, left[1], right[1]), False)
+        if left[0] != 'num':
+            return ('bin', op, self._reduce(left), right)
+        return ('bin', op, left, self._reduce(right))
+
+    def _expression_answer(self, tokens):
+        tree = self._parse(tokens)
+        if any(kind == 'var' for kind, _, _ in tokens):
+            return None
+        as_fraction = self._has_fraction(tree)
+
+        if tree[0] == 'num':
+            # A lone fraction: "wetin be 24/6?"; a bare or bracketed number is not a question
+            if len(tokens) != 1 or tokens[0][0] != 'frac':
+                return None
+            written, value = tokens[0][1], tree[1]
+            simplest = self._render(tree, True)
+            if value.denominator == 1:
+                return f"{written} = {simplest}. The top number divide the bottom number exactly!"
+            if simplest == written:
+                top, bottom = written.split('/')
+                decimal = self._format(value).split(' (about ')
+                decimal = decimal[0] if len(decimal) == 1 else f"about {decimal[1][:-1]}"
+                return (f"{written} don already dey its simplest form: {top} and {bottom} no get any common "
+                        f"factor. As decimal e be {decimal}.")
+            return (f"{written} = {simplest} when you simplify am: "
+                    f"divide top and bottom by the same number until you no fit again.")
+
+        _, op, left, right = tree
+        if left[0] == 'num' and right[0] == 'num':
+            if as_fraction:
+                return self._fraction_answer(op, left[1], right[1])
+            return self._simple_answer(op, left[1], right[1])
+
+        lines = [self._render(tree, as_fraction)]
+        node = tree
+        while node[0] != 'num':
+            node = self._reduce(node)
+            lines.append(self._render(node, as_fraction))
+        result = self._format(node[1], as_fraction)
+        return ("Make we do am step by step (brackets first, then × and ÷, then + and -):\n"
+                + f"{lines[0]}\n" + "\n".join(f"= {line}" for line in lines[1:])
+                + f"\nSo answer na {result}.")
+
+    def _simple_answer(self, op, a, b):
+        """Worked explanation for one operation on two numbers"""
+        fmt = self._format
+        result = self._apply(op, a, b)
+        head = f"{fmt(a)} {op} {fmt(b)} = {fmt(result)}."
+        whole = a.denominator == 1 and b.denominator == 1 and a >= 0 and b >= 0
+        a_int, b_int = int(a), int(b)
+
+        if op == '+':
+            if whole and max(a, b) >= 10:
+                return f"{head} Make I show you: {self._column_addition(a_int, b_int)}. So answer na {fmt(result)}."
+            if whole:
+                return f"{head} E be like you get {a_int} things and you collect {b_int} more, you go get {fmt(result)}!"
+            if a.denominator == 1 and b.denominator == 1:
+                direction = 'right' if b > 0 else 'left'
+                return f"{head} Use number line: start from {fmt(a)} and move {abs(b_int)} steps to the {direction}."
+            return f"{head} Line up the decimal points, then add like normal numbers."
+
+        if op == '-':
+            if whole and a >= b:
+                steps = f" From right: {self._column_subtraction(a_int, b_int)}." if a >= 10 and b >= 10 else ""
+                return f"{head}{steps} You fit check am: {fmt(b)} + {fmt(result)} = {fmt(a)}!"
+            if result < 0 and a >= 0 and b >= 0:
+                return f"{head} Because {fmt(b)} big pass {fmt(a)}, the answer na negative number."
+            if a.denominator == 1 and b.denominator == 1:
+                return f"{head} To minus negative number na the same as to add am."
+            return f"{head} Line up the decimal points, then subtract like normal numbers."
+
+        if op == '×':
+            if whole:
+                big, small = max(a_int, b_int), min(a_int, b_int)
+                if big >= 10 and 1 < small < 10 and big % 10:
+                    head_part = big - big % 10
+                    return (f"{head} Make I break am down: ({head_part} × {small}) + ({big % 10} × {small}) = "
+                            f"{head_part * small} + {(big % 10) * small} = {fmt(result)}.")
+                if 1 < small <= 5 and big < 100:
+                    return f"{head} E mean say you add {big}, {small} times: {' + '.join([str(big)] * small)} = {fmt(result)}."
+            return f"{head} Multiplication na quick way to add the same number many times."
+
+        # Division
+        if b == 0:
+            raise ZeroDivisionError
+        if whole:
+            if result.denominator == 1:
+                return (f"{head} E mean say if you share {a_int} things equally for {b_int} people, each person go get "
+                        f"{fmt(result)}. You fit check am: {b_int} × {fmt(result)} = {a_int}!")
+            quotient, remainder = divmod(a_int, b_int)
+            return (f"{fmt(a)} ÷ {fmt(b)} = {quotient} remainder {remainder}. {b_int} fit enter {a_int} up to "
+                    f"{quotient} times, and {remainder} go remain, so the exact answer na {fmt(result)}.")
+        return f"{head} Division na how many times {fmt(b)} fit enter {fmt(a)}."
+
+    def _fraction_answer(self, op, a, b):
+        """Working for fractions: common bottom numbers, or tops and bottoms together"""
+        fmt = lambda value: self._format(value, True)
+        result = self._apply(op, a, b)
+        head = f"{fmt(a)} {op} {fmt(b)} = {fmt(result)}."
+        if op in ('+', '-'):
+            bottom = a.denominator * b.denominator // math.gcd(a.denominator, b.denominator)
+            top_a = a.numerator * (bottom // a.denominator)
+            top_b = b.numerator * (bottom // b.denominator)
+            top = top_a + top_b if op == '+' else top_a - top_b
+            steps = f"Make the bottom numbers the same ({bottom}): {top_a}/{bottom} {op} {top_b}/{bottom} = {top}/{bottom}"
+            if Fraction(top, bottom) != result or result.denominator != bottom:
+                steps += f", then simplify am to {fmt(result)}"
+            return f"{head} {steps}."
+        if op == '×':
+            return (f"{head} To multiply fractions, multiply the top numbers together "
+                    f"({a.numerator} × {b.numerator}) and the bottom numbers together ({a.denominator} × {b.denominator}), "
+                    f"then simplify.")
+        if b == 0:
+            raise ZeroDivisionError
+        return (f"{head} To divide by a fraction, flip the second one upside down ({b.denominator}/{b.numerator}) "
+                f"and multiply instead.")
+
+    def _percent_answer(self, percent, amount, percent_text, amount_text):
+        """'10% of 200' with the usual shortcut when there is one"""
+        result = percent * amount / 100
+        head = f"{percent_text}% of {amount_text} = {self._format(result)}."
+        shortcuts = {
+            Fraction(10): "10% na same as dividing by 10",
+            Fraction(50): "50% na half, so just divide by 2",
+            Fraction(25): "25% na quarter, so divide by 4",
+            Fraction(100): "100% na the whole thing",
+        }
+        if percent in shortcuts:
+            return f"{head} Easy trick: {shortcuts[percent]}!"
+        return f"{head} Percent mean 'out of 100', so {percent_text}/100 × {amount_text} = {self._format(result)}."
+
+    @staticmethod
+    def _column_addition(a, b):
+        """Place-value working for adding two whole numbers"""
+        steps = []
+        carry = 0
+        for place in range(max(len(str(a)), len(str(b)))):
+            digit_a = a // 10 ** place % 10
+            digit_b = b // 10 ** place % 10
+            total = digit_a + digit_b + carry
+            name = PLACES[place] if place < len(PLACES) else f"column {place + 1}"
+            parts = f"{digit_a} + {digit_b}" + (f" + {carry}(carry)" if carry else "")
+            carry, digit = divmod(total, 10)
+            last = place == max(len(str(a)), len(str(b))) - 1
+            if carry and not last:
+                steps.append(f"{name}: {parts} = {total} (write {digit}, carry {carry})")
+            else:
+                steps.append(f"{name}: {parts} = {total}")
+        return ", ".join(steps)
+
+    @staticmethod
+    def _column_subtraction(a, b):
+        """Place-value working for a - b with a >= b"""
+        steps = []
+        borrow = 0
+        for place in range(len(str(a))):
+            top = a // 10 ** place % 10 - borrow
+            bottom = b // 10 ** place % 10
+            name = PLACES[place] if place < len(PLACES) else f"column {place + 1}"
+            beyond_b = place >= len(str(b))
+            if beyond_b and not borrow:
+                break
+            if top < bottom:
+                steps.append(f"{name}: borrow 1 from the next column, so {top + 10} - {bottom} = {top + 10 - bottom}")
+                borrow = 1
+                continue
+            if beyond_b and top == 0 and place == len(str(a)) - 1:
+                break
+            after = " (after borrowing)" if borrow else ""
+            steps.append(f"{name}: {top} - {bottom} = {top - bottom}{after}")
+            borrow = 0
+        return ", ".join(steps)
+
+    # Equations
+
+    def _linear(self, node, variable):
+        """(coefficient, constant) of a linear expression; raises ValueError if not linear"""
+        kind = node[0]
+        if kind == 'num':
+            return Fraction(0), node[1]
+        if kind == 'var':
+            if node[1] != variable:
+                raise ValueError("more than one unknown")
+            return Fraction(1), Fraction(0)
+        _, op, left, right = node
+        a1, b1 = self._linear(left, variable)
+        a2, b2 = self._linear(right, variable)
+        if op == '+':
+            return a1 + a2, b1 + b2
+        if op == '-':
+            return a1 - a2, b1 - b2
+        if op == '×':
+            if a1 and a2:
+                raise ValueError("not linear")
+            return a1 * b2 + a2 * b1, b1 * b2
+        if a2:
+            raise ValueError("unknown in the denominator")
+        return a1 / b2, b1 / b2
+
+    def _equation_answer(self, tokens):
+        variables = {value for kind, value, _ in tokens if kind == 'var'}
+        if len(variables) > 1 or sum(1 for _, value, _ in tokens if value == '=') != 1:
+            return None
+        split = next(i for i, (_, value, _) in enumerate(tokens) if value == '=')
+        left_tree = self._parse(tokens[:split])
+        right_tree = self._parse(tokens[split + 1:])
+        fmt = self._format
+        as_fraction = self._has_fraction(left_tree) or self._has_fraction(right_tree)
+        equation = f"{self._render(left_tree, as_fraction)} = {self._render(right_tree, as_fraction)}"
+        if not variables:
+            return self._check_answer(equation, left_tree, right_tree, as_fraction)
+
+        variable = variables.pop()
+        a, b = self._linear(left_tree, variable)
+        c, d = self._linear(right_tree, variable)
+        if a == c:
+            # The unknown cancels out: "x + 1 = x + 1" or "x + 1 = x + 2"
+            if b == d:
+                return (f"The two sides of {equation} na the same thing, so e true for any value of {variable}. "
+                        f"Every number work!")
+            return (f"{equation} no get answer: the {variable} terms cancel and you go remain "
+                    f"{fmt(b, as_fraction)} = {fmt(d, as_fraction)}, which no fit ever be true.")
+        if a == 0:
+            # "3 = 2x - 1" reads better as "2x - 1 = 3"
+            left_tree, right_tree, a, b, c, d = right_tree, left_tree, c, d, a, b
+            equation = f"{self._render(left_tree, as_fraction)} = {self._render(right_tree, as_fraction)}"
+        if left_tree == ('var', variable) and right_tree[0] == 'num':
+            return (f"{equation} don already solve! {variable} dey alone for one side, "
+                    f"so {variable} = {fmt(d, as_fraction)}.")
+
+        steps = []
+        coefficient, constant, total = a - c, b, d
+        term = lambda k: variable if k == 1 else f"-{variable}" if k == -1 else f"{fmt(k, True)}{variable}"
+        if c:
+            steps.append(f"Bring all the {variable} terms to one side: {term(coefficient)}"
+                         + (f" {'+' if constant > 0 else '-'} {fmt(abs(constant), as_fraction)}" if constant else "")
+                         + f" = {fmt(total, as_fraction)}")
+        if constant:
+            moved = total - constant
+            steps.append(f"Carry {fmt(abs(constant), as_fraction)} go the other side "
+                         f"({'minus' if constant > 0 else 'add'} am for both sides): "
+                         f"{term(coefficient)} = {fmt(total, as_fraction)} {'-' if constant > 0 else '+'} "
+                         f"{fmt(abs(constant), as_fraction)} = {fmt(moved, as_fraction)}")
+            total = moved
+        solution = total / coefficient
+        if coefficient.denominator != 1:
+            # "x/2 = 7": multiply by 2 instead of dividing by 0.5
+            steps.append(f"Multiply both sides by {fmt(1 / coefficient, True)}: "
+                         f"{variable} = {fmt(total, as_fraction)} × {fmt(1 / coefficient, True)} = "
+                         f"{fmt(solution, as_fraction)}")
+        elif coefficient != 1:
+            steps.append(f"Divide both sides by {fmt(coefficient, as_fraction)}: "
+                         f"{variable} = {fmt(total, as_fraction)} ÷ {fmt(coefficient, as_fraction)} = "
+                         f"{fmt(solution, as_fraction)}")
+        if not steps:
+            # "x = 2 + 3" or "x + 0 = 5": nothing to move, only the sides to work out
+            steps.append(f"Work out the two sides: {variable} = {fmt(solution, as_fraction)}")
+
+        check = a * solution + b
+        answer = f"Make we solve {equation} step by step:\n"
+        answer += "\n".join(f"{number}. {step}" for number, step in enumerate(steps, start=1))
+        answer += (f"\nSo {variable} = {fmt(solution, as_fraction)}. You fit check am: put {variable} = "
+                   f"{fmt(solution, as_fraction)} inside and both sides go be {fmt(check, as_fraction)} ✅")
+        return answer
+
+    def _check_answer(self, equation, left_tree, right_tree, as_fraction):
+        """An equation without an unknown is a claim to check, not something to solve"""
+        left, right = self._evaluate(left_tree), self._evaluate(right_tree)
+        if left == right:
+            return f"Yes, {equation} na correct: both sides na {self._format(left, as_fraction)} ✅"
+        return (f"No, {equation} no correct: the left side na {self._format(left, as_fraction)} "
+                f"but the right side na {self._format(right, as_fraction)}.")
+
+    def _evaluate(self, node):
+        if node[0] == 'num':
+            return node[1]
+        _, op, left, right = node
+        return self._apply(op, self._evaluate(left), self._evaluate(right))
+
+
+# Try the solver
+if __name__ == "__main__":
+    solver = MathSolver()
+    for question in ["How I go add 15 + 28?", "Calculate 12 × 8", "Subtract 100 - 37", "Divide 100 by 7",
+                     "Wetin be 1/4 + 1/3?", "Calculate 10% of 200", "Solve 2x + 5 = 15", "12 + 3 × (4 - 1)",
+                     "If I get 5 oranges and buy 3 more, how many I get?"]:
+        print(f"👤 {question}\n🧮 {solver.answer(question)}\n")
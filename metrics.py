@@ -0,0 +1,180 @@
+"""
+Metrics
+Latency histograms and component counters in the Prometheus text format
+
+Disabled unless PIDGIN_METRICS_PORT is set: from_env() then returns None and
+every instrumented call site skips recording with a single `is None` check.
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SECONDS_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+# name: (help, buckets)
+HISTOGRAMS = {
+    'pidgin_stage_seconds': ("Time spent in each step of answering a message", SECONDS_BUCKETS),
+    'pidgin_request_seconds': ("End-to-end generate_response time by the tier that answered", SECONDS_BUCKETS),
+    'pidgin_generated_tokens': ("New tokens generated per model answer", TOKEN_BUCKETS),
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram for one label set"""
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, size):
+        self.counts = [0] * (size + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+def _labels(pairs):
+    """Prometheus label block for ((key, value), ...)"""
+    if not pairs:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+class Metrics:
+    """Process-wide registry: histograms observed per request, everything else read at scrape time
+
+    Counters that components already keep (router tiers, cache hits, admission,
+    inference queue, batching, sessions) are not duplicated; render() reads
+    their get_stats() when Prometheus scrapes, so they cost nothing per request.
+    """
+
+    def __init__(self):
+        """Create an empty registry"""
+        self._lock = threading.Lock()
+        self._histograms = {name: {} for name in HISTOGRAMS}
+        self.components = {}
+
+    @classmethod
+    def from_env(cls):
+        """A registry when PIDGIN_METRICS_PORT is set, otherwise None (instrumentation off)"""
+        return cls() if os.getenv('PIDGIN_METRICS_PORT') else None
+
+    def observe(self, name, value, **labels):
+        """Add one observation to a histogram declared in HISTOGRAMS"""
+        key = tuple(sorted(labels.items()))
+        buckets = HISTOGRAMS[name][1]
+        with self._lock:
+            series = self._histograms[name].get(key)
+            if series is None:
+                series = self._histograms[name][key] = Histogram(len(buckets))
+            series.counts[bisect_left(buckets, value)] += 1
+            series.sum += value
+            series.count += 1
+
+    def observe_stages(self, stages):
+        """Record a {stage: seconds} dict into pidgin_stage_seconds"""
+        for stage, seconds in stages.items():
+            self.observe('pidgin_stage_seconds', seconds, stage=stage)
+
+    def track(self, **components):
+        """Register components to read at scrape time (router, response_cache, admission, inference,
+        batching, sessions); components set to None are ignored"""
+        self.components.update({name: c for name, c in components.items() if c is not None})
+
+    def _component_samples(self):
+        """(name, type, help, [(labels, value)]) from the tracked components' get_stats()"""
+        c = self.components
+        if 'router' in c:
+            tiers = c['router'].get_stats()['tiers']
+            yield ('pidgin_tier_served_total', 'counter', "Answers served by each tier",
+                   [((('tier', name),), tier['served']) for name, tier in tiers.items()])
+            yield ('pidgin_tier_declined_total', 'counter', "Tier attempts that passed to the next tier",
+                   [((('tier', name),), tier['declined']) for name, tier in tiers.items()])
+        if 'response_cache' in c:
+            stats = c['response_cache'].get_stats()
+            yield ('pidgin_cache_lookups_total', 'counter', "Response cache lookups",
+                   [((('result', 'hit'),), stats['hits']), ((('result', 'miss'),), stats['misses'])])
+            yield ('pidgin_cache_entries', 'gauge', "Answers held in the response cache",
+                   [((), stats['size'])])
+        if 'admission' in c:
+            stats = c['admission'].get_stats()
+            yield ('pidgin_admission_admitted_total', 'counter', "Requests given a generation slot",
+                   [((), stats['admitted'])])
+            yield ('pidgin_admission_shed_total', 'counter', "Requests answered without the model",
+                   [((('reason', reason),), stats[f'shed_{reason}'])
+                    for reason in ('rate_limited', 'queue_full', 'timeout')])
+            yield ('pidgin_admission_wait_seconds_total', 'counter', "Time admitted requests spent queued",
+                   [((), stats['total_wait_ms'] / 1000)])
+            yield ('pidgin_queue_depth', 'gauge', "Requests waiting", [((('queue', 'admission'),), stats['queue_depth'])])
+            yield ('pidgin_generations_in_flight', 'gauge', "Generations running now", [((), stats['in_flight'])])
+        if 'inference' in c:
+            stats = c['inference'].get_stats()
+            yield ('pidgin_queue_depth', 'gauge', "Requests waiting", [((('queue', 'inference'),), stats['queue_depth'])])
+            yield ('pidgin_inference_wait_seconds_total', 'counter', "Time spent waiting for an inference worker",
+                   [((), stats['total_wait_ms'] / 1000)])
+            yield ('pidgin_inference_rejected_total', 'counter', "Requests refused because the inference queue was full",
+                   [((), stats['rejected'])])
+        if 'batching' in c:
+            stats = c['batching'].get_stats()
+            yield ('pidgin_queue_depth', 'gauge', "Requests waiting", [((('queue', 'batching'),), stats['queue_depth'])])
+            yield ('pidgin_batches_total', 'counter', "Batched generate calls", [((), stats['batches'])])
+            yield ('pidgin_batched_requests_total', 'counter', "Requests answered by batched generate calls",
+                   [((), stats['requests'])])
+        if 'sessions' in c:
+            stats = c['sessions'].get_stats()
+            yield ('pidgin_sessions', 'gauge', "Conversation sessions held in memory", [((), stats['active'])])
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            for name, (help_text, buckets) in HISTOGRAMS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, series in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(buckets + ('+Inf',), series.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(key + (('le', bound),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(key)} {series.sum}")
+                    lines.append(f"{name}_count{_labels(key)} {series.count}")
+
+        # Samples of one family must be contiguous (pidgin_queue_depth comes from several components)
+        families = {}
+        for name, kind, help_text, samples in self._component_samples():
+            families.setdefault(name, (kind, help_text, []))[2].extend(samples)
+        for name, (kind, help_text, samples) in families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{_labels(key)} {value}" for key, value in samples)
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1", before_render=None):
+        """Expose GET /metrics from a daemon thread; returns the server
+
+        before_render, if given, is called on every scrape, e.g. to track
+        components that only exist once a background load has finished.
+        """
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                if before_render is not None:
+                    before_render()
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="pidgin-metrics", daemon=True).start()
+        return server
@@ -0,0 +1,226 @@
+"""
+Model Client
+Small client for model_server.py plus a drop-in chatbot for the frontends
+"""
+
+import http.client
+import json
+import queue
+import time
+from urllib.parse import urlparse
+
+from chatbot import RuleBasedFallback
+
+FALLBACK_MESSAGE = "I dey learn to answer that. Try ask me about Math or Python!"
+
+
+class ModelServerError(Exception):
+    """The model server could not be reached or rejected the request"""
+
+
+class ModelClient:
+    """Keep-alive connections to the model server, reused across requests and threads"""
+
+    def __init__(self, base_url="http://127.0.0.1:8765", timeout=30.0, pool_size=4):
+        """Connections are opened lazily; at most pool_size are kept idle"""
+        url = urlparse(base_url)
+        self.host = url.hostname or "127.0.0.1"
+        self.port = url.port or 80
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    def _connection(self, fresh=False):
+        """(connection, reused): an idle pooled connection unless fresh, else a new one"""
+        if not fresh:
+            try:
+                return self._pool.get_nowait(), True
+            except queue.Empty:
+                pass
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def _release(self, connection):
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def _request(self, method, path, payload=None, headers=None):
+        """Send one JSON request, retrying once if a pooled connection went stale"""
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = dict(headers or {})
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+
+        for attempt in range(2):
+            # The retry always uses a new connection, so a request is sent at most twice
+            connection, reused = self._connection(fresh=attempt > 0)
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (ConnectionError, http.client.HTTPException) as e:
+                connection.close()
+                # Only an idle pooled connection the server has since closed is worth one retry;
+                # a failure on a new connection may mean the server already got the POST
+                if reused:
+                    continue
+                raise ModelServerError(f"{method} {path} failed: {e}") from e
+            except OSError as e:
+                connection.close()
+                raise ModelServerError(f"{method} {path} failed: {e}") from e
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+
+            try:
+                result = json.loads(data)
+            except ValueError as e:
+                raise ModelServerError(f"{method} {path}: invalid JSON from server") from e
+            if response.status != 200:
+                raise ModelServerError(f"{method} {path}: HTTP {response.status} {result.get('error', '')}")
+            return result
+
+    def health(self):
+        """{'status', 'model_status', 'uptime_s'}"""
+        return self._request('GET', '/health')
+
+    def stats(self):
+        """Server-side request, router, cache and batching counters"""
+        return self._request('GET', '/stats')
+
+    def generate(self, user_input, history=(), max_length=150, temperature=0.7, user_key=None, profile=False,
+                 request_id=None):
+        """{'response', 'tier', 'intent', 'model_status'} for one message and its recent history
+
+        profile=True asks the server to profile this request (if it has PIDGIN_PROFILE_DIR set).
+        """
+        headers = {}
+        if profile:
+            headers['X-Pidgin-Profile'] = '1'
+        if request_id is not None:
+            headers['X-Request-Id'] = str(request_id)
+        return self._request('POST', '/generate', {
+            'user_input': user_input,
+            'history': list(history),
+            'user': user_key,
+            'max_length': max_length,
+            'temperature': temperature,
+        }, headers)
+
+    def close(self):
+        """Close every idle pooled connection"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class StubModelClient:
+    """Offline stand-in for ModelClient that records every call (for tests and demos)"""
+
+    def __init__(self, responses=None, model_status='ready'):
+        """responses maps exact messages to answers; anything else gets a rule-based reply"""
+        self.responses = responses or {}
+        self.model_status = model_status
+        self.calls = []
+
+    def health(self):
+        self.calls.append(('health',))
+        return {'status': 'ok', 'model_status': self.model_status, 'uptime_s': 0.0}
+
+    def stats(self):
+        self.calls.append(('stats',))
+        return {'requests': sum(1 for call in self.calls if call[0] == 'generate')}
+
+    def generate(self, user_input, history=(), max_length=150, temperature=0.7, user_key=None, profile=False,
+                 request_id=None):
+        self.calls.append(('generate', user_input, list(history)))
+        if user_input in self.responses:
+            return {'response': self.responses[user_input], 'tier': 'stub', 'intent': 'general',
+                    'model_status': self.model_status}
+        response = RuleBasedFallback.get_response(user_input)
+        return {'response': response or FALLBACK_MESSAGE, 'tier': 'fallback', 'intent': 'general',
+                'model_status': self.model_status}
+
+    def close(self):
+        pass
+
+
+class RemoteChatbot:
+    """PidginChatbot-compatible wrapper that asks the model server instead of loading weights"""
+
+    def __init__(self, client, max_history=5, health_ttl=5.0):
+        """client is a ModelClient (or StubModelClient); history stays in this process"""
+        self.client = client
+        self.max_history = max_history
+        self.health_ttl = health_ttl
+        self.conversation_history = []
+        self.last_tier = None
+        self._health = None
+        self._health_checked = 0.0
+
+    @property
+    def model_status(self):
+        """The server's model status, re-checked at most every health_ttl seconds"""
+        now = time.monotonic()
+        if self._health is None or now - self._health_checked > self.health_ttl:
+            try:
+                self._health = self.client.health()['model_status']
+            except ModelServerError:
+                self._health = 'unavailable'
+            self._health_checked = now
+        return self._health
+
+    @property
+    def model_loaded(self):
+        return self.model_status == 'ready'
+
+    def generate_response(self, user_input, max_length=150, temperature=0.7, conversation=None, user_key=None,
+                          profile=False, request_id=None):
+        """Same contract as PidginChatbot.generate_response; rule-based if the server is down"""
+        history = conversation.history if conversation is not None else self.conversation_history
+        recent = [{'user': e['user'], 'bot': e['bot'], 'intent': e['intent']} for e in history]
+
+        try:
+            result = self.client.generate(user_input, recent[-self.max_history:], max_length, temperature,
+                                          user_key, profile, request_id)
+            response, intent, self.last_tier = result['response'], result['intent'], result['tier']
+        except ModelServerError:
+            self._health, self._health_checked = 'unavailable', time.monotonic()
+            response = RuleBasedFallback.get_response(user_input) or FALLBACK_MESSAGE
+            intent, self.last_tier = 'general', 'fallback'
+
+        if conversation is not None:
+            conversation.add_exchange(user_input, response, intent)
+        else:
+            self.conversation_history.append({'user': user_input, 'bot': response, 'intent': intent})
+            self.conversation_history = self.conversation_history[-self.max_history:]
+        return response
+
+    def stream_response(self, user_input, max_length=150, temperature=0.7, conversation=None, user_key=None):
+        """The server answers in one piece, so this yields the whole response once"""
+        yield self.generate_response(user_input, max_length, temperature, conversation, user_key)
+
+    def get_history(self):
+        """Get conversation history"""
+        return self.conversation_history
+
+    def clear_history(self):
+        """Clear conversation history"""
+        self.conversation_history = []
+
+
+# Talk to a running model server
+if __name__ == "__main__":
+    import os
+
+    chatbot = RemoteChatbot(ModelClient(os.getenv('PIDGIN_MODEL_SERVER_URL', "http://127.0.0.1:8765")))
+    print(f"📱 Model server status: {chatbot.model_status}")
+    print("=" * 70)
+    for user_input in ["Hello", "How I go add 15 + 28?", "Wetin be Python?"]:
+        print(f"\n👤 User: {user_input}")
+        response = chatbot.generate_response(user_input)
+        print(f"🤖 Bot [{chatbot.last_tier}]: {response}")
@@ -0,0 +1,235 @@
+"""
+Model Server
+One process owns the model weights and serves every frontend over local HTTP
+
+Usage: python model_server.py [--host 127.0.0.1] [--port 8765] [--model models/fine_tuned_pidgin]
+
+Endpoints (JSON):
+    GET  /health    model status and uptime
+    GET  /stats     router, cache, batching and request counters
+    GET  /metrics   the same counters plus stage latency histograms, in Prometheus text format
+    POST /generate  {"user_input", "history": [{"user", "bot"}], "user", "max_length", "temperature"}
+                    -> {"response", "tier", "intent", "model_status"}
+                    X-Pidgin-Profile: 1 profiles the request (saved under X-Request-Id)
+                    when PIDGIN_PROFILE_DIR is set; see profiling.py
+
+The server keeps no per-user state: clients send the recent exchanges with
+each request, so frontends keep their own sessions and the server can be
+restarted at any time.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from chatbot import PidginChatbot
+from intent_classifier import IntentClassifier
+from response_cache import ResponseCache
+from retrieval import RetrievalIndex
+from admission import AdmissionController
+from metrics import Metrics
+from profiling import RequestProfiler
+from router import ResponseRouter
+from sessions import Session
+
+MAX_BODY_BYTES = 64 * 1024
+
+
+class ModelService:
+    """Shared tiers plus a chatbot per request (per-request state such as last_tier must not be shared)"""
+
+    def __init__(self, model_path="models/fine_tuned_pidgin", use_batching=True, deterministic=False,
+                 quantize=False, background_load=True, latency_budget_ms=None, admission=None, profiler=None):
+        """Share one cache, index, classifier, router, admission controller and profiler between all requests"""
+        self.started = time.time()
+        self.settings = {
+            'model_path': model_path,
+            'use_batching': use_batching,
+            'deterministic': deterministic,
+            'quantize': quantize,
+            'background_load': background_load,
+            'response_cache': ResponseCache(max_entries=1024, ttl_seconds=3600),
+            'retrieval_index': RetrievalIndex(),
+            'intent_classifier': IntentClassifier(),
+            'router': ResponseRouter(latency_budget_ms=latency_budget_ms),
+            'admission': admission,
+            'metrics': Metrics(),
+            'profiler': profiler,
+        }
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'total_ms': 0.0}
+        # Starts loading (or warming up) the shared weights right away
+        self.status_bot = self._chatbot()
+        self.metrics = self.settings['metrics']
+        self.metrics.track(router=self.settings['router'], response_cache=self.settings['response_cache'],
+                           admission=admission)
+
+    def _chatbot(self):
+        """Cheap: the weights, engine and tiers are all shared"""
+        return PidginChatbot(**self.settings)
+
+    def generate(self, request, profile=False, request_id=None):
+        """Answer one request whose history comes from the client"""
+        user_input = request.get('user_input')
+        if not isinstance(user_input, str) or not user_input.strip():
+            raise ValueError("user_input must be a non-empty string")
+
+        bot = self._chatbot()
+        conversation = Session(max_history=bot.max_history)
+        for exchange in request.get('history') or []:
+            conversation.add_exchange(str(exchange['user']), str(exchange['bot']), exchange.get('intent', 'general'))
+
+        start = time.perf_counter()
+        try:
+            response = bot.generate_response(
+                user_input,
+                max_length=min(int(request.get('max_length', 150)), 300),
+                temperature=float(request.get('temperature', 0.7)),
+                conversation=conversation,
+                user_key=request.get('user'),
+                profile=profile,
+                request_id=request_id
+            )
+        except Exception:
+            with self._lock:
+                self.stats['errors'] += 1
+            raise
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['total_ms'] += (time.perf_counter() - start) * 1000
+
+        return {
+            'response': response,
+            'tier': bot.last_tier,
+            'intent': conversation.history[-1].intent,
+            'model_status': bot.model_status,
+        }
+
+    def health(self):
+        """Liveness plus whether answers can come from the model yet"""
+        return {
+            'status': 'ok',
+            'model_status': self.status_bot.model_status,
+            'uptime_s': round(time.time() - self.started, 1),
+        }
+
+    def render_metrics(self):
+        """Prometheus exposition, picking up the batching engine once the model has loaded"""
+        if self.status_bot.engine is not None:
+            self.metrics.track(batching=self.status_bot.engine)
+        return self.metrics.render()
+
+    def get_stats(self):
+        """Counters from every shared component"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['avg_ms'] = stats['total_ms'] / stats['requests'] if stats['requests'] else 0.0
+        stats['router'] = self.settings['router'].get_stats()
+        stats['cache'] = self.settings['response_cache'].get_stats()
+        admission = self.settings['admission']
+        stats['admission'] = admission.get_stats() if admission is not None else None
+        engine = self.status_bot.engine
+        stats['batching'] = engine.get_stats() if engine is not None else None
+        return stats
+
+
+class ModelRequestHandler(BaseHTTPRequestHandler):
+    """JSON over HTTP/1.1 keep-alive so clients can pool connections"""
+
+    protocol_version = "HTTP/1.1"
+    service = None
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, self.service.health())
+        elif self.path == '/stats':
+            self._send(200, self.service.get_stats())
+        elif self.path == '/metrics':
+            self._send_body(200, self.service.render_metrics().encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8')
+        else:
+            self._send(404, {'error': f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/generate':
+            self._send(404, {'error': f"unknown path {self.path}"})
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send(413, {'error': "request too large"})
+            return
+
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+            self._send(200, self.service.generate(
+                request,
+                profile=self.headers.get('X-Pidgin-Profile') == '1',
+                request_id=self.headers.get('X-Request-Id')
+            ))
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {'error': str(e)})
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+
+    def _send(self, status, payload):
+        self._send_body(status, json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8')
+
+    def _send_body(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate the output under load
+        pass
+
+
+def create_server(service, host="127.0.0.1", port=8765):
+    """Bind a threaded HTTP server to the service (port=0 picks a free port)"""
+    handler = type('BoundModelRequestHandler', (ModelRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=os.getenv('PIDGIN_MODEL_SERVER_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('PIDGIN_MODEL_SERVER_PORT', '8765')))
+    parser.add_argument('--model', default="models/fine_tuned_pidgin")
+    parser.add_argument('--no-batching', action='store_true', help="Disable cross-request micro-batching")
+    args = parser.parse_args()
+
+    budget = os.getenv('PIDGIN_LATENCY_BUDGET_MS')
+    service = ModelService(
+        args.model,
+        use_batching=not args.no_batching,
+        deterministic=os.getenv('PIDGIN_DETERMINISTIC') == '1',
+        quantize=os.getenv('PIDGIN_QUANTIZE') == '1',
+        latency_budget_ms=float(budget) if budget else None,
+        admission=AdmissionController.from_env(),
+        profiler=RequestProfiler.from_env()
+    )
+    server = create_server(service, args.host, args.port)
+
+    print(f"🧠 Pidgin model server listening on http://{args.host}:{server.server_address[1]}")
+    print(f"📱 Model status: {service.health()['model_status']}")
+    profiler = service.settings['profiler']
+    if profiler is not None:
+        print(f"🔬 Profiling {profiler.sample_rate:.1%} of requests plus flagged ones into {profiler.directory}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopping model server")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
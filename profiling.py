@@ -0,0 +1,163 @@
+"""
+Request Profiling
+Runs a sample of generate_response calls, plus explicitly flagged ones, under cProfile
+
+Disabled unless PIDGIN_PROFILE_DIR is set: from_env() then returns None and
+chatbots skip profiling with a single `is None` check. PIDGIN_PROFILE_SAMPLE
+(default 0) is the fraction of calls profiled at random; flagged calls (the
+model server's X-Pidgin-Profile: 1 header, Telegram's /profile admin command)
+are always profiled. Only the newest PIDGIN_PROFILE_KEEP (default 100)
+profiles are kept.
+
+Each profile is written as <time>_<request id>.prof (open it with pstats or
+snakeviz) next to a .json file holding request_id, reason, intent, tier,
+prompt_tokens, new_tokens and wall_ms. cProfile only sees the calling
+thread, so with micro-batching the forward pass shows up as waiting in
+BatchEngine.generate. One request is profiled at a time (Python 3.12+ allows
+only one active profiler); a request picked while another is being profiled
+runs unprofiled.
+
+Usage: python profiling.py [profiles]   # list profiles, hot spots of the slowest
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+
+class RequestProfiler:
+    """Writes one cProfile dump per profiled request into a rotating directory"""
+
+    def __init__(self, directory="profiles", sample_rate=0.0, max_profiles=100):
+        """sample_rate is the fraction of unflagged calls to profile"""
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_profiles = max_profiles
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._active = threading.Lock()
+        self.skipped = 0
+
+    @classmethod
+    def from_env(cls):
+        """A profiler when PIDGIN_PROFILE_DIR is set, otherwise None (profiling off)"""
+        directory = os.getenv('PIDGIN_PROFILE_DIR')
+        if not directory:
+            return None
+        return cls(
+            directory,
+            sample_rate=float(os.getenv('PIDGIN_PROFILE_SAMPLE', '0')),
+            max_profiles=int(os.getenv('PIDGIN_PROFILE_KEEP', '100'))
+        )
+
+    def should_profile(self, flagged=False):
+        """'flagged', 'sampled', or None when this call runs unprofiled"""
+        if flagged:
+            return 'flagged'
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sampled'
+        return None
+
+    def annotate(self, **fields):
+        """Attach fields to the profile running on this thread; a no-op outside a profiled call"""
+        record = getattr(self._local, 'record', None)
+        if record is not None:
+            record.update(fields)
+
+    def run(self, reason, request_id, fn, *args, **kwargs):
+        """Return fn(*args, **kwargs), profiled and written out with its annotations"""
+        # Never wait for another request's profile; this one just runs unprofiled
+        if not self._active.acquire(blocking=False):
+            self._skip()
+            return fn(*args, **kwargs)
+
+        record = {'request_id': request_id or uuid.uuid4().hex[:12], 'reason': reason}
+        profile = cProfile.Profile()
+        enabled = False
+        try:
+            self._local.record = record
+            start = time.perf_counter()
+            try:
+                profile.enable()
+                enabled = True
+            except ValueError:
+                # Some other profiler or debugger already owns the interpreter's profile hook
+                self._skip()
+            return fn(*args, **kwargs)
+        finally:
+            if enabled:
+                profile.disable()
+                record['wall_ms'] = (time.perf_counter() - start) * 1000
+            self._local.record = None
+            self._active.release()
+            if enabled:
+                self._write(profile, record)
+
+    def _skip(self):
+        with self._lock:
+            self.skipped += 1
+
+    def _write(self, profile, record):
+        """Dump the profile and its metadata, then drop the oldest beyond max_profiles"""
+        now = datetime.now()
+        record['timestamp'] = now.isoformat()
+        # Request ids can come from an HTTP header; keep them filename-safe
+        safe_id = re.sub(r'[^A-Za-z0-9_.-]', '_', str(record['request_id']))[:64]
+        base = os.path.join(self.directory, f"{now.strftime('%Y%m%dT%H%M%S%f')}_{safe_id}")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            profile.dump_stats(base + ".prof")
+            with open(base + ".json", 'w', encoding='utf-8') as f:
+                json.dump(record, f, indent=2)
+            self._rotate()
+        except OSError as e:
+            print(f"⚠️  Could not write profile {base}: {e}")
+
+    def _rotate(self):
+        with self._lock:
+            names = sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".prof"))
+            for stale in names[:max(0, len(names) - self.max_profiles)]:
+                for extension in (".prof", ".json"):
+                    try:
+                        os.remove(os.path.join(self.directory, stale + extension))
+                    except FileNotFoundError:
+                        pass
+
+
+def list_profiles(directory="profiles"):
+    """Metadata of every kept profile, newest first, with its .prof path under 'path'"""
+    records = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+            record = json.load(f)
+        record['path'] = os.path.join(directory, name[:-5] + ".prof")
+        records.append(record)
+    return records
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else os.getenv('PIDGIN_PROFILE_DIR', "profiles")
+    if not os.path.isdir(directory) or not list_profiles(directory):
+        print(f"No profiles in {directory}; set PIDGIN_PROFILE_DIR (and PIDGIN_PROFILE_SAMPLE) and send traffic")
+        sys.exit(1)
+
+    records = list_profiles(directory)
+    print(f"{'Request':<16} {'Reason':<8} {'Intent':<8} {'Tier':<10} {'Prompt':>6} {'Wall ms':>9}  When")
+    for record in records:
+        print(f"{record['request_id']:<16} {record['reason']:<8} {record.get('intent', '-'):<8} "
+              f"{record.get('tier', '-'):<10} {record.get('prompt_tokens', '-'):>6} "
+              f"{record['wall_ms']:>9.1f}  {record['timestamp']}")
+
+    slowest = max(records, key=lambda record: record['wall_ms'])
+    print(f"\n🔥 Slowest: {slowest['request_id']} ({slowest['wall_ms']:.1f} ms)")
+    pstats.Stats(slowest['path']).sort_stats('cumulative').print_stats(15)
@@ -0,0 +1,56 @@
+"""
+Prompt Encoder
+Builds model prompts from cached token ids so each turn only tokenizes new text
+"""
+
+from array import array
+
+
+class PromptEncoder:
+    """Encodes prompt segments once and joins their ids
+
+    A prompt is a run of exchanges followed by the new question, split into
+    "<|user|> {user} <|bot|>" and " {bot} <|endoftext|>\\n" segments. Every
+    segment starts and ends on a pre-tokenization boundary (a role marker, the
+    newline or the end-of-text token), so joining segment ids gives the same
+    tokens as encoding the joined string.
+    """
+
+    def __init__(self, tokenizer):
+        """Look up special-token ids once when the model is loaded"""
+        self.tokenizer = tokenizer
+        self.eos_token_id = tokenizer.eos_token_id
+        self.pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else self.eos_token_id
+
+    def _encode(self, text):
+        """Token ids of a segment as a compact int32 array"""
+        return array('i', self.tokenizer.encode(text))
+
+    def user_ids(self, user_input):
+        """Ids of the question segment that ends every prompt"""
+        return self._encode(f"<|user|> {user_input} <|bot|>")
+
+    def bot_ids(self, bot_response):
+        """Ids of an answer segment"""
+        return self._encode(f" {bot_response} <|endoftext|>\n")
+
+    def exchange_ids(self, exchange):
+        """(user ids, bot ids) of a history exchange, encoded on first use and stored on it"""
+        ids = exchange.get('ids')
+        if ids is None:
+            ids = (self.user_ids(exchange['user']), self.bot_ids(exchange['bot']))
+            exchange['ids'] = ids
+        return ids
+
+    def history_ids(self, history):
+        """Concatenated ids of the given exchanges"""
+        ids = array('i')
+        for exchange in history:
+            user_ids, bot_ids = self.exchange_ids(exchange)
+            ids += user_ids
+            ids += bot_ids
+        return ids
+
+    def prompt_ids(self, history, user_input):
+        """Prompt token ids for a question after the given exchanges"""
+        return (self.history_ids(history) + self.user_ids(user_input)).tolist()
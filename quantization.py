@@ -0,0 +1,67 @@
+"""
+Quantized CPU Inference
+Dynamic int8 quantization for the fine-tuned DistilGPT-2
+"""
+
+import os
+
+import torch
+from torch import nn
+from transformers import GPT2Config, GPT2LMHeadModel
+from transformers.pytorch_utils import Conv1D
+
+QUANTIZED_WEIGHTS = "pytorch_model_int8.pt"
+
+
+def conv1d_to_linear(model):
+    """Swap GPT-2's Conv1D projections for equivalent nn.Linear layers
+
+    Dynamic quantization only knows nn.Linear; Conv1D is the same matmul with a
+    transposed weight.
+    """
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if isinstance(child, Conv1D):
+                in_features, out_features = child.weight.shape
+                linear = nn.Linear(in_features, out_features)
+                linear.weight.data = child.weight.data.t().contiguous()
+                linear.bias.data = child.bias.data
+                setattr(parent, name, linear)
+    return model
+
+
+def quantize_model(model):
+    """Apply dynamic int8 quantization to the transformer blocks in place
+
+    The LM head is left in fp32 so it stays tied to the token embeddings.
+    """
+    conv1d_to_linear(model)
+    block_layers = {
+        name for name, module in model.named_modules()
+        if isinstance(module, nn.Linear) and name.startswith('transformer.')
+    }
+    return torch.ao.quantization.quantize_dynamic(
+        model,
+        qconfig_spec=block_layers,
+        dtype=torch.qint8,
+        inplace=True
+    )
+
+
+def save_quantized(model, output_dir):
+    """Write a pre-quantized artifact next to the fp32 checkpoint"""
+    path = os.path.join(output_dir, QUANTIZED_WEIGHTS)
+    torch.save(model.state_dict(), path)
+    return path
+
+
+def load_quantized(model_path):
+    """Load the pre-quantized artifact if present, else quantize the fp32 weights"""
+    path = os.path.join(model_path, QUANTIZED_WEIGHTS)
+    if not os.path.exists(path):
+        return quantize_model(GPT2LMHeadModel.from_pretrained(model_path))
+
+    # Build the quantized module layout, then fill it without loading fp32 weights
+    model = quantize_model(GPT2LMHeadModel(GPT2Config.from_pretrained(model_path)))
+    model.load_state_dict(torch.load(path))
+    return model
@@ -0,0 +1,80 @@
+"""
+Response Cache
+Bounded LRU/TTL cache for chatbot answers keyed on normalized input
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """Process-wide answer cache shared by every chatbot session"""
+
+    def __init__(self, max_entries=1024, ttl_seconds=3600):
+        """Create an empty cache holding at most max_entries answers for ttl_seconds"""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    @staticmethod
+    def normalize(text):
+        """Lowercase, space out math operators and drop other punctuation"""
+        text = text.lower().strip()
+        text = re.sub(r'\s*([+\-×÷*/=%])\s*', r' \1 ', text)
+        text = re.sub(r'[^\w\s+\-×÷*/=%.]', ' ', text)
+        text = re.sub(r'\.(?!\d)', ' ', text)
+        return ' '.join(text.split())
+
+    def make_key(self, user_input, intent, history=(), settings=()):
+        """Build a key from the question, its intent, the history and decoding settings the answer depends on"""
+        context = tuple(
+            (self.normalize(exchange['user']), self.normalize(exchange['bot']))
+            for exchange in history
+        )
+        return (self.normalize(user_input), intent, context, tuple(settings))
+
+    def get(self, key):
+        """Return the cached answer or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+
+            value, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return value
+
+    def put(self, key, value):
+        """Store an answer, evicting the least recently used entries when full"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        """Drop every cached answer"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """Return hit/miss/eviction counters, current size and hit rate"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,143 @@
+"""
+Retrieval Tier
+TF-IDF nearest-neighbour lookup over the curated Q/A dataset, answered before the model
+"""
+
+import csv
+import hashlib
+import os
+import pickle
+import re
+import threading
+
+# Question words that say nothing about the topic; every other word must be in the matched question
+# (a misspelt one counts when the matched question has it)
+STOPWORDS = {
+    'wetin', 'be', 'how', 'i', 'go', 'for', 'the', 'a', 'an', 'of', 'to', 'me', 'you', 'na', 'dey', 'fit',
+    'and', 'with', 'if', 'do', 'what', 'is', 'are', 'show', 'teach', 'tell', 'abeg', 'please', 'pls', 'my',
+    'am', 'o', 'e', 'in', 'on', 'wan', 'make', 'can', 'una', 'we', 'dis', 'this', 'that', 'which', 'why',
+}
+
+
+class RetrievalIndex:
+    """Sparse character n-gram index over the dataset's user_input column"""
+
+    def __init__(self, csv_file="data/pidgin_dataset.csv",
+                 index_file="models/retrieval_index.pkl", threshold=0.6):
+        """Configure the index; nothing is read from disk until the first query"""
+        self.csv_file = csv_file
+        self.index_file = index_file
+        self.threshold = threshold
+        self._index = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _numbers(text):
+        """Numbers in a question; retrieved answers must use the same ones"""
+        return sorted(re.findall(r'\d+(?:\.\d+)?', text))
+
+    @staticmethod
+    def _words(text):
+        """Words of a question (numbers are compared separately)"""
+        return set(re.findall(r"[a-z][a-z'-]*", text.lower()))
+
+    @staticmethod
+    def _same_word(word, other):
+        """Equal, two neighbouring letters swapped, or (3+ letters) one letter inserted, dropped or changed"""
+        if word == other:
+            return True
+        if abs(len(word) - len(other)) > 1:
+            return False
+        if len(word) == len(other):
+            diff = [i for i in range(len(word)) if word[i] != other[i]]
+            if len(diff) == 2 and diff[1] == diff[0] + 1:
+                return word[diff[0]] == other[diff[1]] and word[diff[1]] == other[diff[0]]
+            return len(diff) == 1 and len(word) >= 3
+        short, long = sorted((word, other), key=len)
+        return len(short) >= 3 and any(long[:i] + long[i + 1:] == short for i in range(len(long)))
+
+    def _source_hash(self):
+        """Hash of the dataset so a stale index is rebuilt automatically"""
+        with open(self.csv_file, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def build(self):
+        """Fit the vectorizer on the dataset questions and persist the index"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        with open(self.csv_file, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+
+        questions = [row['user_input'] for row in rows]
+        vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=(2, 4), lowercase=True, sublinear_tf=True)
+        matrix = vectorizer.fit_transform(questions)
+
+        index = {
+            'source_hash': self._source_hash(),
+            'vectorizer': vectorizer,
+            'matrix': matrix,
+            'questions': questions,
+            'answers': [row['bot_response'] for row in rows],
+            'numbers': [self._numbers(q) for q in questions],
+        }
+
+        os.makedirs(os.path.dirname(self.index_file) or ".", exist_ok=True)
+        with open(self.index_file, 'wb') as f:
+            pickle.dump(index, f)
+        return index
+
+    def load(self):
+        """Load the persisted index, rebuilding it if missing or out of date"""
+        with self._lock:
+            if self._index is None:
+                index = None
+                if os.path.exists(self.index_file):
+                    with open(self.index_file, 'rb') as f:
+                        index = pickle.load(f)
+                    # Keep a shipped index even when the source CSV is not deployed
+                    if os.path.exists(self.csv_file) and index.get('source_hash') != self._source_hash():
+                        index = None
+                self._index = index or self.build()
+            return self._index
+
+    def _nearest(self, user_input):
+        """Index and cosine similarity of the closest dataset question"""
+        index = self.load()
+        vector = index['vectorizer'].transform([user_input])
+        # Rows are L2-normalized, so the dot product is the cosine similarity
+        scores = (index['matrix'] @ vector.T).toarray().ravel()
+        best = int(scores.argmax())
+        return best, float(scores[best])
+
+    def query(self, user_input):
+        """Return (answer, similarity, matched question) for the nearest question"""
+        best, score = self._nearest(user_input)
+        index = self.load()
+        return index['answers'][best], score, index['questions'][best]
+
+    def answer(self, user_input):
+        """Return the stored answer if it is close enough to the question, else None"""
+        if not os.path.exists(self.csv_file) and not os.path.exists(self.index_file):
+            return None
+
+        best, score = self._nearest(user_input)
+        if score < self.threshold:
+            return None
+        # "Add 3 + 4" must not be answered with the worked example for "Add 15 + 28"
+        index = self.load()
+        if self._numbers(user_input) != index['numbers'][best]:
+            return None
+        # Shared spelling is not a shared topic: "function for JavaScript" is not "function for Python"
+        matched = self._words(index['questions'][best])
+        if not all(any(self._same_word(word, other) for other in matched)
+                   for word in self._words(user_input) - STOPWORDS):
+            return None
+        return index['answers'][best]
+
+
+# Prebuild the index
+if __name__ == "__main__":
+    retrieval = RetrievalIndex()
+    index = retrieval.build()
+    print(f"✅ Indexed {len(index['questions'])} questions")
+    print(f"💾 Saved to {retrieval.index_file}")
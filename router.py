@@ -0,0 +1,84 @@
+"""
+Tiered Response Router
+Runs cheap answer tiers first and only escalates to the model when they have no confident answer
+"""
+
+import threading
+import time
+
+
+class ResponseRouter:
+    """Latency-budgeted tier selection with per-tier counters
+
+    A tier is a (name, handler) pair. handler(remaining_ms) returns an answer or
+    None to let the next tier try. remaining_ms is None when no budget is set,
+    so expensive tiers can shrink their work (e.g. fewer new tokens) or decline.
+    """
+
+    def __init__(self, latency_budget_ms=None):
+        """Create a router; latency_budget_ms=None means no per-request budget"""
+        self.latency_budget_ms = latency_budget_ms
+        self.ms_per_token = None
+        self._lock = threading.Lock()
+        self.stats = {}
+
+    def route(self, tiers, latency_budget_ms=None):
+        """Return (answer, tier name) from the first tier that answers"""
+        budget = latency_budget_ms if latency_budget_ms is not None else self.latency_budget_ms
+        start = time.perf_counter()
+
+        for name, handler in tiers:
+            remaining = None
+            if budget is not None:
+                remaining = budget - (time.perf_counter() - start) * 1000
+
+            tier_start = time.perf_counter()
+            answer = handler(remaining)
+            elapsed = (time.perf_counter() - tier_start) * 1000
+
+            if answer is not None:
+                self.record(name, elapsed)
+                return answer, name
+            self.record(name, elapsed, served=False)
+
+        raise RuntimeError("No response tier produced an answer")
+
+    def record(self, name, elapsed_ms, served=True):
+        """Count one attempt at a tier (also used by paths that bypass route)"""
+        with self._lock:
+            tier = self.stats.setdefault(name, {'served': 0, 'declined': 0, 'total_ms': 0.0})
+            tier['served' if served else 'declined'] += 1
+            tier['total_ms'] += elapsed_ms
+
+    def observe_generation(self, elapsed_ms, new_tokens):
+        """Track the model's cost per generated token to size budgeted requests"""
+        if new_tokens <= 0:
+            return
+        sample = elapsed_ms / new_tokens
+        with self._lock:
+            if self.ms_per_token is None:
+                self.ms_per_token = sample
+            else:
+                self.ms_per_token = 0.8 * self.ms_per_token + 0.2 * sample
+
+    def token_budget(self, max_tokens, remaining_ms, min_tokens=16):
+        """How many new tokens fit in remaining_ms, or 0 if fewer than min_tokens do"""
+        if remaining_ms is None or self.ms_per_token is None:
+            return max_tokens
+        affordable = int(remaining_ms / self.ms_per_token)
+        if affordable < min_tokens:
+            return 0
+        return min(max_tokens, affordable)
+
+    def get_stats(self):
+        """Per-tier counters plus the share of requests that reached the model"""
+        with self._lock:
+            stats = {name: dict(tier) for name, tier in self.stats.items()}
+        served = sum(tier['served'] for tier in stats.values())
+        model = stats.get('model', {}).get('served', 0)
+        return {
+            'tiers': stats,
+            'total_served': served,
+            'model_share': model / served if served else 0.0,
+            'ms_per_token': self.ms_per_token,
+        }
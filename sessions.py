@@ -0,0 +1,131 @@
+"""
+Session Manager
+Per-user conversation state with a fixed history ring, LRU/idle eviction and a hard size cap
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class Exchange:
+    """One user/bot turn; a slotted object is far smaller than a dict per turn"""
+    __slots__ = ('user', 'bot', 'intent', 'ids')
+
+    def __init__(self, user, bot, intent):
+        self.user = user
+        self.bot = bot
+        self.intent = intent
+        self.ids = None
+
+    def __getitem__(self, key):
+        """Allow exchange['user'] like the dicts in PidginChatbot.conversation_history"""
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
+class Session:
+    """Conversation state for one user or chat"""
+    __slots__ = ('name', 'topic', 'started', 'last_seen', 'message_count', 'history', 'max_chars')
+
+    def __init__(self, name=None, max_history=5, max_chars=500):
+        now = time.time()
+        self.name = name
+        self.topic = 'general'
+        self.started = now
+        self.last_seen = now
+        self.message_count = 0
+        self.history = deque(maxlen=max_history)
+        self.max_chars = max_chars
+
+    def add_exchange(self, user_input, bot_response, intent):
+        """Append a turn, truncating long text so each session has a bounded size"""
+        self.history.append(Exchange(user_input[:self.max_chars], bot_response[:self.max_chars], intent))
+
+    def clear_history(self):
+        """Forget the conversation but keep the user's profile and counters"""
+        self.history.clear()
+
+
+class SessionManager:
+    """Keyed by user/chat id; evicts least recently used and idle sessions"""
+
+    def __init__(self, max_sessions=10000, idle_timeout=1800, max_history=5, max_chars=500):
+        """Create an empty manager holding at most max_sessions sessions"""
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_history = max_history
+        self.max_chars = max_chars
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'created': 0, 'evicted_lru': 0, 'evicted_idle': 0}
+
+    def get(self, key, name=None):
+        """Return the session for key, creating it if needed, and mark it as used"""
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = Session(name, self.max_history, self.max_chars)
+                self._sessions[key] = session
+                self.stats['created'] += 1
+            else:
+                self._sessions.move_to_end(key)
+                if name and not session.name:
+                    session.name = name
+            session.last_seen = now
+            self._evict(now)
+            return session
+
+    def peek(self, key):
+        """Return the session for key without creating or touching it"""
+        with self._lock:
+            return self._sessions.get(key)
+
+    def remove(self, key):
+        """Drop a session"""
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def evict_idle(self):
+        """Drop sessions idle for longer than idle_timeout"""
+        with self._lock:
+            self._evict(time.time())
+
+    def _evict(self, now):
+        """Sessions are kept in last-used order, so both checks only look at the front"""
+        while self._sessions:
+            key, oldest = next(iter(self._sessions.items()))
+            if now - oldest.last_seen > self.idle_timeout:
+                self.stats['evicted_idle'] += 1
+            elif len(self._sessions) > self.max_sessions:
+                self.stats['evicted_lru'] += 1
+            else:
+                break
+            del self._sessions[key]
+
+    def memory_ceiling_bytes(self):
+        """Upper bound on the text and cached prompt token ids held by all sessions
+        
+        Characters are up to 4 bytes; byte-level BPE yields at most one int32 id per
+        UTF-8 byte, plus a few ids for the prompt markers.
+        """
+        text = 2 * self.max_chars * 4
+        ids = (2 * self.max_chars * 4 + 32) * 4
+        return self.max_sessions * self.max_history * (text + ids)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get_stats(self):
+        """Session counters plus the current number of live sessions"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['active'] = len(self._sessions)
+        stats['memory_ceiling_bytes'] = self.memory_ceiling_bytes()
+        return stats
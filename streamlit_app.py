@@ -9,11 +9,19 @@ from pathlib import Path
 import json
 from datetime import datetime
 import os
+import uuid
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent))
 
 from chatbot import PidginChatbot, RuleBasedFallback
+from model_client import ModelClient, RemoteChatbot
+from response_cache import ResponseCache
+from retrieval import RetrievalIndex
+from intent_classifier import IntentClassifier
+from router import ResponseRouter
+from admission import AdmissionController
+from metrics import Metrics
 
 # Page config
 st.set_page_config(
@@ -92,18 +100,96 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_response_cache():
+    """One answer cache for every browser session in this process"""
+    return ResponseCache(max_entries=1024, ttl_seconds=3600)
+
+
+@st.cache_resource
+def get_retrieval_index():
+    """Dataset index shared by every session (loaded on the first question)"""
+    return RetrievalIndex()
+
+
+@st.cache_resource
+def get_intent_classifier():
+    """Intent model shared by every session (loaded on the first question)"""
+    return IntentClassifier()
+
+
+@st.cache_resource
+def get_router():
+    """Tier router shared by every session so its counters cover all traffic"""
+    budget = os.getenv('PIDGIN_LATENCY_BUDGET_MS')
+    return ResponseRouter(latency_budget_ms=float(budget) if budget else None)
+
+
+@st.cache_resource
+def get_admission():
+    """Generation slots and per-user rate limits shared by every session"""
+    return AdmissionController.from_env()
+
+
+@st.cache_resource
+def get_metrics():
+    """Prometheus /metrics on PIDGIN_METRICS_PORT for every session, or None when unset"""
+    metrics = Metrics.from_env()
+    if metrics is not None:
+        metrics.track(router=get_router(), response_cache=get_response_cache(), admission=get_admission())
+        metrics.serve(int(os.getenv('PIDGIN_METRICS_PORT')))
+    return metrics
+
+
+@st.cache_resource
+def get_model_client(base_url):
+    """Pooled connections to a shared model server, reused by every session"""
+    return ModelClient(base_url, timeout=float(os.getenv('PIDGIN_MODEL_SERVER_TIMEOUT', '30')))
+
+
 # Initialize session state
 if 'messages' not in st.session_state:
     st.session_state.messages = []
 
+if 'user_key' not in st.session_state:
+    # Identifies this browser session to the per-user rate limit
+    st.session_state.user_key = uuid.uuid4().hex
+
+if 'chatbot' not in st.session_state and os.getenv('PIDGIN_MODEL_SERVER_URL'):
+    # The model lives in model_server.py; this process only keeps the history
+    st.session_state.chatbot = RemoteChatbot(get_model_client(os.getenv('PIDGIN_MODEL_SERVER_URL')))
+
 if 'chatbot' not in st.session_state:
     try:
-        st.session_state.chatbot = PidginChatbot("models/fine_tuned_pidgin")
-        st.session_state.model_loaded = True
+        # Model weights are shared by all sessions; this only creates a new history
+        st.session_state.chatbot = PidginChatbot(
+            "models/fine_tuned_pidgin",
+            use_batching=os.getenv('PIDGIN_MICRO_BATCHING') == '1',
+            # One conversation per session, so each turn can extend the previous prompt's attention
+            # cache (tens of MB per session for GPT-2 small; PIDGIN_KV_CACHE=0 turns it off)
+            use_kv_cache=os.getenv('PIDGIN_KV_CACHE', '1') == '1',
+            response_cache=get_response_cache(),
+            deterministic=os.getenv('PIDGIN_DETERMINISTIC') == '1',
+            retrieval_index=get_retrieval_index(),
+            intent_classifier=get_intent_classifier(),
+            router=get_router(),
+            admission=get_admission(),
+            metrics=get_metrics(),
+            quantize=os.getenv('PIDGIN_QUANTIZE') == '1',
+            background_load=os.getenv('PIDGIN_BACKGROUND_LOAD') == '1'
+        )
     except Exception as e:
         st.session_state.model_loaded = False
         st.session_state.error_message = str(e)
 
+# Re-checked on every rerun so the app switches over once a background warm-up finishes
+if 'chatbot' in st.session_state:
+    st.session_state.model_status = st.session_state.chatbot.model_status
+    st.session_state.model_loaded = st.session_state.model_status == 'ready'
+    # The batching engine only exists once the model has loaded
+    if get_metrics() is not None and getattr(st.session_state.chatbot, 'engine', None) is not None:
+        get_metrics().track(batching=st.session_state.chatbot.engine)
+
 if 'feedback' not in st.session_state:
     st.session_state.feedback = []
 
@@ -254,7 +340,9 @@ def main():
         """, unsafe_allow_html=True)
     
     # Main chat area
-    if not st.session_state.model_loaded:
+    if st.session_state.get('model_status') in ('loading', 'warming'):
+        st.info("🔥 AI model dey warm up. Quick answers go come from the rule-based helper until e ready.")
+    elif not st.session_state.model_loaded:
         st.info("ℹ️ AI model not loaded. Using smart rule-based responses. For full AI, train the model first!")
         
         with st.expander("📖 How to train the AI model"):
@@ -300,8 +388,22 @@ streamlit run streamlit_app.py
         # Generate response
         with st.spinner("Thinking... 🤔"):
             try:
-                if 'chatbot' in st.session_state:
-                    response = st.session_state.chatbot.generate_response(user_input)
+                if 'chatbot' in st.session_state and st.session_state.model_loaded:
+                    # Show the answer word by word instead of waiting for all of it
+                    placeholder = st.empty()
+                    response = ""
+                    for piece in st.session_state.chatbot.stream_response(user_input, user_key=st.session_state.user_key):
+                        response += piece
+                        placeholder.markdown(f"""
+                        <div class="chat-message bot-message">
+                            <strong>🤖 Pidgin AI:</strong><br>{response}
+                        </div>
+                        """, unsafe_allow_html=True)
+                    response = response.strip()
+                elif 'chatbot' in st.session_state:
+                    response = st.session_state.chatbot.generate_response(
+                        user_input, user_key=st.session_state.user_key
+                    )
                 else:
                     fallback = RuleBasedFallback.get_response(user_input)
                     response = fallback if fallback else "I dey learn to answer that question. Try ask me about Math or Python coding!"
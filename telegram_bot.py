@@ -4,6 +4,7 @@ Allows users to learn via Telegram messaging app
 """
 
 import os
+import asyncio
 import logging
 import json
 from datetime import datetime
@@ -26,6 +27,16 @@ except ImportError:
     print("To use Telegram bot, install: pip install python-telegram-bot")
 
 from chatbot import PidginChatbot, RuleBasedFallback
+from model_client import ModelClient, RemoteChatbot
+from response_cache import ResponseCache
+from retrieval import RetrievalIndex
+from intent_classifier import IntentClassifier
+from router import ResponseRouter
+from admission import AdmissionController
+from metrics import Metrics
+from profiling import RequestProfiler
+from async_inference import AsyncInference, InferenceQueueFull
+from sessions import SessionManager
 
 # Enable logging
 logging.basicConfig(
@@ -34,17 +45,117 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize chatbot
+# Answers to repeated questions are shared across all users
+response_cache = ResponseCache(max_entries=1024, ttl_seconds=3600)
+retrieval_index = RetrievalIndex()
+intent_classifier = IntentClassifier()
+router = ResponseRouter(
+    latency_budget_ms=float(os.getenv('PIDGIN_LATENCY_BUDGET_MS')) if os.getenv('PIDGIN_LATENCY_BUDGET_MS') else None
+)
+
+# Bounded generation queue and per-user token buckets; shed messages get cheap-tier answers
+admission = AdmissionController.from_env()
+
+# Stage latency histograms, served in main() when PIDGIN_METRICS_PORT is set
+metrics = Metrics.from_env()
+
+# cProfile dumps of sampled requests and of messages flagged with /profile, when PIDGIN_PROFILE_DIR is set
+profiler = RequestProfiler.from_env()
+ADMIN_IDS = {int(user_id) for user_id in os.getenv('PIDGIN_ADMIN_IDS', '').split(',') if user_id.strip()}
+profile_requests = {}  # user id -> how many of their next messages to profile
+
+# Settings of the chatbot each message gets: weights, engine, cache and tiers are shared,
+# while per-request state such as last_tier stays on that message's own chatbot
+chatbot_settings = {
+    'model_path': "models/fine_tuned_pidgin",
+    'response_cache': response_cache,
+    'deterministic': os.getenv('PIDGIN_DETERMINISTIC') == '1',
+    'retrieval_index': retrieval_index,
+    'intent_classifier': intent_classifier,
+    'router': router,
+    'admission': admission,
+    'metrics': metrics,
+    'profiler': profiler,
+    'quantize': os.getenv('PIDGIN_QUANTIZE') == '1',
+    'use_batching': os.getenv('PIDGIN_MICRO_BATCHING') == '1',
+    'background_load': os.getenv('PIDGIN_BACKGROUND_LOAD') == '1',
+}
+model_client = None
+if os.getenv('PIDGIN_MODEL_SERVER_URL'):
+    # The model lives in model_server.py, shared with the Streamlit app
+    model_client = ModelClient(
+        os.getenv('PIDGIN_MODEL_SERVER_URL'),
+        timeout=float(os.getenv('PIDGIN_MODEL_SERVER_TIMEOUT', '30')),
+        pool_size=int(os.getenv('PIDGIN_INFERENCE_WORKERS', '2'))
+    )
+
+
+def new_chatbot():
+    """Chatbot for one message: cheap, since everything heavy is shared"""
+    if model_client is not None:
+        return RemoteChatbot(model_client)
+    return PidginChatbot(**chatbot_settings)
+
+
+def rule_based_response(user_message, session):
+    """Answer without the model: when none is loaded or the inference queue is full"""
+    fallback = RuleBasedFallback.get_response(user_message)
+    response = fallback if fallback else "I dey learn to answer that. Try ask me about Math or Python!"
+    session.add_exchange(user_message, response, 'general')
+    return response
+
+
+def shed_response(user_message, session):
+    """Answer without waiting for a worker: every tier but the model, run on the event loop"""
+    if model_client is not None:
+        return rule_based_response(user_message, session)
+    return new_chatbot().quick_response(user_message, conversation=session)
+
+
+def generate_response(user_message, **kwargs):
+    """Answer one message on its own chatbot; runs on an inference worker thread"""
+    return new_chatbot().generate_response(user_message, **kwargs)
+
+
+# Initialize chatbot (loads the shared model; also reports model status)
 try:
-    chatbot = PidginChatbot("models/fine_tuned_pidgin")
+    chatbot = new_chatbot()
     MODEL_LOADED = True
-    logger.info("AI model loaded successfully")
+    logger.info(f"Chatbot ready (model: {chatbot.model_status})")
 except Exception as e:
     logger.warning(f"Could not load AI model: {e}. Using rule-based responses.")
     MODEL_LOADED = False
 
-# Store user data
-user_data = {}
+# Generation runs on worker threads so the event loop keeps serving other users.
+# With admission control every queued request gets a thread. Messages waiting
+# for a free worker are capped too: past PIDGIN_INFERENCE_QUEUE they get the
+# rule-based answer at once instead of queueing behind every generation (0: unbounded).
+default_workers = admission.max_concurrent + admission.max_queue if admission is not None else 2
+inference_workers = int(os.getenv('PIDGIN_INFERENCE_WORKERS', str(default_workers)))
+inference = AsyncInference(
+    max_workers=inference_workers,
+    max_queue=int(os.getenv('PIDGIN_INFERENCE_QUEUE', str(inference_workers))) or None
+)
+
+FEEDBACK_FILE = os.getenv('PIDGIN_TELEGRAM_FEEDBACK_FILE', 'data/telegram_feedback.json')
+
+# Per-user state: bounded history ring, evicted when idle or least recently used
+sessions = SessionManager(
+    max_sessions=int(os.getenv('PIDGIN_MAX_SESSIONS', '10000')),
+    idle_timeout=int(os.getenv('PIDGIN_SESSION_IDLE_SECONDS', '1800'))
+)
+
+
+async def keep_typing(bot, chat_id, interval=4.0):
+    """Refresh the typing indicator until cancelled (Telegram clears it after ~5s)"""
+    try:
+        while True:
+            await bot.send_chat_action(chat_id=chat_id, action='typing')
+            await asyncio.sleep(interval)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"Typing indicator failed: {e}")
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -53,13 +164,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = user.id
     
     # Initialize user data
-    if user_id not in user_data:
-        user_data[user_id] = {
-            'name': user.first_name,
-            'messages': [],
-            'topic': 'general',
-            'started': datetime.now().isoformat()
-        }
+    sessions.get(user_id, user.first_name)
     
     welcome_message = f"""
 🎓 *Welcome to Pidgin AI Tutor!* 🎓
@@ -130,7 +235,8 @@ Examples:
 I dey here to help! 🎓
     """
     
-    await update.message.reply_text(help_text, parse_mode='Markdown')
+    # Also reached from the Help button, whose update carries a callback query instead of a message
+    await update.effective_message.reply_text(help_text, parse_mode='Markdown')
 
 
 async def topic_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -154,19 +260,19 @@ async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show user statistics"""
     user_id = update.effective_user.id
     
-    if user_id not in user_data:
+    session = sessions.peek(user_id)
+    if session is None:
         await update.message.reply_text("Use /start first!")
         return
     
-    data = user_data[user_id]
-    message_count = len(data.get('messages', []))
-    topic = data.get('topic', 'general')
-    started = data.get('started', 'Unknown')
+    message_count = session.message_count
+    topic = session.topic
+    started = datetime.fromtimestamp(session.started).isoformat()
     
     stats_text = f"""
 📊 *Your Learning Stats* 📊
 
-👤 Name: {data.get('name', 'User')}
+👤 Name: {session.name or 'User'}
 📅 Started: {started[:10]}
 💬 Messages: {message_count}
 📚 Topic: {topic.capitalize()}
@@ -181,8 +287,9 @@ async def clear_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Clear conversation"""
     user_id = update.effective_user.id
     
-    if user_id in user_data:
-        user_data[user_id]['messages'] = []
+    session = sessions.peek(user_id)
+    if session is not None:
+        session.clear_history()
     
     await update.message.reply_text("✅ Chat cleared! Make we start fresh. 🆕")
 
@@ -209,6 +316,39 @@ async def feedback_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
 
+async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Admin only: /profile [user_id] [count] profiles that user's next messages (default: your next one)"""
+    if update.effective_user.id not in ADMIN_IDS:
+        return
+    if profiler is None:
+        await update.message.reply_text("Profiling is off. Set PIDGIN_PROFILE_DIR and restart the bot.")
+        return
+    
+    try:
+        target = int(context.args[0]) if context.args else update.effective_user.id
+        count = int(context.args[1]) if len(context.args or []) > 1 else 1
+    except ValueError:
+        await update.message.reply_text("Usage: /profile [user_id] [count]")
+        return
+    
+    profile_requests[target] = count
+    await update.message.reply_text(
+        f"🔬 Profiling the next {count} message(s) from {target} into {profiler.directory}/"
+    )
+
+
+def take_profile_request(user_id):
+    """True if this message was flagged with /profile (uses up one of the user's flagged messages)"""
+    remaining = profile_requests.get(user_id)
+    if not remaining:
+        return False
+    if remaining > 1:
+        profile_requests[user_id] = remaining - 1
+    else:
+        del profile_requests[user_id]
+    return True
+
+
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle user messages"""
     user = update.effective_user
@@ -216,40 +356,36 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_message = update.message.text
     
     # Initialize user
-    if user_id not in user_data:
-        user_data[user_id] = {
-            'name': user.first_name,
-            'messages': [],
-            'topic': 'general',
-            'started': datetime.now().isoformat()
-        }
+    session = sessions.get(user_id, user.first_name)
     
     # Log message
-    user_data[user_id]['messages'].append({
-        'user': user_message,
-        'timestamp': datetime.now().isoformat()
-    })
+    session.message_count += 1
     
     # Typing indicator
-    await context.bot.send_chat_action(
-        chat_id=update.effective_chat.id,
-        action='typing'
-    )
+    typing = asyncio.create_task(keep_typing(context.bot, update.effective_chat.id))
     
     # Generate response
     try:
-        if MODEL_LOADED:
-            response = chatbot.generate_response(user_message)
-        else:
-            fallback = RuleBasedFallback.get_response(user_message)
-            response = fallback if fallback else "I dey learn to answer that. Try ask me about Math or Python!"
-        
-        user_data[user_id]['messages'][-1]['bot'] = response
+        try:
+            if MODEL_LOADED:
+                # Each user's prompt only sees their own history
+                try:
+                    response = await inference.run(
+                        generate_response, user_message, conversation=session, user_key=user_id,
+                        profile=take_profile_request(user_id), request_id=f"tg-{update.update_id}"
+                    )
+                except InferenceQueueFull:
+                    # Shed at the door so the wait (and p99) stays bounded under overload
+                    response = shed_response(user_message, session)
+            else:
+                response = rule_based_response(user_message, session)
+        finally:
+            typing.cancel()
         
         await update.message.reply_text(response)
         
         # Ask for feedback occasionally
-        if len(user_data[user_id]['messages']) % 5 == 0:
+        if session.message_count % 5 == 0:
             keyboard = [[
                 InlineKeyboardButton("👍 Good", callback_data='quick_good'),
                 InlineKeyboardButton("👎 Bad", callback_data='quick_bad')
@@ -272,18 +408,12 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = query.from_user.id
     data = query.data
     
-    if user_id not in user_data:
-        user_data[user_id] = {
-            'name': query.from_user.first_name,
-            'messages': [],
-            'topic': 'general',
-            'started': datetime.now().isoformat()
-        }
+    session = sessions.get(user_id, query.from_user.first_name)
     
     # Topic selection
     if data.startswith('topic_'):
         topic = data.replace('topic_', '')
-        user_data[user_id]['topic'] = topic
+        session.topic = topic
         
         messages = {
             'math': "📐 Great! Let's learn Math! Ask me anything.",
@@ -311,27 +441,34 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 def save_telegram_feedback(user_id, rating):
     """Save feedback"""
-    os.makedirs("data", exist_ok=True)
+    os.makedirs(os.path.dirname(FEEDBACK_FILE) or ".", exist_ok=True)
+    session = sessions.peek(user_id)
     
     feedback = {
         'user_id': user_id,
-        'name': user_data.get(user_id, {}).get('name', 'Unknown'),
+        'name': (session.name if session else None) or 'Unknown',
         'rating': rating,
         'timestamp': datetime.now().isoformat()
     }
     
     try:
-        with open('data/telegram_feedback.json', 'r') as f:
+        with open(FEEDBACK_FILE, 'r') as f:
             all_feedback = json.load(f)
     except FileNotFoundError:
         all_feedback = []
     
     all_feedback.append(feedback)
     
-    with open('data/telegram_feedback.json', 'w') as f:
+    with open(FEEDBACK_FILE, 'w') as f:
         json.dump(all_feedback, f, indent=2)
 
 
+def track_batching():
+    """Export the batching engine once it exists; with a background load that is after startup"""
+    if MODEL_LOADED and chatbot.model_status == 'ready' and getattr(chatbot, 'engine', None) is not None:
+        metrics.track(batching=chatbot.engine)
+
+
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Log errors"""
     logger.error(f"Update {update} caused error {context.error}")
@@ -365,12 +502,26 @@ def main():
     application.add_handler(CommandHandler("stats", stats_command))
     application.add_handler(CommandHandler("clear", clear_command))
     application.add_handler(CommandHandler("feedback", feedback_command))
+    application.add_handler(CommandHandler("profile", profile_command))
     application.add_handler(CallbackQueryHandler(button_callback))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
     application.add_error_handler(error_handler)
     
     print("🤖 Pidgin AI Tutor Bot is starting...")
-    print(f"📱 Model loaded: {MODEL_LOADED}")
+    print(f"📱 Model loaded: {MODEL_LOADED} ({chatbot.model_status if MODEL_LOADED else 'unavailable'})")
+    print(f"🧵 Inference workers: {inference.max_workers}, queue: {inference.max_queue or 'unbounded'}")
+    if metrics is not None:
+        metrics.track(router=router, response_cache=response_cache, admission=admission, inference=inference,
+                      sessions=sessions)
+        port = int(os.getenv('PIDGIN_METRICS_PORT'))
+        metrics.serve(port, before_render=track_batching)
+        print(f"📈 Metrics: http://127.0.0.1:{port}/metrics")
+    if profiler is not None:
+        print(f"🔬 Profiling {profiler.sample_rate:.1%} of messages into {profiler.directory}/ "
+              f"(/profile for admins {sorted(ADMIN_IDS)})")
+    if admission is not None:
+        print(f"🚦 Admission: {admission.max_concurrent} generating, {admission.max_queue} queued, "
+              f"{admission.user_rate}/s per user (burst {admission.user_burst:g})")
     print("✅ Bot running! Press Ctrl+C to stop.\n")
     
     application.run_polling(allowed_updates=Update.ALL_TYPES)
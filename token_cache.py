@@ -0,0 +1,151 @@
+"""
+Token Cache
+Tokenizes a training text file once into a memory-mapped token file reused by every later run
+
+Replaces transformers' deprecated TextDataset, which re-tokenized the whole
+file in memory and pickled every block. Here the file is tokenized in chunks
+of whole lines and appended to cached_tokens_<name>_<key>.bin beside it, so a
+corpus far larger than RAM streams through. Chunks are only cut where GPT-2's
+pre-tokenizer splits anyway, so the tokens are the same as encoding the whole
+file at once. The key hashes the file contents
+and the tokenizer, so editing either (or the prompt format) tokenizes again.
+The token file does not depend on block_size: any block size slices the same
+memory map, and reading a block only touches its pages.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+# Bump when the on-disk layout or chunking changes
+CACHE_VERSION = 2
+# Fast tokenizers hold a few hundred bytes per token while encoding, so 64K-character
+# chunks keep that to ~20 MB (1M-character chunks peaked near 300 MB) at the same speed
+CHUNK_CHARS = 1 << 16
+
+
+def file_hash(path):
+    """sha256 of a file, read in 1 MB chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def tokenizer_hash(tokenizer):
+    """sha256 of everything that decides the token ids (vocab, merges, added and special tokens)"""
+    if getattr(tokenizer, 'is_fast', False):
+        payload = tokenizer.backend_tokenizer.to_str()
+    else:
+        payload = json.dumps([tokenizer.get_vocab(), sorted(tokenizer.all_special_tokens)], sort_keys=True)
+    return hashlib.sha256(f"{type(tokenizer).__name__}\n{payload}".encode('utf-8')).hexdigest()
+
+
+def cache_paths(file_path, tokenizer, cache_dir=None):
+    """(tokens .bin, metadata .json) for file_path under this tokenizer"""
+    key = hashlib.sha256(
+        f"{CACHE_VERSION}\n{file_hash(file_path)}\n{tokenizer_hash(tokenizer)}".encode('utf-8')
+    ).hexdigest()[:16]
+    directory = cache_dir or os.path.dirname(file_path) or "."
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    base = os.path.join(directory, f"cached_tokens_{stem}_{key}")
+    return base + ".bin", base + ".json"
+
+
+def _can_break(line, next_line):
+    """Whether a chunk may end between these two lines"""
+    end = line[-2:-1]
+    return bool(end) and not end.isspace() and not next_line[:1].isspace()
+
+
+def _line_chunks(file_path, chunk_chars=CHUNK_CHARS):
+    """Consecutive whole lines of at least chunk_chars characters, cut only at a safe line break
+
+    Whitespace at the very end of a string is pre-tokenized as one run (a blank
+    line becomes a single double-newline token), so a chunk only ends on a
+    newline between a line that does not end in whitespace and one that does
+    not start with it.
+    """
+    lines, size = [], 0
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if size >= chunk_chars and _can_break(lines[-1], line):
+                yield "".join(lines)
+                lines, size = [], 0
+            lines.append(line)
+            size += len(line)
+    if lines:
+        yield "".join(lines)
+
+
+def build_token_cache(file_path, tokenizer, cache_dir=None, chunk_chars=CHUNK_CHARS):
+    """Tokenize file_path into its cache unless an up-to-date one exists; returns the metadata"""
+    bin_path, meta_path = cache_paths(file_path, tokenizer, cache_dir)
+    if os.path.exists(meta_path) and os.path.exists(bin_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if os.path.getsize(bin_path) == meta['tokens'] * np.dtype(meta['dtype']).itemsize:
+            meta['path'] = bin_path
+            return meta
+
+    # GPT-2's 50k vocabulary fits in uint16, halving the file and the pages read per block
+    dtype = np.uint16 if len(tokenizer) <= np.iinfo(np.uint16).max + 1 else np.int32
+    os.makedirs(os.path.dirname(bin_path) or ".", exist_ok=True)
+    tmp_path = f"{bin_path}.{os.getpid()}.tmp"
+    tokens = 0
+    with open(tmp_path, 'wb') as f:
+        for chunk in _line_chunks(file_path, chunk_chars):
+            ids = np.asarray(tokenizer.encode(chunk, add_special_tokens=False), dtype=dtype)
+            ids.tofile(f)
+            tokens += len(ids)
+    # Renamed only once complete, so an interrupted run never leaves a truncated cache
+    os.replace(tmp_path, bin_path)
+
+    meta = {'source': os.path.abspath(file_path), 'tokens': tokens, 'dtype': np.dtype(dtype).name,
+            'version': CACHE_VERSION}
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    # Caches of earlier versions of this file or tokenizer are never read again
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    stale = re.compile(rf"cached_tokens_{re.escape(stem)}_[0-9a-f]{{16}}\.(bin|json)")
+    current = (os.path.basename(bin_path), os.path.basename(meta_path))
+    directory = os.path.dirname(bin_path) or "."
+    for name in os.listdir(directory):
+        if stale.fullmatch(name) and name not in current:
+            os.remove(os.path.join(directory, name))
+
+    meta['path'] = bin_path
+    return meta
+
+
+class TokenBlockDataset(Dataset):
+    """Consecutive block_size-token training examples read from a token cache without loading it"""
+
+    def __init__(self, path, tokens, dtype, block_size=128):
+        """tokens and dtype come from the cache metadata; a trailing partial block is dropped"""
+        self.block_size = block_size
+        blocks = tokens // block_size
+        if blocks:
+            self.blocks = np.memmap(path, dtype=dtype, mode='r', shape=(blocks, block_size))
+        else:
+            # A zero-length memory map is an error
+            self.blocks = np.empty((0, block_size), dtype=dtype)
+
+    def __len__(self):
+        return self.blocks.shape[0]
+
+    def __getitem__(self, index):
+        return torch.tensor(self.blocks[index], dtype=torch.long)
+
+
+def load_token_dataset(file_path, tokenizer, block_size=128, cache_dir=None):
+    """TokenBlockDataset over file_path, tokenizing it only if no cache matches"""
+    meta = build_token_cache(file_path, tokenizer, cache_dir)
+    return TokenBlockDataset(meta['path'], meta['tokens'], meta['dtype'], block_size)
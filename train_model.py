@@ -14,14 +14,14 @@ print("=" * 70)
 # Check if transformers is installed
 try:
     from transformers import (
-        GPT2Tokenizer, 
+        GPT2TokenizerFast, 
         GPT2LMHeadModel,
-        TextDataset,
         DataCollatorForLanguageModeling,
         Trainer,
         TrainingArguments
     )
     import torch
+    from token_cache import load_token_dataset
     TRANSFORMERS_AVAILABLE = True
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
@@ -41,7 +41,7 @@ class PidginModelTrainer:
         self.output_dir = output_dir
         
         print(f"\n🤖 Loading base model: {model_name}")
-        self.tokenizer = GPT2Tokenizer.from_pretrained(model_name)
+        self.tokenizer = GPT2TokenizerFast.from_pretrained(model_name)
         self.model = GPT2LMHeadModel.from_pretrained(model_name)
         
         # GPT-2 doesn't have a pad token by default
@@ -77,13 +77,9 @@ class PidginModelTrainer:
         print(f"💾 Saved to {output_file}")
         return output_file
     
-    def create_dataset(self, file_path, block_size=128):
-        """Create a TextDataset for training"""
-        return TextDataset(
-            tokenizer=self.tokenizer,
-            file_path=file_path,
-            block_size=block_size
-        )
+    def create_dataset(self, file_path, block_size=128, cache_dir=None):
+        """Training blocks memory-mapped from a token cache (tokenized only when the file or tokenizer changes)"""
+        return load_token_dataset(file_path, self.tokenizer, block_size, cache_dir)
     
     def train(self, train_file="data/training_data.txt", 
               num_epochs=5, 
@@ -105,6 +101,7 @@ class PidginModelTrainer:
         
         # Create dataset
         train_dataset = self.create_dataset(train_file)
+        print(f"📦 {len(train_dataset)} blocks of {train_dataset.block_size} tokens")
         
         # Data collator
         data_collator = DataCollatorForLanguageModeling(
@@ -156,6 +153,17 @@ class PidginModelTrainer:
             print(f"\n❌ Training failed: {e}")
             return False
     
+    def save_quantized_model(self):
+        """Emit a pre-quantized int8 artifact next to the fp32 checkpoint"""
+        import copy
+        from quantization import quantize_model, save_quantized
+        
+        print("\n🗜️  Saving int8 quantized copy for CPU inference...")
+        quantized = quantize_model(copy.deepcopy(self.model).cpu().eval())
+        path = save_quantized(quantized, self.output_dir)
+        print(f"💾 Saved to {path}")
+        return path
+    
     def test_model(self, prompt="<|user|> Wetin be Python? <|bot|>", max_length=100):
         """Test the trained model"""
         print(f"\n🧪 Testing model...")
@@ -253,6 +261,9 @@ def main():
     if not success:
         return
     
+    # Pre-quantized weights for PidginChatbot(quantize=True)
+    trainer.save_quantized_model()
+    
     # Test the model
     print("\n" + "=" * 70)
     test_prompts = [
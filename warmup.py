@@ -0,0 +1,88 @@
+"""
+Model Warm-up
+Loads the shared model on a background thread and runs a few generations before reporting ready
+"""
+
+import json
+import threading
+import time
+
+
+class ModelWarmup:
+    """Background loader for one shared model
+
+    state goes pending -> loading -> warming -> ready, or failed. Chatbots
+    answer from the cheap and rule-based tiers until ready is set.
+    """
+
+    def __init__(self, model_path, quantize=False, prompts_file="data/pidgin_dataset.json",
+                 num_prompts=3, max_new_tokens=16):
+        """Configure the loader; call start() to begin"""
+        self.model_path = model_path
+        self.quantize = quantize
+        self.prompts_file = prompts_file
+        self.num_prompts = num_prompts
+        self.max_new_tokens = max_new_tokens
+        self.state = 'pending'
+        self.error = None
+        self.ready = threading.Event()
+        self.stats = {'load_ms': 0.0, 'warmup_ms': 0.0, 'warmup_generations': 0}
+        self._thread = None
+
+    def sample_prompts(self):
+        """First questions of the curated dataset, or a built-in set if it is missing"""
+        try:
+            with open(self.prompts_file, 'r', encoding='utf-8') as f:
+                prompts = [row['user_input'] for row in json.load(f)]
+        except (OSError, ValueError, KeyError):
+            prompts = ["Wetin be Python?", "How I go add 5 + 3?", "Teach me about variables"]
+        return prompts[:self.num_prompts]
+
+    def start(self):
+        """Start the background thread (no-op if already started)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="model-warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        """Block until the model is ready or failed; returns True when ready"""
+        self.ready.wait(timeout)
+        return self.state == 'ready'
+
+    def _run(self):
+        """Load the weights, then pay the first-generate setup cost on sample prompts"""
+        from chatbot import PidginChatbot, load_shared_model
+
+        try:
+            self.state = 'loading'
+            start = time.perf_counter()
+            load_shared_model(self.model_path, self.quantize)
+            self.stats['load_ms'] = (time.perf_counter() - start) * 1000
+
+            self.state = 'warming'
+            start = time.perf_counter()
+            bot = PidginChatbot(self.model_path, quantize=self.quantize)
+            for prompt in self.sample_prompts():
+                input_ids = bot._build_prompt_ids(prompt, bot.detect_intent(prompt))
+                bot._generate_text(input_ids, self.max_new_tokens, 0.7)
+                self.stats['warmup_generations'] += 1
+            self.stats['warmup_ms'] = (time.perf_counter() - start) * 1000
+            self.state = 'ready'
+        except Exception as e:
+            print(f"⚠️  Model warm-up failed: {e}")
+            self.error = str(e)
+            self.state = 'failed'
+        finally:
+            self.ready.set()
+
+        if self.state == 'ready':
+            print(f"🔥 Model warm: loaded in {self.stats['load_ms']:.0f}ms, "
+                  f"{self.stats['warmup_generations']} warm-up generations in {self.stats['warmup_ms']:.0f}ms")
+
+    def get_stats(self):
+        """State, error and timings"""
+        stats = dict(self.stats)
+        stats['state'] = self.state
+        stats['error'] = self.error
+        return stats